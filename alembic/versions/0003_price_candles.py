@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0003_price_candles"
+down_revision = "0002_asset_alert_params"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "price_candles",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column(
+            "asset_id",
+            sa.Integer(),
+            sa.ForeignKey("assets.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("interval", sa.String(length=4), nullable=False),
+        sa.Column("bucket_start", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("open", sa.Numeric(18, 8), nullable=False),
+        sa.Column("high", sa.Numeric(18, 8), nullable=False),
+        sa.Column("low", sa.Numeric(18, 8), nullable=False),
+        sa.Column("close", sa.Numeric(18, 8), nullable=False),
+        sa.Column("open_ts", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("close_ts", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.Column("price_sum", sa.Numeric(28, 8), nullable=False),
+        sa.UniqueConstraint(
+            "asset_id", "interval", "bucket_start", name="uq_price_candles_bucket"
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("price_candles")
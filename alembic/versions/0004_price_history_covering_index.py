@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "0004_price_history_cover_idx"
+down_revision = "0003_price_candles"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Redundant with the leading column of uq_price_history_asset_ts
+    op.drop_index("ix_price_history_asset_id", table_name="price_history")
+    if op.get_bind().dialect.name == "postgresql":
+        # Rebuild the unique index as a covering one: (asset_id, ts) INCLUDE (price)
+        op.drop_constraint("uq_price_history_asset_ts", "price_history", type_="unique")
+        op.create_unique_constraint(
+            "uq_price_history_asset_ts",
+            "price_history",
+            ["asset_id", "ts"],
+            postgresql_include=["price"],
+        )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        op.drop_constraint("uq_price_history_asset_ts", "price_history", type_="unique")
+        op.create_unique_constraint(
+            "uq_price_history_asset_ts", "price_history", ["asset_id", "ts"]
+        )
+    op.create_index("ix_price_history_asset_id", "price_history", ["asset_id"])
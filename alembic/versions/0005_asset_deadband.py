@@ -0,0 +1,23 @@
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0005_asset_deadband"
+down_revision = "0004_price_history_cover_idx"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("assets", sa.Column("deadband_pct", sa.Numeric(9, 4), nullable=True))
+    op.add_column(
+        "assets", sa.Column("deadband_heartbeat_min", sa.Integer(), nullable=True)
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("assets", "deadband_heartbeat_min")
+    op.drop_column("assets", "deadband_pct")
@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0006_alert_episodes"
+down_revision = "0005_asset_deadband"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "assets", sa.Column("alert_cooldown_min", sa.Integer(), nullable=True)
+    )
+    op.add_column(
+        "assets", sa.Column("alert_hysteresis_pct", sa.Numeric(9, 4), nullable=True)
+    )
+    op.add_column(
+        "alerts", sa.Column("last_triggered_at", sa.DateTime(), nullable=True)
+    )
+    op.add_column("alerts", sa.Column("closed_at", sa.DateTime(), nullable=True))
+    op.add_column(
+        "alerts",
+        sa.Column("occurrences", sa.Integer(), nullable=False, server_default="1"),
+    )
+    # Existing alerts were one-off inserts: each is a closed single-trigger episode
+    op.execute(
+        "UPDATE alerts SET last_triggered_at = triggered_at, closed_at = triggered_at"
+    )
+    # Newest alert per asset (episode state, the feed): one index seek.
+    # The leading column covers what ix_alerts_asset_id served.
+    op.create_index("ix_alerts_asset_triggered", "alerts", ["asset_id", "triggered_at"])
+    op.drop_index("ix_alerts_asset_id", table_name="alerts")
+
+
+def downgrade() -> None:
+    op.create_index("ix_alerts_asset_id", "alerts", ["asset_id"])
+    op.drop_index("ix_alerts_asset_triggered", table_name="alerts")
+    op.drop_column("alerts", "occurrences")
+    op.drop_column("alerts", "closed_at")
+    op.drop_column("alerts", "last_triggered_at")
+    op.drop_column("assets", "alert_hysteresis_pct")
+    op.drop_column("assets", "alert_cooldown_min")
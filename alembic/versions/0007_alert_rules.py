@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0007_alert_rules"
+down_revision = "0006_alert_episodes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "alert_rules",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column(
+            "asset_id",
+            sa.Integer(),
+            sa.ForeignKey("assets.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("kind", sa.String(length=20), nullable=False),
+        sa.Column("window_minutes", sa.Integer(), nullable=False),
+        sa.Column("threshold", sa.Numeric(9, 4), nullable=False),
+        sa.Column("span", sa.Integer(), nullable=True),
+        sa.Column("enabled", sa.Boolean(), nullable=False, server_default="1"),
+    )
+    op.create_index("ix_alert_rules_asset_id", "alert_rules", ["asset_id"])
+    # Batch mode: SQLite cannot add a foreign key with ALTER TABLE
+    with op.batch_alter_table("alerts") as batch:
+        batch.add_column(sa.Column("rule_id", sa.Integer(), nullable=True))
+        batch.create_foreign_key(
+            "fk_alerts_rule_id", "alert_rules", ["rule_id"], ["id"], ondelete="SET NULL"
+        )
+    op.create_index("ix_alerts_rule_triggered", "alerts", ["rule_id", "triggered_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_alerts_rule_triggered", table_name="alerts")
+    with op.batch_alter_table("alerts") as batch:
+        batch.drop_constraint("fk_alerts_rule_id", type_="foreignkey")
+        batch.drop_column("rule_id")
+    op.drop_index("ix_alert_rules_asset_id", table_name="alert_rules")
+    op.drop_table("alert_rules")
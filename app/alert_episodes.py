@@ -0,0 +1,228 @@
+"""Alert episodes: one `alerts` row per sustained move, not one per evaluation.
+
+Without episodes every evaluation past the threshold inserts an `Alert`. With
+episodes configured for an asset the first one opens an episode (a new row)
+and the following ones update it: `last_triggered_at`, `occurrences` and the
+largest `change_pct` seen. The episode closes (`closed_at`) once the change
+falls below `threshold - hysteresis`, so a move hovering around the threshold
+does not flap. A move that comes back within `cooldown` of the last trigger
+reopens the previous episode instead of inserting a new row.
+
+Per-asset `alert_cooldown_min` / `alert_hysteresis_pct` override the global
+ALERT_COOLDOWN_MINUTES (unset: no episodes) and ALERT_HYSTERESIS_PCT
+(default 0). Alerts of each `AlertRule` form episodes of their own, apart
+from those of the asset's change threshold. `record` is shared by
+`compute_alerts`, `compute_alerts_all`, `evaluate_alert_rules` and
+`worker.alert_stream`.
+"""
+
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from prometheus_client import Counter
+from sqlalchemy import insert, select, update
+from sqlalchemy.orm import Session, aliased
+
+from app.asset_cache import AssetRef
+from app.models import Alert, AlertRule, Asset
+
+ASSETS_PER_QUERY = 1000
+
+ALERTS_SUPPRESSED = Counter(
+    "alerts_suppressed_total",
+    "Alert evaluations folded into an open (or cooling-down) episode",
+    ["symbol"],
+)
+
+
+class Episodes(NamedTuple):
+    cooldown: timedelta
+    hysteresis: float
+
+
+class Evaluation(NamedTuple):
+    """One alert rule evaluation; `change_pct` is None without enough data."""
+
+    asset_id: int
+    symbol: str
+    at: datetime
+    window_minutes: int
+    change_pct: Optional[float]
+    threshold: float
+    episodes: Optional[Episodes] = None
+    # AlertRule behind the evaluation; None for the asset's change threshold
+    rule_id: Optional[int] = None
+
+    @property
+    def fired(self) -> bool:
+        return self.change_pct is not None and abs(self.change_pct) >= self.threshold
+
+
+def _default_cooldown_min() -> Optional[int]:
+    raw = os.getenv("ALERT_COOLDOWN_MINUTES", "").strip()
+    return int(raw) if raw else None
+
+
+def _default_hysteresis_pct() -> float:
+    return float(os.getenv("ALERT_HYSTERESIS_PCT", "0"))
+
+
+def resolve(
+    cooldown_min: Optional[int], hysteresis_pct: Optional[float]
+) -> Optional[Episodes]:
+    """Episode settings from per-asset values over the env defaults."""
+    if cooldown_min is None:
+        cooldown_min = _default_cooldown_min()
+    if cooldown_min is None and hysteresis_pct is None:
+        return None
+    if hysteresis_pct is None:
+        hysteresis_pct = _default_hysteresis_pct()
+    return Episodes(
+        timedelta(minutes=max(0, cooldown_min or 0)), max(0.0, float(hysteresis_pct))
+    )
+
+
+def settings_for(asset: AssetRef) -> Optional[Episodes]:
+    """Episode settings of an asset, or None when every trigger inserts a row."""
+    return resolve(asset.alert_cooldown_min, asset.alert_hysteresis_pct)
+
+
+@dataclass
+class _Episode:
+    asset_id: int
+    triggered_at: datetime
+    last_triggered_at: datetime
+    closed_at: Optional[datetime]
+    window_minutes: int
+    change_pct: float
+    occurrences: int = 1
+    rule_id: Optional[int] = None
+    id: Optional[int] = None
+    dirty: bool = False
+
+    def values(self) -> Dict[str, Any]:
+        return {
+            "asset_id": self.asset_id,
+            "triggered_at": self.triggered_at,
+            "last_triggered_at": self.last_triggered_at,
+            "closed_at": self.closed_at,
+            "window_minutes": self.window_minutes,
+            "change_pct": self.change_pct,
+            "occurrences": self.occurrences,
+            "rule_id": self.rule_id,
+        }
+
+
+def _utc(ts: datetime) -> datetime:
+    # alerts timestamps come back naive from SQLite; they are written in UTC
+    return ts if ts.tzinfo is not None else ts.replace(tzinfo=timezone.utc)
+
+
+Key = Tuple[int, Optional[int]]
+
+
+def _latest(db: Session, keys: Sequence[Key]) -> Dict[Key, _Episode]:
+    """Newest alert per (asset, rule): one `ORDER BY triggered_at LIMIT 1` seek each.
+
+    Alerts of the asset's own threshold (no rule) and of each AlertRule are
+    separate episodes, looked up on (asset_id, triggered_at) and
+    (rule_id, triggered_at) respectively.
+    """
+    asset_ids = sorted({a for a, rule in keys if rule is None})
+    rule_ids = sorted({rule for _, rule in keys if rule is not None})
+    found: Dict[Key, _Episode] = {}
+    for owner, ids in ((Asset, asset_ids), (AlertRule, rule_ids)):
+        for offset in range(0, len(ids), ASSETS_PER_QUERY):
+            chunk = ids[offset : offset + ASSETS_PER_QUERY]
+            newest = aliased(Alert)
+            if owner is Asset:
+                where = [newest.asset_id == Asset.id, newest.rule_id.is_(None)]
+            else:
+                where = [newest.rule_id == AlertRule.id]
+            latest_id = (
+                select(newest.id)
+                .where(*where)
+                .order_by(newest.triggered_at.desc())
+                .limit(1)
+                .scalar_subquery()
+            )
+            rows = db.execute(
+                select(Alert)
+                .join(owner, Alert.id == latest_id)
+                .where(owner.id.in_(chunk))
+            ).scalars()
+            for a in rows:
+                found[(a.asset_id, a.rule_id)] = _Episode(
+                    asset_id=a.asset_id,
+                    triggered_at=_utc(a.triggered_at),
+                    last_triggered_at=_utc(a.last_triggered_at or a.triggered_at),
+                    closed_at=_utc(a.closed_at) if a.closed_at is not None else None,
+                    window_minutes=a.window_minutes,
+                    change_pct=float(a.change_pct),
+                    occurrences=a.occurrences or 1,
+                    rule_id=a.rule_id,
+                    id=a.id,
+                )
+    return found
+
+
+def record(db: Session, evaluations: Sequence[Evaluation]) -> List[Evaluation]:
+    """Apply evaluations (oldest first) to `alerts`; returns those that opened one.
+
+    Evaluations of assets without episodes insert a row when they fire and
+    are otherwise ignored. For the others the newest alert row of each asset
+    (or rule) is loaded once, the evaluations are folded into it in memory,
+    and the result goes out as one bulk INSERT plus one bulk UPDATE. The
+    caller commits.
+    """
+    tracked = {(e.asset_id, e.rule_id) for e in evaluations if e.episodes is not None}
+    state = _latest(db, list(tracked)) if tracked else {}
+    new: List[_Episode] = []
+    emitted: List[Evaluation] = []
+    for ev in evaluations:
+        key = (ev.asset_id, ev.rule_id)
+        episode = state.get(key)
+        if ev.fired:
+            assert ev.change_pct is not None
+            if ev.episodes is not None and episode is not None:
+                cooling = ev.at - episode.last_triggered_at < ev.episodes.cooldown
+                if episode.closed_at is None or cooling:
+                    episode.closed_at = None
+                    episode.last_triggered_at = ev.at
+                    episode.occurrences += 1
+                    if abs(ev.change_pct) > abs(episode.change_pct):
+                        episode.change_pct = ev.change_pct
+                    episode.dirty = True
+                    ALERTS_SUPPRESSED.labels(symbol=ev.symbol).inc()
+                    continue
+            episode = _Episode(
+                asset_id=ev.asset_id,
+                triggered_at=ev.at,
+                last_triggered_at=ev.at,
+                # Without episodes an alert is a one-off: closed when raised
+                closed_at=None if ev.episodes is not None else ev.at,
+                window_minutes=ev.window_minutes,
+                change_pct=ev.change_pct,
+                rule_id=ev.rule_id,
+            )
+            new.append(episode)
+            emitted.append(ev)
+            if ev.episodes is not None:
+                state[key] = episode
+        elif ev.episodes is not None and episode is not None:
+            if episode.closed_at is not None:
+                continue
+            band = ev.threshold - ev.episodes.hysteresis
+            if ev.change_pct is None or abs(ev.change_pct) < band:
+                episode.closed_at = ev.at
+                episode.dirty = True
+    if new:
+        db.execute(insert(Alert), [e.values() for e in new])
+    changed = [e for e in state.values() if e.dirty and e.id is not None]
+    if changed:
+        db.execute(update(Alert), [{"id": e.id, **e.values()} for e in changed])
+    return emitted
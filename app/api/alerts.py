@@ -1,15 +1,19 @@
 from __future__ import annotations
 
-from typing import List
+from typing import Any, List, Optional
 from datetime import datetime
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from pydantic import BaseModel, ConfigDict
-from sqlalchemy import select
+from sqlalchemy import Float, Select, cast, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.db import get_session
-from app.models import Alert, Asset
+from app.api.conditional import cache_headers, make_etag, matches, not_modified
+from app.asset_cache import lookup_asset, lookup_asset_async
+from app.db import get_async_session, get_session
+from app.models import Alert
+from app.serialization import FastJSONResponse
 
 
 class AlertOut(BaseModel):
@@ -18,34 +22,112 @@ class AlertOut(BaseModel):
     triggered_at: datetime
     window_minutes: int
     change_pct: float
+    last_triggered_at: Optional[datetime] = None
+    closed_at: Optional[datetime] = None
+    occurrences: int = 1
+    rule_id: Optional[int] = None
 
     model_config = ConfigDict(from_attributes=True)
 
 
 router = APIRouter(prefix="/alerts", tags=["alerts"])
+async_router = APIRouter(prefix="/alerts", tags=["alerts"])
 
 
 @router.get("/", response_model=List[AlertOut])
 def get_alerts(
+    request: Request,
     asset: str = Query(..., min_length=2, max_length=20),
     limit: int = Query(20, ge=1, le=1000),
     db: Session = Depends(get_session),
-) -> List[AlertOut]:
-    symbol = asset.upper()
-    asset_row = db.execute(
-        select(Asset).where(Asset.symbol == symbol)
-    ).scalar_one_or_none()
+) -> Any:
+    asset_row = lookup_asset(db, asset.upper())
     if asset_row is None:
         raise HTTPException(status_code=404, detail="asset not found")
+    validator = db.execute(_feed_validator(asset_row.id)).one()
+    etag = make_etag("alerts", asset_row.id, limit, *validator)
+    if matches(request, etag):
+        return not_modified(etag)
+    rows = db.connection().execute(_alerts_query(asset_row.id, limit))
+    return _alerts_response(rows, etag)
 
-    rows = (
-        db.execute(
-            select(Alert)
-            .where(Alert.asset_id == asset_row.id)
-            .order_by(Alert.triggered_at.desc())
-            .limit(limit)
+
+@async_router.get("/", response_model=List[AlertOut])
+async def get_alerts_async(
+    request: Request,
+    asset: str = Query(..., min_length=2, max_length=20),
+    limit: int = Query(20, ge=1, le=1000),
+    db: AsyncSession = Depends(get_async_session),
+) -> Any:
+    asset_row = await lookup_asset_async(db, asset.upper())
+    if asset_row is None:
+        raise HTTPException(status_code=404, detail="asset not found")
+    validator = (await db.execute(_feed_validator(asset_row.id))).one()
+    etag = make_etag("alerts", asset_row.id, limit, *validator)
+    if matches(request, etag):
+        return not_modified(etag)
+    rows = await db.execute(_alerts_query(asset_row.id, limit))
+    return _alerts_response(rows, etag)
+
+
+def _feed_validator(
+    asset_id: int,
+) -> Select[int, int, Optional[datetime], Optional[datetime]]:
+    # New rows move the count and the newest id; episode updates (see
+    # app.alert_episodes) move the newest trigger or close time
+    return select(
+        func.count(Alert.id),
+        func.max(Alert.id),
+        func.max(Alert.last_triggered_at),
+        func.max(Alert.closed_at),
+    ).where(Alert.asset_id == asset_id)
+
+
+def _alerts_query(asset_id: int, limit: int) -> Select[Any]:
+    return (
+        select(
+            Alert.id,
+            Alert.asset_id,
+            Alert.triggered_at,
+            Alert.window_minutes,
+            cast(Alert.change_pct, Float),
+            Alert.last_triggered_at,
+            Alert.closed_at,
+            Alert.occurrences,
+            Alert.rule_id,
         )
-        .scalars()
-        .all()
+        .where(Alert.asset_id == asset_id)
+        .order_by(Alert.triggered_at.desc())
+        .limit(limit)
+    )
+
+
+def _alerts_response(rows: Any, etag: str) -> FastJSONResponse:
+    # Column tuples serialized directly; AlertOut only documents the schema
+    return FastJSONResponse(
+        [
+            {
+                "id": alert_id,
+                "asset_id": asset_id,
+                "triggered_at": triggered_at,
+                "window_minutes": window_minutes,
+                "change_pct": change_pct,
+                "last_triggered_at": last_triggered_at,
+                "closed_at": closed_at,
+                "occurrences": occurrences,
+                "rule_id": rule_id,
+            }
+            for (
+                alert_id,
+                asset_id,
+                triggered_at,
+                window_minutes,
+                change_pct,
+                last_triggered_at,
+                closed_at,
+                occurrences,
+                rule_id,
+            ) in rows
+        ],
+        headers=cache_headers(etag),
     )
-    return [AlertOut.model_validate(r) for r in rows]
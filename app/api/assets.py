@@ -5,11 +5,12 @@ from typing import List
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from pydantic import BaseModel, Field, ConfigDict
-from sqlalchemy import select
+from sqlalchemy import Result, Select, select
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.db import get_session
+from app.db import get_async_session, get_session
 from app.models import Asset
 
 
@@ -31,25 +32,63 @@ class AssetOut(BaseModel):
 
 
 router = APIRouter(prefix="/assets", tags=["assets"])
+async_router = APIRouter(prefix="/assets", tags=["assets"])
 
 
 @router.get("/", response_model=List[AssetOut])
 def list_assets(db: Session = Depends(get_session)) -> List[AssetOut]:
-    rows = db.execute(select(Asset).order_by(Asset.symbol)).scalars().all()
-    return [AssetOut.model_validate(r) for r in rows]
+    return _assets_out(db.execute(_assets_query()))
 
 
 @router.post("/", status_code=status.HTTP_201_CREATED, response_model=AssetOut)
 def create_asset(payload: AssetCreate, db: Session = Depends(get_session)) -> AssetOut:
-    data = payload.normalized()
-    asset = Asset(symbol=data.symbol, name=data.name)
+    asset = _new_asset(payload)
     db.add(asset)
     try:
         db.commit()
     except IntegrityError:
         db.rollback()
-        raise HTTPException(
-            status_code=status.HTTP_409_CONFLICT, detail="asset already exists"
-        )
+        raise _already_exists()
     db.refresh(asset)
     return AssetOut.model_validate(asset)
+
+
+@async_router.get("/", response_model=List[AssetOut])
+async def list_assets_async(
+    db: AsyncSession = Depends(get_async_session),
+) -> List[AssetOut]:
+    return _assets_out(await db.execute(_assets_query()))
+
+
+@async_router.post("/", status_code=status.HTTP_201_CREATED, response_model=AssetOut)
+async def create_asset_async(
+    payload: AssetCreate, db: AsyncSession = Depends(get_async_session)
+) -> AssetOut:
+    asset = _new_asset(payload)
+    db.add(asset)
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise _already_exists()
+    await db.refresh(asset)
+    return AssetOut.model_validate(asset)
+
+
+def _assets_query() -> Select[Asset]:
+    return select(Asset).order_by(Asset.symbol)
+
+
+def _assets_out(result: Result[Asset]) -> List[AssetOut]:
+    return [AssetOut.model_validate(r) for r in result.scalars().all()]
+
+
+def _new_asset(payload: AssetCreate) -> Asset:
+    data = payload.normalized()
+    return Asset(symbol=data.symbol, name=data.name)
+
+
+def _already_exists() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT, detail="asset already exists"
+    )
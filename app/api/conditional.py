@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+import hashlib
+
+from fastapi import Request
+from starlette.responses import Response
+
+
+def make_etag(*parts: object) -> str:
+    """Build a weak ETag from cheap validator values (ids, counts, timestamps)."""
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=12).hexdigest()
+    return f'W/"{digest}"'
+
+
+def _opaque(tag: str) -> str:
+    # Weak comparison (RFC 9110 §8.8.3.2): ignore the W/ prefix on both sides
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def matches(request: Request, etag: str) -> bool:
+    """True when the request's If-None-Match already names this ETag."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    wanted = _opaque(etag)
+    return any(_opaque(candidate) == wanted for candidate in header.split(","))
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers=cache_headers(etag))
+
+
+def cache_headers(etag: str) -> dict[str, str]:
+    # no-cache: clients may store the body but must revalidate every time
+    return {"ETag": etag, "Cache-Control": "no-cache"}
@@ -1,15 +1,32 @@
 from __future__ import annotations
 
 from datetime import datetime, timedelta, timezone
-from typing import List, Optional
+from typing import (
+    Any,
+    AsyncIterator,
+    Dict,
+    Iterator,
+    List,
+    Literal,
+    Optional,
+    Tuple,
+)
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, ConfigDict
-from sqlalchemy import select
-from sqlalchemy.orm import Session
+from sqlalchemy import Float, Select, and_, case, cast, exists, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, aliased
 
-from app.db import get_session
-from app.models import Asset, PriceHistory
+from app.api.conditional import cache_headers, make_etag, matches, not_modified
+from app.asset_cache import AssetRef, lookup_asset, lookup_asset_async
+from app.db import get_async_engine, get_async_session, get_engine, get_session
+from app.deadband import enabled_globally, settings_for
+from app.downsample import downsample
+from app.models import Asset, PriceCandle, PriceHistory
+from app.rollups import INTERVALS, bucket_start
+from app.serialization import FastJSONResponse, dumps
 
 
 class PricePoint(BaseModel):
@@ -20,34 +37,292 @@ class PricePoint(BaseModel):
 
 
 router = APIRouter(prefix="/prices", tags=["prices"])
+# Same routes as `router` on AsyncSession; create_app mounts one or the other
+async_router = APIRouter(prefix="/prices", tags=["prices"])
+
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+STREAM_BATCH_ROWS = 1000
 
 
 @router.get("/", response_model=List[PricePoint])
 def get_prices(
+    request: Request,
     asset: str = Query(..., min_length=2, max_length=20),
     window: str | None = Query(None, description="e.g., 24h, 1h, 7d or minutes"),
+    max_points: int | None = Query(
+        None, ge=4, le=10000, description="Downsample to at most N points"
+    ),
+    mode: Literal["lttb", "minmax"] = Query(
+        "lttb", description="Downsampling algorithm used with max_points"
+    ),
+    format: Literal["json", "ndjson"] = Query(
+        "json", description="ndjson streams one point per line"
+    ),
+    after_ts: datetime | None = Query(
+        None, description="Keyset cursor: only points strictly after this ts"
+    ),
+    limit: int | None = Query(None, ge=1, le=100000, description="Page size"),
     db: Session = Depends(get_session),
-) -> List[PricePoint]:
-    symbol = asset.upper()
-    asset_row = db.execute(
-        select(Asset).where(Asset.symbol == symbol)
-    ).scalar_one_or_none()
+) -> Any:
+    asset_row = lookup_asset(db, asset.upper())
     if asset_row is None:
         raise HTTPException(status_code=404, detail="asset not found")
+    cutoff = _window_start(
+        asset_row, _prices_cutoff(window, max_points, format, after_ts, limit)
+    )
+
+    # Validate before doing any heavy work: a matching ETag costs one
+    # index-only aggregate and no serialization.
+    validator = db.execute(_window_validator(asset_row.id, cutoff, after_ts)).one()
+    etag = _prices_etag(
+        asset_row.id, window, max_points, mode, format, after_ts, limit, validator
+    )
+    if matches(request, etag):
+        return not_modified(etag)
+
+    q = _prices_query(asset_row.id, cutoff, after_ts)
+    headers: Dict[str, str] = cache_headers(etag)
+    if format == "ndjson":
+        if limit is not None:
+            boundary = db.execute(_page_boundary(q, limit)).scalar_one_or_none()
+            _set_next_cursor(headers, boundary)
+            q = q.limit(limit)
+        return _ndjson_response(_stream_ndjson(q), headers)
+
+    if limit is not None:
+        q = q.limit(limit)
+    # Plain Core tuples straight to JSON bytes: no ORM identity map, no
+    # per-row PricePoint and no second response_model validation pass.
+    points: List[Tuple[datetime, float]] = [
+        (ts, price) for ts, price in db.connection().execute(q)
+    ]
+    return _points_response(points, limit, max_points, mode, headers)
+
+
+@async_router.get("/", response_model=List[PricePoint])
+async def get_prices_async(
+    request: Request,
+    asset: str = Query(..., min_length=2, max_length=20),
+    window: str | None = Query(None, description="e.g., 24h, 1h, 7d or minutes"),
+    max_points: int | None = Query(
+        None, ge=4, le=10000, description="Downsample to at most N points"
+    ),
+    mode: Literal["lttb", "minmax"] = Query(
+        "lttb", description="Downsampling algorithm used with max_points"
+    ),
+    format: Literal["json", "ndjson"] = Query(
+        "json", description="ndjson streams one point per line"
+    ),
+    after_ts: datetime | None = Query(
+        None, description="Keyset cursor: only points strictly after this ts"
+    ),
+    limit: int | None = Query(None, ge=1, le=100000, description="Page size"),
+    db: AsyncSession = Depends(get_async_session),
+) -> Any:
+    asset_row = await lookup_asset_async(db, asset.upper())
+    if asset_row is None:
+        raise HTTPException(status_code=404, detail="asset not found")
+    cutoff = _window_start(
+        asset_row, _prices_cutoff(window, max_points, format, after_ts, limit)
+    )
+
+    validator = (
+        await db.execute(_window_validator(asset_row.id, cutoff, after_ts))
+    ).one()
+    etag = _prices_etag(
+        asset_row.id, window, max_points, mode, format, after_ts, limit, validator
+    )
+    if matches(request, etag):
+        return not_modified(etag)
+
+    q = _prices_query(asset_row.id, cutoff, after_ts)
+    headers: Dict[str, str] = cache_headers(etag)
+    if format == "ndjson":
+        if limit is not None:
+            boundary = (await db.execute(_page_boundary(q, limit))).scalar_one_or_none()
+            _set_next_cursor(headers, boundary)
+            q = q.limit(limit)
+        return _ndjson_response(_stream_ndjson_async(q), headers)
 
+    if limit is not None:
+        q = q.limit(limit)
+    points: List[Tuple[datetime, float]] = [
+        (ts, price) for ts, price in await db.execute(q)
+    ]
+    return _points_response(points, limit, max_points, mode, headers)
+
+
+def _prices_etag(
+    asset_id: int,
+    window: str | None,
+    max_points: int | None,
+    mode: str,
+    format: str,
+    after_ts: datetime | None,
+    limit: int | None,
+    validator: Any,
+) -> str:
+    return make_etag(
+        "prices",
+        asset_id,
+        window,
+        max_points,
+        mode,
+        format,
+        after_ts,
+        limit,
+        *validator,
+    )
+
+
+def _prices_cutoff(
+    window: str | None,
+    max_points: int | None,
+    format: str,
+    after_ts: datetime | None,
+    limit: int | None,
+) -> datetime | None:
+    """Validate GET /prices/ arguments and return the window cutoff, if any."""
     cutoff: Optional[datetime] = None
     if window:
-        try:
-            cutoff = _parse_window_to_cutoff(window)
-        except Exception:
-            raise HTTPException(status_code=400, detail="invalid window")
+        cutoff = _cutoff_or_400(window)
+    if max_points is not None and (
+        format == "ndjson" or after_ts is not None or limit is not None
+    ):
+        # Downsampling a single page (or a stream) would not preserve the shape
+        raise HTTPException(
+            status_code=400,
+            detail="max_points cannot be combined with ndjson or pagination",
+        )
+    return cutoff
+
+
+def _window_start(asset: AssetRef, cutoff: datetime | None) -> Any:
+    """Where a window read starts: `cutoff`, or for deadband assets the last row
+    at or before it.
+
+    Deadband storage keeps only rows that changed, so the price at the cutoff
+    is that of the last row before it. Including that row lets clients (and
+    first/min/max in summaries) step-interpolate the whole window.
+    """
+    if cutoff is None or settings_for(asset) is None:
+        return cutoff
+    return _carry_in_start(asset.id, cutoff)
+
+
+def _carry_in_start(asset_id: Any, cutoff: datetime) -> Any:
+    """ts of the last row at or before `cutoff` (one index seek), else `cutoff`.
+
+    With `Asset.id` as `asset_id` the seek correlates with the outer `assets`
+    explicitly: it ends up nested in `_boundary_price`, whose own FROM has no
+    `assets`, so auto-correlation would cross-join it instead.
+    """
+    ph = aliased(PriceHistory)
+    last_before = (
+        select(ph.ts)
+        .where(ph.asset_id == asset_id, ph.ts <= cutoff)
+        .order_by(ph.ts.desc())
+        .limit(1)
+        .correlate(Asset)
+        .scalar_subquery()
+    )
+    return func.coalesce(last_before, cutoff)
+
+
+def _points_response(
+    points: List[Tuple[datetime, float]],
+    limit: int | None,
+    max_points: int | None,
+    mode: Literal["lttb", "minmax"],
+    headers: Dict[str, str],
+) -> FastJSONResponse:
+    if limit is not None and len(points) == limit:
+        headers[NEXT_CURSOR_HEADER] = points[-1][0].isoformat()
+    if max_points is not None and len(points) > max_points:
+        # Downsampling happens after the fetch so it behaves the same on every backend
+        points = downsample(points, max_points, mode)
+    return FastJSONResponse(
+        [{"ts": ts, "price": price} for ts, price in points], headers=headers
+    )
+
 
-    q = select(PriceHistory).where(PriceHistory.asset_id == asset_row.id)
+def _page_boundary(q: Select[datetime, float], limit: int) -> Select[datetime]:
+    """Last ts of the first `limit` rows of `q`.
+
+    NDJSON headers go out before the body, so the page's cursor is found up
+    front; the (asset_id, ts) index answers this without touching the table.
+    """
+    return q.with_only_columns(PriceHistory.ts).offset(limit - 1).limit(1)
+
+
+def _set_next_cursor(headers: Dict[str, str], boundary: datetime | None) -> None:
+    if boundary is not None:
+        headers[NEXT_CURSOR_HEADER] = boundary.isoformat()
+
+
+def _ndjson_response(body: Any, headers: Dict[str, str]) -> StreamingResponse:
+    return StreamingResponse(body, media_type="application/x-ndjson", headers=headers)
+
+
+def _window_validator(
+    asset_id: int,
+    cutoff: Any,
+    after_ts: datetime | None = None,
+) -> Select[int, datetime, datetime]:
+    """count/first ts/last ts of a window, answered from the (asset_id, ts) index.
+
+    Any new sample, backfilled hole or point aging out of the window changes
+    at least one of them, so together they make a sound ETag validator.
+    """
+    q = select(
+        func.count(PriceHistory.ts),
+        func.min(PriceHistory.ts),
+        func.max(PriceHistory.ts),
+    ).where(PriceHistory.asset_id == asset_id)
     if cutoff is not None:
         q = q.where(PriceHistory.ts >= cutoff)
-    q = q.order_by(PriceHistory.ts)
-    rows = db.execute(q).scalars().all()
-    return [PricePoint.model_validate(r) for r in rows]
+    if after_ts is not None:
+        q = q.where(PriceHistory.ts > after_ts)
+    return q
+
+
+def _prices_query(
+    asset_id: int, cutoff: Any, after_ts: datetime | None
+) -> Select[datetime, float]:
+    # Casting in SQL hands back floats directly instead of Decimal objects
+    q = select(PriceHistory.ts, cast(PriceHistory.price, Float)).where(
+        PriceHistory.asset_id == asset_id
+    )
+    if cutoff is not None:
+        q = q.where(PriceHistory.ts >= cutoff)
+    if after_ts is not None:
+        q = q.where(PriceHistory.ts > after_ts)
+    return q.order_by(PriceHistory.ts)
+
+
+def _stream_ndjson(q: Select[datetime, float]) -> Iterator[bytes]:
+    """Yield NDJSON chunks from a server-side cursor in constant memory.
+
+    Runs in Starlette's threadpool after the request handler has returned, so it
+    owns its session instead of borrowing the request-scoped one.
+    """
+    with Session(bind=get_engine()) as db:
+        conn = db.connection(execution_options={"yield_per": STREAM_BATCH_ROWS})
+        for batch in conn.execute(q).partitions():
+            yield _ndjson_chunk(batch)
+
+
+async def _stream_ndjson_async(q: Select[datetime, float]) -> AsyncIterator[bytes]:
+    """`_stream_ndjson` for the async router, on its own AsyncSession."""
+    async with AsyncSession(bind=get_async_engine()) as db:
+        result = await db.stream(q.execution_options(yield_per=STREAM_BATCH_ROWS))
+        async for batch in result.partitions():
+            yield _ndjson_chunk(batch)
+
+
+def _ndjson_chunk(batch: Any) -> bytes:
+    return b"".join(dumps({"ts": ts, "price": price}) + b"\n" for ts, price in batch)
 
 
 class PriceSummary(BaseModel):
@@ -73,39 +348,354 @@ def _parse_window_to_cutoff(window: str) -> datetime:
     return now - timedelta(minutes=minutes)
 
 
+def _cutoff_or_400(window: str) -> datetime:
+    try:
+        return _parse_window_to_cutoff(window)
+    except Exception:
+        raise HTTPException(status_code=400, detail="invalid window")
+
+
 @router.get("/summary", response_model=PriceSummary)
 def get_price_summary(
+    request: Request,
+    response: Response,
     asset: str = Query(..., min_length=2, max_length=20),
     window: str = Query("24h", description="e.g., 24h, 1h, 7d or minutes"),
     db: Session = Depends(get_session),
+) -> Any:
+    asset_row = lookup_asset(db, asset.upper())
+    if asset_row is None:
+        raise HTTPException(status_code=404, detail="asset not found")
+    cutoff = _window_start(asset_row, _cutoff_or_400(window))
+    validator = db.execute(_window_validator(asset_row.id, cutoff)).one()
+    etag = make_etag("summary", asset_row.id, window, *validator)
+    if matches(request, etag):
+        return not_modified(etag)
+    response.headers.update(cache_headers(etag))
+    return _summary_for(db, asset_row.id, cutoff)
+
+
+@async_router.get("/summary", response_model=PriceSummary)
+async def get_price_summary_async(
+    request: Request,
+    response: Response,
+    asset: str = Query(..., min_length=2, max_length=20),
+    window: str = Query("24h", description="e.g., 24h, 1h, 7d or minutes"),
+    db: AsyncSession = Depends(get_async_session),
+) -> Any:
+    asset_row = await lookup_asset_async(db, asset.upper())
+    if asset_row is None:
+        raise HTTPException(status_code=404, detail="asset not found")
+    cutoff = _window_start(asset_row, _cutoff_or_400(window))
+    validator = (await db.execute(_window_validator(asset_row.id, cutoff))).one()
+    etag = make_etag("summary", asset_row.id, window, *validator)
+    if matches(request, etag):
+        return not_modified(etag)
+    response.headers.update(cache_headers(etag))
+    row = (await db.execute(_summary_query(asset_row.id, cutoff))).one()
+    return _summary_from_row(*row)
+
+
+def _boundary_price(asset_id: Any, cutoff: Any, last: bool) -> Any:
+    """Scalar subquery for the first/last price of an asset inside a window.
+
+    `asset_id` may be a literal id or a column (e.g. `Asset.id`) to correlate
+    with an outer query. Uses an alias so it never correlates with an outer
+    `price_history` FROM by accident.
+    """
+    ph = aliased(PriceHistory)
+    order = ph.ts.desc() if last else ph.ts.asc()
+    return (
+        select(ph.price)
+        .where(ph.asset_id == asset_id, ph.ts >= cutoff)
+        .order_by(order)
+        .limit(1)
+        .scalar_subquery()
+    )
+
+
+def _summary_from_row(
+    points: int | None,
+    mn: Any,
+    mx: Any,
+    avg: Any,
+    first: Any,
+    last: Any,
 ) -> PriceSummary:
-    symbol = asset.upper()
-    asset_row = db.execute(
-        select(Asset).where(Asset.symbol == symbol)
-    ).scalar_one_or_none()
+    if not points:
+        return PriceSummary(
+            points=0, first=None, last=None, min=None, max=None, avg=None
+        )
+    return PriceSummary(
+        points=int(points),
+        first=float(first),
+        last=float(last),
+        min=float(mn),
+        max=float(mx),
+        avg=float(avg),
+    )
+
+
+def _summary_query(asset_id: int, cutoff: Any) -> Select[Any]:
+    """Aggregate a window in the database so only one row comes back.
+
+    count/min/max/avg are plain aggregates; first/last are ordered LIMIT 1
+    subqueries that the (asset_id, ts) unique index answers with a seek.
+    """
+    return select(
+        func.count(PriceHistory.ts),
+        func.min(PriceHistory.price),
+        func.max(PriceHistory.price),
+        func.avg(PriceHistory.price),
+        _boundary_price(asset_id, cutoff, last=False),
+        _boundary_price(asset_id, cutoff, last=True),
+    ).where(PriceHistory.asset_id == asset_id, PriceHistory.ts >= cutoff)
+
+
+def _summary_for(db: Session, asset_id: int, cutoff: Any) -> PriceSummary:
+    return _summary_from_row(*db.execute(_summary_query(asset_id, cutoff)).one())
+
+
+def _summaries_query(
+    symbols: List[str] | None, cutoff: datetime, carry_in: bool = False
+) -> Select[Any]:
+    """Summaries for many assets in one grouped query (all assets when None).
+
+    With `carry_in`, deadband assets start their window at the last row at or
+    before the cutoff, like the single-asset summary.
+    """
+    start = _batch_start(cutoff) if carry_in else cutoff
+    q = (
+        select(
+            Asset.symbol,
+            func.count(PriceHistory.ts),
+            func.min(PriceHistory.price),
+            func.max(PriceHistory.price),
+            func.avg(PriceHistory.price),
+            _boundary_price(Asset.id, start, last=False),
+            _boundary_price(Asset.id, start, last=True),
+        )
+        .select_from(Asset)
+        .outerjoin(
+            PriceHistory,
+            and_(PriceHistory.asset_id == Asset.id, PriceHistory.ts >= start),
+        )
+        .group_by(Asset.id, Asset.symbol)
+        .order_by(Asset.symbol)
+    )
+    if symbols is not None:
+        q = q.where(Asset.symbol.in_(symbols))
+    return q
+
+
+def _batch_start(cutoff: datetime) -> Any:
+    """`_window_start` for the `Asset` row of an outer query."""
+    start = _carry_in_start(Asset.id, cutoff)
+    if enabled_globally():
+        return start
+    return case((Asset.deadband_pct.is_not(None), start), else_=cutoff)
+
+
+def _any_deadband_asset() -> Select[bool]:
+    """Whether some asset has its own deadband (else the carry-in can be skipped)."""
+    return select(exists().where(Asset.deadband_pct.is_not(None)))
+
+
+@router.get("/summary/batch", response_model=Dict[str, PriceSummary])
+def get_price_summary_batch(
+    request: Request,
+    response: Response,
+    assets: str | None = Query(
+        None, description="Comma-separated symbols (e.g. BTC,ETH); default: all"
+    ),
+    window: str = Query("24h", description="e.g., 24h, 1h, 7d or minutes"),
+    db: Session = Depends(get_session),
+) -> Any:
+    """Summaries keyed by symbol; unknown symbols are simply absent."""
+    symbols = _parse_symbols(assets)
+    cutoff = _cutoff_or_400(window)
+    prices, asset_set = _batch_validator(symbols, cutoff)
+    etag = _batch_etag(
+        symbols, window, db.execute(prices).one(), db.execute(asset_set).one()
+    )
+    if matches(request, etag):
+        return not_modified(etag)
+    response.headers.update(cache_headers(etag))
+    carry_in = enabled_globally() or bool(db.execute(_any_deadband_asset()).scalar())
+    rows = db.execute(_summaries_query(symbols, cutoff, carry_in))
+    return {symbol: _summary_from_row(*rest) for symbol, *rest in rows}
+
+
+@async_router.get("/summary/batch", response_model=Dict[str, PriceSummary])
+async def get_price_summary_batch_async(
+    request: Request,
+    response: Response,
+    assets: str | None = Query(
+        None, description="Comma-separated symbols (e.g. BTC,ETH); default: all"
+    ),
+    window: str = Query("24h", description="e.g., 24h, 1h, 7d or minutes"),
+    db: AsyncSession = Depends(get_async_session),
+) -> Any:
+    symbols = _parse_symbols(assets)
+    cutoff = _cutoff_or_400(window)
+    prices, asset_set = _batch_validator(symbols, cutoff)
+    etag = _batch_etag(
+        symbols,
+        window,
+        (await db.execute(prices)).one(),
+        (await db.execute(asset_set)).one(),
+    )
+    if matches(request, etag):
+        return not_modified(etag)
+    response.headers.update(cache_headers(etag))
+    carry_in = enabled_globally() or bool(
+        (await db.execute(_any_deadband_asset())).scalar()
+    )
+    rows = await db.execute(_summaries_query(symbols, cutoff, carry_in))
+    return {symbol: _summary_from_row(*rest) for symbol, *rest in rows}
+
+
+def _batch_etag(
+    symbols: List[str] | None, window: str, prices: Any, asset_set: Any
+) -> str:
+    return make_etag(
+        "summary-batch", symbols, window, enabled_globally(), *prices, *asset_set
+    )
+
+
+def _parse_symbols(assets: str | None) -> List[str] | None:
+    if assets is None:
+        return None
+    return [a.strip().upper() for a in assets.split(",") if a.strip()]
+
+
+def _batch_validator(
+    symbols: List[str] | None, cutoff: datetime
+) -> Tuple[Select[int, datetime, datetime], Select[int, int, int, Any]]:
+    """Window validator across assets, plus the asset set itself.
+
+    Like the single-asset validator, each window starts at the asset's
+    carry-in row, and the asset set covers which assets have a deadband, so
+    moving either changes the ETag.
+    """
+    prices = (
+        select(
+            func.count(PriceHistory.ts),
+            func.min(PriceHistory.ts),
+            func.max(PriceHistory.ts),
+        )
+        .select_from(Asset)
+        # An outer join keeps assets the driving table, so each window is an
+        # index range seek (count/min/max ignore the NULLs it adds)
+        .outerjoin(
+            PriceHistory,
+            and_(
+                PriceHistory.asset_id == Asset.id,
+                PriceHistory.ts >= _batch_start(cutoff),
+            ),
+        )
+    )
+    assets = select(
+        func.count(Asset.id),
+        func.max(Asset.id),
+        func.count(Asset.deadband_pct),
+        func.sum(case((Asset.deadband_pct.is_not(None), Asset.id), else_=0)),
+    )
+    if symbols is not None:
+        prices = prices.where(Asset.symbol.in_(symbols))
+        assets = assets.where(Asset.symbol.in_(symbols))
+    return prices, assets
+
+
+class Candle(BaseModel):
+    ts: datetime
+    open: float
+    high: float
+    low: float
+    close: float
+    count: int
+    avg: float
+
+
+@router.get("/candles", response_model=List[Candle])
+def get_candles(
+    request: Request,
+    asset: str = Query(..., min_length=2, max_length=20),
+    interval: Literal["1m", "5m", "1h", "1d"] = Query("1h"),
+    window: str = Query("24h", description="e.g., 24h, 1h, 7d or minutes"),
+    db: Session = Depends(get_session),
+) -> Any:
+    """OHLC candles from the rollup tables, oldest first.
+
+    The first candle is the bucket containing the window start, so it may
+    include samples slightly older than the cutoff.
+    """
+    asset_row = lookup_asset(db, asset.upper())
     if asset_row is None:
         raise HTTPException(status_code=404, detail="asset not found")
+    since = bucket_start(_cutoff_or_400(window), INTERVALS[interval])
+    # Candles change exactly when raw samples in their range do
+    validator = db.execute(_window_validator(asset_row.id, since)).one()
+    etag = make_etag("candles", asset_row.id, interval, window, *validator)
+    if matches(request, etag):
+        return not_modified(etag)
+    rows = db.connection().execute(_candles_query(asset_row.id, interval, since))
+    return _candles_response(rows, etag)
 
-    try:
-        cutoff = _parse_window_to_cutoff(window)
-    except Exception:
-        raise HTTPException(status_code=400, detail="invalid window")
-    rows = (
-        db.execute(
-            select(PriceHistory)
-            .where(PriceHistory.asset_id == asset_row.id)
-            .where(PriceHistory.ts >= cutoff)
-            .order_by(PriceHistory.ts)
+
+@async_router.get("/candles", response_model=List[Candle])
+async def get_candles_async(
+    request: Request,
+    asset: str = Query(..., min_length=2, max_length=20),
+    interval: Literal["1m", "5m", "1h", "1d"] = Query("1h"),
+    window: str = Query("24h", description="e.g., 24h, 1h, 7d or minutes"),
+    db: AsyncSession = Depends(get_async_session),
+) -> Any:
+    asset_row = await lookup_asset_async(db, asset.upper())
+    if asset_row is None:
+        raise HTTPException(status_code=404, detail="asset not found")
+    since = bucket_start(_cutoff_or_400(window), INTERVALS[interval])
+    validator = (await db.execute(_window_validator(asset_row.id, since))).one()
+    etag = make_etag("candles", asset_row.id, interval, window, *validator)
+    if matches(request, etag):
+        return not_modified(etag)
+    rows = await db.execute(_candles_query(asset_row.id, interval, since))
+    return _candles_response(rows, etag)
+
+
+def _candles_query(asset_id: int, interval: str, since: datetime) -> Select[Any]:
+    return (
+        select(
+            PriceCandle.bucket_start,
+            cast(PriceCandle.open, Float),
+            cast(PriceCandle.high, Float),
+            cast(PriceCandle.low, Float),
+            cast(PriceCandle.close, Float),
+            PriceCandle.count,
+            cast(PriceCandle.price_sum, Float),
+        )
+        .where(
+            PriceCandle.asset_id == asset_id,
+            PriceCandle.interval == interval,
+            PriceCandle.bucket_start >= since,
         )
-        .scalars()
-        .all()
-    )
-    if not rows:
-        return PriceSummary(points=0, first=None, last=None, min=None, max=None, avg=None)
-    prices = [float(r.price) for r in rows]
-    first = prices[0]
-    last = prices[-1]
-    mn = min(prices)
-    mx = max(prices)
-    avg = sum(prices) / len(prices)
-    return PriceSummary(points=len(prices), first=first, last=last, min=mn, max=mx, avg=avg)
+        .order_by(PriceCandle.bucket_start)
+    )
+
+
+def _candles_response(rows: Any, etag: str) -> FastJSONResponse:
+    return FastJSONResponse(
+        [
+            {
+                "ts": ts,
+                "open": o,
+                "high": h,
+                "low": lo,
+                "close": c,
+                "count": n,
+                "avg": total / n,
+            }
+            for ts, o, h, lo, c, n, total in rows
+        ],
+        headers=cache_headers(etag),
+    )
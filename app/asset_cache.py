@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, NamedTuple, Optional, Tuple
+
+from prometheus_client import Counter
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models import Asset
+
+
+ASSET_CACHE_HITS = Counter("asset_cache_hits_total", "Symbol lookups served from cache")
+ASSET_CACHE_MISSES = Counter(
+    "asset_cache_misses_total", "Symbol lookups that went to the database"
+)
+
+
+class AssetRef(NamedTuple):
+    """The few asset columns hot paths need, detached from any session."""
+
+    id: int
+    symbol: str
+    alert_pct: float | None
+    alert_window_min: int | None
+    deadband_pct: float | None = None
+    deadband_heartbeat_min: int | None = None
+    alert_cooldown_min: int | None = None
+    alert_hysteresis_pct: float | None = None
+
+
+def asset_ref(asset: Asset) -> AssetRef:
+    """Detached snapshot of an `Asset` row, safe to cache across sessions."""
+    return AssetRef(
+        id=asset.id,
+        symbol=asset.symbol,
+        alert_pct=float(asset.alert_pct) if asset.alert_pct is not None else None,
+        alert_window_min=asset.alert_window_min,
+        deadband_pct=(
+            float(asset.deadband_pct) if asset.deadband_pct is not None else None
+        ),
+        deadband_heartbeat_min=asset.deadband_heartbeat_min,
+        alert_cooldown_min=asset.alert_cooldown_min,
+        alert_hysteresis_pct=(
+            float(asset.alert_hysteresis_pct)
+            if asset.alert_hysteresis_pct is not None
+            else None
+        ),
+    )
+
+
+class AssetCache:
+    """Bounded TTL/LRU cache mapping symbol -> AssetRef.
+
+    Keys include the database URL, minus the driver, so tests (or processes)
+    that switch DATABASE_URL never see ids from another database, while the
+    sync and async engines of one database share entries. Only hits are cached:
+    unknown symbols always go to the database, so a freshly created asset is
+    visible immediately. Nothing invalidates an entry when the asset's config
+    (alert_*, deadband_*) changes: staleness is bounded by `ttl_seconds`
+    (ASSET_CACHE_TTL_SECONDS).
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 1024,
+        ttl_seconds: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._data: OrderedDict[Tuple[str, str], Tuple[float, AssetRef]] = OrderedDict()
+
+    @staticmethod
+    def _key(db: Session | AsyncSession, symbol: str) -> Tuple[str, str]:
+        url = db.get_bind().engine.url
+        return (str(url.set(drivername=url.get_backend_name())), symbol.upper())
+
+    def get(self, db: Session, symbol: str) -> Optional[AssetRef]:
+        key = self._key(db, symbol)
+        now = self._clock()
+        ref = self._lookup(key, now)
+        if ref is not None:
+            return ref
+        asset = db.execute(
+            select(Asset).where(Asset.symbol == key[1])
+        ).scalar_one_or_none()
+        return self._loaded(key, asset, now)
+
+    async def aget(self, db: AsyncSession, symbol: str) -> Optional[AssetRef]:
+        """`get` for the async API; shares entries and counters with it."""
+        key = self._key(db, symbol)
+        now = self._clock()
+        ref = self._lookup(key, now)
+        if ref is not None:
+            return ref
+        asset = (
+            await db.execute(select(Asset).where(Asset.symbol == key[1]))
+        ).scalar_one_or_none()
+        return self._loaded(key, asset, now)
+
+    def _lookup(self, key: Tuple[str, str], now: float) -> Optional[AssetRef]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[0] > now:
+                self._data.move_to_end(key)
+                ASSET_CACHE_HITS.inc()
+                return entry[1]
+        ASSET_CACHE_MISSES.inc()
+        return None
+
+    def _loaded(
+        self, key: Tuple[str, str], asset: Asset | None, now: float
+    ) -> Optional[AssetRef]:
+        if asset is None:
+            return None
+        ref = asset_ref(asset)
+        self._store(key, ref, now)
+        return ref
+
+    def _store(self, key: Tuple[str, str], ref: AssetRef, now: float) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = (now + self.ttl_seconds, ref)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, symbol: str | None = None) -> None:
+        """Drop one symbol (for every database) or, with no argument, everything."""
+        with self._lock:
+            if symbol is None:
+                self._data.clear()
+                return
+            sym = symbol.upper()
+            for key in [k for k in self._data if k[1] == sym]:
+                del self._data[key]
+
+
+asset_cache = AssetCache(
+    maxsize=int(os.getenv("ASSET_CACHE_SIZE", "1024")),
+    ttl_seconds=float(os.getenv("ASSET_CACHE_TTL_SECONDS", "60")),
+)
+
+
+def lookup_asset(db: Session, symbol: str) -> Optional[AssetRef]:
+    """Resolve a symbol through the process-wide cache."""
+    return asset_cache.get(db, symbol)
+
+
+async def lookup_asset_async(db: AsyncSession, symbol: str) -> Optional[AssetRef]:
+    """`lookup_asset` for AsyncSession callers."""
+    return await asset_cache.aget(db, symbol)
+
+
+def get_or_create_asset(db: Session, symbol: str) -> AssetRef:
+    """Resolve a symbol, creating a minimal asset row when it does not exist.
+
+    Used by worker tasks so samples for unknown symbols are not dropped.
+    """
+    ref = asset_cache.get(db, symbol)
+    if ref is not None:
+        return ref
+    asset = Asset(symbol=symbol.upper(), name=None)
+    db.add(asset)
+    try:
+        db.commit()
+    except IntegrityError:
+        # Another worker created it first; use that row
+        db.rollback()
+        ref = asset_cache.get(db, symbol)
+        assert ref is not None
+        return ref
+    db.refresh(asset)
+    return asset_ref(asset)
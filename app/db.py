@@ -1,10 +1,16 @@
 from __future__ import annotations
 
 import os
-from typing import Generator, Optional
+from typing import Any, AsyncGenerator, Dict, Generator, Optional
 
 from sqlalchemy import create_engine
-from sqlalchemy.engine import Engine
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.orm import Session, sessionmaker
 
 from .models import Base
@@ -12,6 +18,11 @@ from .models import Base
 
 _engine: Optional[Engine] = None
 _engine_url: Optional[str] = None
+_async_engine: Optional[AsyncEngine] = None
+_async_engine_url: Optional[str] = None
+
+# Async driver used for each backend when the API runs with ASYNC_DB enabled
+_ASYNC_DRIVERS = {"postgresql": "asyncpg", "sqlite": "aiosqlite"}
 
 
 def _default_db_url() -> str:
@@ -19,6 +30,19 @@ def _default_db_url() -> str:
     return os.getenv("DATABASE_URL", "sqlite:///./dev.db")
 
 
+def _engine_options(url: str) -> Dict[str, Any]:
+    """Shared engine kwargs; DB_POOL_SIZE/DB_MAX_OVERFLOW size the pool.
+
+    Keep DB_POOL_SIZE + DB_MAX_OVERFLOW above the request concurrency you
+    expect; in async mode the pool, not the threadpool, bounds it.
+    """
+    options: Dict[str, Any] = {"pool_pre_ping": True}
+    if make_url(url).database not in (None, "", ":memory:"):
+        options["pool_size"] = int(os.getenv("DB_POOL_SIZE", "5"))
+        options["max_overflow"] = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    return options
+
+
 def get_engine() -> Engine:
     """Return a process-wide Engine, recreating it when DATABASE_URL changes.
 
@@ -27,7 +51,7 @@ def get_engine() -> Engine:
     global _engine, _engine_url
     current_url = _default_db_url()
     if _engine is None or _engine_url != current_url:
-        _engine = create_engine(current_url, pool_pre_ping=True)
+        _engine = create_engine(current_url, **_engine_options(current_url))
         _engine_url = current_url
     return _engine
 
@@ -47,6 +71,41 @@ def get_session() -> Generator[Session, None, None]:
         db.close()
 
 
+def async_db_url(url: str) -> str:
+    """Rewrite a sync DATABASE_URL to the matching async driver.
+
+    e.g. postgresql+psycopg://... -> postgresql+asyncpg://...,
+    sqlite:///x.db -> sqlite+aiosqlite:///x.db. Unknown backends are kept as-is.
+    """
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    driver = _ASYNC_DRIVERS.get(backend)
+    if driver is None:
+        return url
+    return parsed.set(drivername=f"{backend}+{driver}").render_as_string(
+        hide_password=False
+    )
+
+
+def get_async_engine() -> AsyncEngine:
+    """Async counterpart of `get_engine`, derived from the same DATABASE_URL."""
+    global _async_engine, _async_engine_url
+    current_url = async_db_url(_default_db_url())
+    if _async_engine is None or _async_engine_url != current_url:
+        _async_engine = create_async_engine(current_url, **_engine_options(current_url))
+        _async_engine_url = current_url
+    return _async_engine
+
+
+async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
+    """Yield an AsyncSession; the dependency used by the async routers."""
+    SessionLocal = async_sessionmaker(
+        bind=get_async_engine(), autoflush=False, expire_on_commit=False
+    )
+    async with SessionLocal() as db:
+        yield db
+
+
 def create_all() -> None:
     """Create all tables using SQLAlchemy metadata (useful for tests/dev)."""
     Base.metadata.create_all(bind=get_engine())
@@ -0,0 +1,145 @@
+"""Deadband (change-only) storage for live price samples.
+
+With a deadband configured for an asset, a fetched sample is written only if
+it moved more than `deadband_pct` percent away from the last *stored* price,
+or if `deadband_heartbeat_min` minutes have passed since that row. The stored
+series is then a step function: between two rows the price stayed within the
+band of the earlier one, and the heartbeat bounds how stale a row can get.
+Reads of a window include the last row at or before its start (see
+`app.api.prices`) so that step is never cut off.
+
+Per-asset columns override the global DEADBAND_PCT (unset: no deadband) and
+DEADBAND_HEARTBEAT_MINUTES (default 60). Only the live ingestion paths are
+filtered; backfill and seeding store what upstream returned.
+"""
+
+from __future__ import annotations
+
+import os
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from prometheus_client import Counter
+from sqlalchemy import select
+from sqlalchemy.orm import Session, aliased
+
+from app.asset_cache import AssetRef
+from app.models import Asset, PriceHistory
+
+Sample = Tuple[int, datetime, float]
+
+ASSETS_PER_QUERY = 1000
+
+DEADBAND_SKIPPED = Counter(
+    "price_samples_deadband_skipped_total",
+    "Fetched samples not stored because they stayed inside the deadband",
+)
+
+
+class Deadband(NamedTuple):
+    pct: float
+    heartbeat: timedelta
+
+
+def _default_pct() -> Optional[float]:
+    raw = os.getenv("DEADBAND_PCT", "").strip()
+    return float(raw) if raw else None
+
+
+def _default_heartbeat_min() -> int:
+    return int(os.getenv("DEADBAND_HEARTBEAT_MINUTES", "60"))
+
+
+def _resolve(pct: Optional[float], heartbeat_min: Optional[int]) -> Optional[Deadband]:
+    if pct is None:
+        pct = _default_pct()
+    if pct is None or pct < 0:
+        return None
+    minutes = heartbeat_min if heartbeat_min is not None else _default_heartbeat_min()
+    return Deadband(float(pct), timedelta(minutes=max(1, minutes)))
+
+
+def settings_for(asset: AssetRef) -> Optional[Deadband]:
+    """Effective deadband for an asset, or None when every sample is stored."""
+    return _resolve(asset.deadband_pct, asset.deadband_heartbeat_min)
+
+
+def enabled_globally() -> bool:
+    return _default_pct() is not None
+
+
+def _outside_band(
+    band: Deadband, last_ts: datetime, last: float, ts: datetime, price: float
+) -> bool:
+    if ts - last_ts >= band.heartbeat:
+        return True
+    if band.pct == 0 or last == 0:
+        return price != last
+    return abs(price - last) * 100.0 > band.pct * abs(last)
+
+
+def _last_stored(
+    db: Session, asset_ids: Sequence[int]
+) -> Dict[int, Tuple[Optional[Deadband], Optional[datetime], Optional[float]]]:
+    """Deadband and newest stored row per asset; one seek per asset via the index."""
+    found: Dict[
+        int, Tuple[Optional[Deadband], Optional[datetime], Optional[float]]
+    ] = {}
+    only_configured = not enabled_globally()
+    for offset in range(0, len(asset_ids), ASSETS_PER_QUERY):
+        chunk = asset_ids[offset : offset + ASSETS_PER_QUERY]
+        ts_q, price_q = aliased(PriceHistory), aliased(PriceHistory)
+        q = select(
+            Asset.id,
+            Asset.deadband_pct,
+            Asset.deadband_heartbeat_min,
+            select(ts_q.ts)
+            .where(ts_q.asset_id == Asset.id)
+            .order_by(ts_q.ts.desc())
+            .limit(1)
+            .scalar_subquery(),
+            select(price_q.price)
+            .where(price_q.asset_id == Asset.id)
+            .order_by(price_q.ts.desc())
+            .limit(1)
+            .scalar_subquery(),
+        ).where(Asset.id.in_(chunk))
+        if only_configured:
+            # Nothing to compare against for assets without a deadband
+            q = q.where(Asset.deadband_pct.is_not(None))
+        for asset_id, pct, heartbeat_min, ts, price in db.execute(q):
+            band = _resolve(float(pct) if pct is not None else None, heartbeat_min)
+            found[asset_id] = (band, ts, float(price) if price is not None else None)
+    return found
+
+
+def filter_samples(db: Session, samples: Iterable[Sample]) -> List[Sample]:
+    """Drop samples inside their asset's deadband; keeps the input order.
+
+    Samples for one asset are judged in timestamp order against the last row
+    kept so far (stored or from this batch). Samples older than the newest
+    stored row are kept: they fill history rather than extend it.
+    """
+    rows = list(samples)
+    if not rows:
+        return rows
+    state = _last_stored(db, sorted({asset_id for asset_id, _, _ in rows}))
+    if not state:
+        return rows
+    keep = [True] * len(rows)
+    for i in sorted(range(len(rows)), key=lambda i: (rows[i][0], rows[i][1])):
+        asset_id, ts, price = rows[i]
+        band, last_ts, last = state.get(asset_id, (None, None, None))
+        if band is None:
+            continue
+        if last_ts is not None and last is not None:
+            if ts <= last_ts:
+                continue
+            if not _outside_band(band, last_ts, last, ts, price):
+                keep[i] = False
+                continue
+        state[asset_id] = (band, ts, price)
+    kept = [row for row, k in zip(rows, keep) if k]
+    if len(kept) < len(rows):
+        DEADBAND_SKIPPED.inc(len(rows) - len(kept))
+    return kept
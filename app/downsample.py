@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import List, Sequence, Tuple
+
+Point = Tuple[datetime, float]
+
+
+def lttb(points: Sequence[Point], threshold: int) -> List[Point]:
+    """Downsample a time series with Largest-Triangle-Three-Buckets.
+
+    Keeps the first and last points and, for each bucket in between, the point
+    forming the largest triangle with its neighbours. That preserves the visual
+    shape (spikes, dips) of a chart while bounding the number of points.
+    """
+    n = len(points)
+    if threshold >= n or threshold < 3:
+        return list(points)
+
+    xs = [p[0].timestamp() for p in points]
+    ys = [p[1] for p in points]
+    sampled: List[Point] = [points[0]]
+    bucket_size = (n - 2) / (threshold - 2)
+    a = 0  # index of the previously selected point
+    for i in range(threshold - 2):
+        start = int(i * bucket_size) + 1
+        end = int((i + 1) * bucket_size) + 1
+        # Average of the next bucket acts as the third triangle vertex
+        next_start = end
+        next_end = min(int((i + 2) * bucket_size) + 1, n)
+        if next_start >= next_end:
+            avg_x, avg_y = xs[-1], ys[-1]
+        else:
+            span = next_end - next_start
+            avg_x = sum(xs[next_start:next_end]) / span
+            avg_y = sum(ys[next_start:next_end]) / span
+
+        best = start
+        best_area = -1.0
+        ax, ay = xs[a], ys[a]
+        for j in range(start, end):
+            area = abs((ax - avg_x) * (ys[j] - ay) - (ax - xs[j]) * (avg_y - ay))
+            if area > best_area:
+                best_area = area
+                best = j
+        sampled.append(points[best])
+        a = best
+    sampled.append(points[-1])
+    return sampled
+
+
+def minmax(points: Sequence[Point], threshold: int) -> List[Point]:
+    """Downsample by keeping the min and max of each bucket (in time order).
+
+    Unlike LTTB this guarantees that the global extremes survive, at the cost
+    of a slightly noisier line.
+    """
+    n = len(points)
+    if threshold >= n or threshold < 4:
+        return list(points)
+
+    buckets = (threshold - 2) // 2
+    inner = points[1:-1]
+    size = len(inner) / buckets
+    sampled: List[Point] = [points[0]]
+    for i in range(buckets):
+        chunk = inner[int(i * size) : int((i + 1) * size)]
+        if not chunk:
+            continue
+        lo = min(range(len(chunk)), key=lambda k: chunk[k][1])
+        hi = max(range(len(chunk)), key=lambda k: chunk[k][1])
+        for k in sorted({lo, hi}):
+            sampled.append(chunk[k])
+    sampled.append(points[-1])
+    return sampled
+
+
+def downsample(
+    points: Sequence[Point], max_points: int, mode: str = "lttb"
+) -> List[Point]:
+    """Dispatch to the requested downsampling algorithm."""
+    if mode == "minmax":
+        return minmax(points, max_points)
+    if mode == "lttb":
+        return lttb(points, max_points)
+    raise ValueError(f"unknown downsampling mode: {mode}")
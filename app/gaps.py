@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from typing import List, Tuple
+
+from sqlalchemy import ColumnElement, Float, cast, func, literal, select, union_all
+from sqlalchemy.orm import Session
+
+from app.models import PriceHistory
+
+Gap = Tuple[datetime, datetime]
+
+
+def _epoch_seconds(
+    expr: ColumnElement[datetime], dialect_name: str
+) -> ColumnElement[float]:
+    """Seconds since the Unix epoch for a timestamp column, per backend."""
+    if dialect_name == "sqlite":
+        # SQLite stores DateTime as ISO text; julianday() parses it
+        return (func.julianday(expr) - 2440587.5) * 86400.0
+    return cast(func.extract("epoch", expr), Float)
+
+
+def find_gaps(
+    db: Session,
+    asset_id: int,
+    start: datetime,
+    end: datetime,
+    max_gap_seconds: float,
+) -> List[Gap]:
+    """Ranges in [start, end] with no samples for longer than `max_gap_seconds`.
+
+    One windowed query: the asset's timestamps in the window plus two sentinel
+    rows (start and end), each paired with its predecessor via LAG(); pairs
+    further apart than the threshold are the gaps. A missing head (history too
+    short) or tail (worker was down until now) shows up like any hole in the
+    middle; an empty window is one gap covering all of it.
+    """
+    ts_type = PriceHistory.ts.type
+    stamps = union_all(
+        select(PriceHistory.ts.label("ts")).where(
+            PriceHistory.asset_id == asset_id,
+            PriceHistory.ts >= start,
+            PriceHistory.ts <= end,
+        ),
+        select(literal(start, ts_type).label("ts")),
+        select(literal(end, ts_type).label("ts")),
+    ).subquery()
+    pairs = select(
+        func.lag(stamps.c.ts, type_=ts_type)
+        .over(order_by=stamps.c.ts)
+        .label("prev_ts"),
+        stamps.c.ts,
+    ).subquery()
+    dialect_name = db.get_bind().dialect.name
+    width = _epoch_seconds(pairs.c.ts, dialect_name) - _epoch_seconds(
+        pairs.c.prev_ts, dialect_name
+    )
+    rows = db.execute(
+        select(pairs.c.prev_ts, pairs.c.ts)
+        .where(pairs.c.prev_ts.is_not(None), width > max_gap_seconds)
+        .order_by(pairs.c.ts)
+    ).all()
+    return merge_gaps([(prev, ts) for prev, ts in rows], max_gap_seconds)
+
+
+def merge_gaps(gaps: List[Gap], within_seconds: float) -> List[Gap]:
+    """Join gaps separated by less than `within_seconds` into one fetch range."""
+    merged: List[Gap] = []
+    slack = timedelta(seconds=within_seconds)
+    for gap_start, gap_end in gaps:
+        if merged and gap_start - merged[-1][1] < slack:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], gap_end))
+        else:
+            merged.append((gap_start, gap_end))
+    return merged
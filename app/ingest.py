@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Iterable, List, Sequence, Tuple
+
+from sqlalchemy import Insert, insert
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.models import PriceHistory
+
+INSERT_CHUNK_ROWS = 5_000
+
+
+def _insert_ignoring_duplicates(dialect_name: str) -> Insert:
+    """INSERT ... ON CONFLICT (asset_id, ts) DO NOTHING for the given backend."""
+    if dialect_name == "postgresql":
+        return postgresql.insert(PriceHistory).on_conflict_do_nothing(
+            index_elements=["asset_id", "ts"]
+        )
+    if dialect_name == "sqlite":
+        return sqlite.insert(PriceHistory).on_conflict_do_nothing(
+            index_elements=["asset_id", "ts"]
+        )
+    # Other backends: plain INSERT, duplicates surface as IntegrityError
+    return insert(PriceHistory)
+
+
+def insert_points(
+    db: Session,
+    asset_id: int,
+    points: Iterable[Tuple[datetime, float]],
+    chunk_rows: int = INSERT_CHUNK_ROWS,
+) -> List[Tuple[datetime, float]]:
+    """Bulk-insert samples, skipping ones whose (asset_id, ts) already exists.
+
+    Runs one multi-row INSERT ... RETURNING per chunk and returns exactly the
+    points that were written, so callers get an accurate count and can feed
+    `apply_points` without double-counting duplicates. Caller commits.
+    """
+    samples = ((asset_id, ts, price) for ts, price in points)
+    return [(ts, price) for _, ts, price in insert_samples(db, samples, chunk_rows)]
+
+
+def insert_samples(
+    db: Session,
+    samples: Iterable[Tuple[int, datetime, float]],
+    chunk_rows: int = INSERT_CHUNK_ROWS,
+) -> List[Tuple[int, datetime, float]]:
+    """`insert_points` for (asset_id, ts, price) rows spanning many assets."""
+    stmt = _insert_ignoring_duplicates(db.get_bind().dialect.name).returning(
+        PriceHistory.asset_id, PriceHistory.ts, PriceHistory.price
+    )
+    inserted: List[Tuple[int, datetime, float]] = []
+    chunk: List[dict[str, object]] = []
+    for asset_id, ts, price in samples:
+        chunk.append({"asset_id": asset_id, "ts": ts, "price": price})
+        if len(chunk) >= chunk_rows:
+            inserted.extend(_execute(db, stmt, chunk))
+            chunk = []
+    if chunk:
+        inserted.extend(_execute(db, stmt, chunk))
+    return inserted
+
+
+def _execute(
+    db: Session, stmt: Insert, rows: Sequence[dict[str, object]]
+) -> List[Tuple[int, datetime, float]]:
+    result = db.execute(stmt, rows)
+    return [(asset_id, ts, float(price)) for asset_id, ts, price in result]
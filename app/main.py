@@ -8,9 +8,7 @@ from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 
 from .metrics import metrics_middleware, router as metrics_router
-from .api.assets import router as assets_router
-from .api.prices import router as prices_router
-from .api.alerts import router as alerts_router
+from .api import alerts, assets, prices
 from .ui import router as ui_router
 
 
@@ -46,10 +44,16 @@ def create_app() -> FastAPI:
         # Only expose /metrics when the deployment explicitly enables it.
         application.include_router(metrics_router)
 
-    # Business endpoints
-    application.include_router(assets_router)
-    application.include_router(prices_router)
-    application.include_router(alerts_router)
+    # Business endpoints: `async def` routes on an AsyncSession when ASYNC_DB
+    # is set, so requests waiting on the database do not hold threadpool slots.
+    if _flag("ASYNC_DB"):
+        application.include_router(assets.async_router)
+        application.include_router(prices.async_router)
+        application.include_router(alerts.async_router)
+    else:
+        application.include_router(assets.router)
+        application.include_router(prices.router)
+        application.include_router(alerts.router)
     # UI: static + server-rendered templates
     static_dir = Path(__file__).parent / "static"
     application.mount("/static", StaticFiles(directory=str(static_dir)), name="static")
@@ -1,11 +1,15 @@
 from .asset import Asset
 from .price_history import PriceHistory
+from .price_candle import PriceCandle
 from .alert import Alert
+from .alert_rule import AlertRule
 from .base import Base
 
 __all__ = [
     "Asset",
     "PriceHistory",
+    "PriceCandle",
     "Alert",
+    "AlertRule",
     "Base",
 ]
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from datetime import datetime
 
-from sqlalchemy import ForeignKey, Numeric
+from sqlalchemy import ForeignKey, Index, Numeric
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from typing import TYPE_CHECKING
 
@@ -13,12 +13,26 @@ class Alert(Base):
     __tablename__ = "alerts"
 
     id: Mapped[int] = mapped_column(primary_key=True)
-    asset_id: Mapped[int] = mapped_column(
-        ForeignKey("assets.id", ondelete="CASCADE"), index=True
-    )
+    # No standalone asset_id index: (asset_id, triggered_at) serves it
+    asset_id: Mapped[int] = mapped_column(ForeignKey("assets.id", ondelete="CASCADE"))
+    # Start of the episode; a one-off alert when episodes are off
     triggered_at: Mapped[datetime] = mapped_column(index=True)
     window_minutes: Mapped[int] = mapped_column()
+    # Largest change seen during the episode
     change_pct: Mapped[float] = mapped_column(Numeric(9, 4))
+    # Episode state (see app.alert_episodes); closed_at is NULL while open
+    last_triggered_at: Mapped[datetime | None] = mapped_column(default=None)
+    closed_at: Mapped[datetime | None] = mapped_column(default=None)
+    occurrences: Mapped[int] = mapped_column(default=1, server_default="1")
+    # Set for alerts raised by an AlertRule; change_pct then holds its value
+    rule_id: Mapped[int | None] = mapped_column(
+        ForeignKey("alert_rules.id", ondelete="SET NULL"), default=None
+    )
+
+    __table_args__ = (
+        Index("ix_alerts_asset_triggered", "asset_id", "triggered_at"),
+        Index("ix_alerts_rule_triggered", "rule_id", "triggered_at"),
+    )
 
     if TYPE_CHECKING:  # only for type checkers/linters
         from .asset import Asset
@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+from sqlalchemy import ForeignKey, Numeric, String
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+from typing import TYPE_CHECKING
+
+from .base import Base
+
+
+class AlertRule(Base):
+    """An extra alert rule of an asset, evaluated by `evaluate_alert_rules`."""
+
+    __tablename__ = "alert_rules"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    asset_id: Mapped[int] = mapped_column(
+        ForeignKey("assets.id", ondelete="CASCADE"), index=True
+    )
+    # change | drawdown | volatility | zscore (see worker.rule_engine)
+    kind: Mapped[str] = mapped_column(String(20))
+    window_minutes: Mapped[int] = mapped_column()
+    threshold: Mapped[float] = mapped_column(Numeric(9, 4))
+    # EWMA span in samples (zscore only; default worker.rule_engine.DEFAULT_SPAN)
+    span: Mapped[int | None] = mapped_column(default=None)
+    enabled: Mapped[bool] = mapped_column(default=True, server_default="1")
+
+    if TYPE_CHECKING:  # only for type checkers/linters
+        from .asset import Asset
+
+    asset: Mapped["Asset"] = relationship(backref="alert_rules")
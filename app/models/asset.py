@@ -18,5 +18,13 @@ class Asset(Base):
     # Optional per-asset alert configuration (overrides global ENV when set)
     alert_pct: Mapped[float | None] = mapped_column(Numeric(9, 4), default=None)
     alert_window_min: Mapped[int | None] = mapped_column(default=None)
+    # Optional alert episodes (override ALERT_COOLDOWN_MINUTES / ALERT_HYSTERESIS_PCT)
+    alert_cooldown_min: Mapped[int | None] = mapped_column(default=None)
+    alert_hysteresis_pct: Mapped[float | None] = mapped_column(
+        Numeric(9, 4), default=None
+    )
+    # Optional deadband storage (overrides DEADBAND_PCT / DEADBAND_HEARTBEAT_MINUTES)
+    deadband_pct: Mapped[float | None] = mapped_column(Numeric(9, 4), default=None)
+    deadband_heartbeat_min: Mapped[int | None] = mapped_column(default=None)
 
     # relationships defined in related models to avoid import cycles
@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from sqlalchemy import ForeignKey, Numeric, String, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import Base
+from .price_history import _UTCDateTime
+
+
+class PriceCandle(Base):
+    """OHLC rollup of `price_history` for one asset, interval and bucket.
+
+    `open_ts`/`close_ts` remember which samples produced open/close so points
+    arriving out of order (backfills) can still be merged incrementally.
+    """
+
+    __tablename__ = "price_candles"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    asset_id: Mapped[int] = mapped_column(ForeignKey("assets.id", ondelete="CASCADE"))
+    interval: Mapped[str] = mapped_column(String(4))
+    bucket_start: Mapped[datetime] = mapped_column(_UTCDateTime())
+    open: Mapped[float] = mapped_column(Numeric(18, 8))
+    high: Mapped[float] = mapped_column(Numeric(18, 8))
+    low: Mapped[float] = mapped_column(Numeric(18, 8))
+    close: Mapped[float] = mapped_column(Numeric(18, 8))
+    open_ts: Mapped[datetime] = mapped_column(_UTCDateTime())
+    close_ts: Mapped[datetime] = mapped_column(_UTCDateTime())
+    count: Mapped[int] = mapped_column()
+    # Sum of prices so the average can be derived without touching raw rows
+    price_sum: Mapped[float] = mapped_column(Numeric(28, 8))
+
+    __table_args__ = (
+        UniqueConstraint(
+            "asset_id", "interval", "bucket_start", name="uq_price_candles_bucket"
+        ),
+    )
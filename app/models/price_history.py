@@ -48,15 +48,22 @@ class PriceHistory(Base):
     __tablename__ = "price_history"
 
     id: Mapped[int] = mapped_column(primary_key=True)
-    asset_id: Mapped[int] = mapped_column(
-        ForeignKey("assets.id", ondelete="CASCADE"), index=True
-    )
+    # No standalone asset_id index: the (asset_id, ts) unique index serves
+    # every per-asset lookup. `ts` keeps its own index for retention pruning.
+    asset_id: Mapped[int] = mapped_column(ForeignKey("assets.id", ondelete="CASCADE"))
     # Store timezone-aware timestamps (UTC) and coerce to aware on read
     ts: Mapped[datetime] = mapped_column(_UTCDateTime(), index=True)
     price: Mapped[float] = mapped_column(Numeric(18, 8))
 
     __table_args__ = (
-        UniqueConstraint("asset_id", "ts", name="uq_price_history_asset_ts"),
+        # On Postgres the unique index also carries `price`, so window reads
+        # (asset_id = ? AND ts >= ? ORDER BY ts) are index-only scans.
+        UniqueConstraint(
+            "asset_id",
+            "ts",
+            name="uq_price_history_asset_ts",
+            postgresql_include=["price"],
+        ),
     )
 
     # define relationship to Asset lazily (string ref) to avoid circular import
@@ -0,0 +1,249 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Mapping, Tuple
+
+from sqlalchemy import Insert, case, delete, func, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.models import PriceCandle, PriceHistory
+
+
+# Candle interval name -> bucket width in seconds
+INTERVALS: Dict[str, int] = {"1m": 60, "5m": 300, "1h": 3600, "1d": 86400}
+
+REBUILD_BATCH_ROWS = 10_000
+# Bound on the IN (...) list when loading candles for many assets
+APPLY_ASSETS_PER_QUERY = 1_000
+
+
+def bucket_start(ts: datetime, seconds: int) -> datetime:
+    """Floor a timestamp to its UTC bucket boundary."""
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    epoch = int(ts.timestamp()) // seconds * seconds
+    return datetime.fromtimestamp(epoch, tz=timezone.utc)
+
+
+@dataclass
+class _Agg:
+    open_ts: datetime
+    open: float
+    close_ts: datetime
+    close: float
+    high: float
+    low: float
+    count: int
+    price_sum: float
+
+    @classmethod
+    def of(cls, ts: datetime, price: float) -> "_Agg":
+        return cls(ts, price, ts, price, price, price, 1, price)
+
+    def add(self, ts: datetime, price: float) -> None:
+        if ts < self.open_ts:
+            self.open_ts, self.open = ts, price
+        if ts >= self.close_ts:
+            self.close_ts, self.close = ts, price
+        self.high = max(self.high, price)
+        self.low = min(self.low, price)
+        self.count += 1
+        self.price_sum += price
+
+
+def _aggregate(
+    points: Iterable[Tuple[datetime, float]],
+    aggs: Dict[Tuple[str, datetime], _Agg] | None = None,
+) -> Dict[Tuple[str, datetime], _Agg]:
+    aggs = {} if aggs is None else aggs
+    for ts, price in points:
+        if ts.tzinfo is None:
+            ts = ts.replace(tzinfo=timezone.utc)
+        price = float(price)
+        for name, seconds in INTERVALS.items():
+            key = (name, bucket_start(ts, seconds))
+            agg = aggs.get(key)
+            if agg is None:
+                aggs[key] = _Agg.of(ts, price)
+            else:
+                agg.add(ts, price)
+    return aggs
+
+
+def apply_points(
+    db: Session, asset_id: int, points: Iterable[Tuple[datetime, float]]
+) -> int:
+    """Merge freshly inserted samples into every candle interval.
+
+    Only pass points that were actually inserted (not duplicates skipped by the
+    unique constraint), otherwise counts and sums drift. Leaves committing to
+    the caller, so raw rows and rollups land in the same transaction.
+    Returns the number of candles touched.
+    """
+    return apply_points_many(db, {asset_id: points})
+
+
+def apply_points_many(
+    db: Session, points_by_asset: Mapping[int, Iterable[Tuple[datetime, float]]]
+) -> int:
+    """`apply_points` for many assets at once, e.g. one ingestion tick.
+
+    Aggregates the points per (asset, interval, bucket) in Python and merges
+    them with bulk INSERT ... ON CONFLICT DO UPDATE: counts and sums are added,
+    high/low widened and open/close taken from the earlier/later sample, all
+    inside the statement. Writers sharing a bucket (a seed or backfill next to
+    `fetch_price`) therefore neither lose each other's updates nor trip over
+    `uq_price_candles_bucket` when both create it.
+    """
+    aggs: Dict[Tuple[int, str, datetime], _Agg] = {}
+    for asset_id, points in points_by_asset.items():
+        for (name, bucket), agg in _aggregate(points).items():
+            aggs[(asset_id, name, bucket)] = agg
+    if not aggs:
+        return 0
+    stmt = _upsert(db.get_bind().dialect.name)
+    if stmt is None:
+        _merge_by_select(db, aggs)
+        return len(aggs)
+    rows: List[Dict[str, object]] = [
+        {"asset_id": asset_id, "interval": name, "bucket_start": bucket, **_values(agg)}
+        for (asset_id, name, bucket), agg in aggs.items()
+    ]
+    for offset in range(0, len(rows), REBUILD_BATCH_ROWS):
+        db.execute(stmt, rows[offset : offset + REBUILD_BATCH_ROWS])
+    return len(aggs)
+
+
+def _upsert(dialect_name: str) -> Insert | None:
+    """Bulk upsert of candle aggregates, or None when the backend lacks ON CONFLICT."""
+    if dialect_name == "postgresql":
+        pg = postgresql.insert(PriceCandle)
+        return pg.on_conflict_do_update(**_on_conflict(pg.excluded))
+    if dialect_name == "sqlite":
+        lite = sqlite.insert(PriceCandle)
+        return lite.on_conflict_do_update(**_on_conflict(lite.excluded))
+    return None
+
+
+def _on_conflict(new: Any) -> Dict[str, Any]:
+    """Merge the proposed row (`excluded`) into the stored candle."""
+    old = PriceCandle.__table__.c
+    earlier = new.open_ts < old.open_ts
+    later = new.close_ts >= old.close_ts
+    return {
+        "index_elements": ["asset_id", "interval", "bucket_start"],
+        # Every right-hand side sees the row as it was before the update
+        "set_": {
+            "open": case((earlier, new.open), else_=old.open),
+            "open_ts": case((earlier, new.open_ts), else_=old.open_ts),
+            "close": case((later, new.close), else_=old.close),
+            "close_ts": case((later, new.close_ts), else_=old.close_ts),
+            "high": case((new.high > old.high, new.high), else_=old.high),
+            "low": case((new.low < old.low, new.low), else_=old.low),
+            "count": old.count + new.count,
+            "price_sum": old.price_sum + new.price_sum,
+        },
+    }
+
+
+def _merge_by_select(db: Session, aggs: Dict[Tuple[int, str, datetime], _Agg]) -> None:
+    """Read-modify-write fallback for backends without ON CONFLICT.
+
+    Loads the affected candles with one range query per interval for up to
+    APPLY_ASSETS_PER_QUERY assets; not safe against concurrent writers.
+    """
+    asset_ids = sorted({a for (a, _, _) in aggs})
+    fresh: List[Dict[str, object]] = []
+    for name in INTERVALS:
+        keys = sorted(b for (_, i, b) in aggs if i == name)
+        seen = set()
+        for offset in range(0, len(asset_ids), APPLY_ASSETS_PER_QUERY):
+            existing = db.execute(
+                select(PriceCandle).where(
+                    PriceCandle.asset_id.in_(
+                        asset_ids[offset : offset + APPLY_ASSETS_PER_QUERY]
+                    ),
+                    PriceCandle.interval == name,
+                    PriceCandle.bucket_start >= keys[0],
+                    PriceCandle.bucket_start <= keys[-1],
+                )
+            ).scalars()
+            for candle in existing:
+                key = (candle.asset_id, name, candle.bucket_start)
+                found = aggs.get(key)
+                if found is None:
+                    continue
+                seen.add(key)
+                if found.open_ts < candle.open_ts:
+                    candle.open_ts, candle.open = found.open_ts, found.open
+                if found.close_ts >= candle.close_ts:
+                    candle.close_ts, candle.close = found.close_ts, found.close
+                candle.high = max(float(candle.high), found.high)
+                candle.low = min(float(candle.low), found.low)
+                candle.count += found.count
+                candle.price_sum = float(candle.price_sum) + found.price_sum
+        fresh.extend(
+            {
+                "asset_id": asset_id,
+                "interval": name,
+                "bucket_start": bucket,
+                **_values(agg),
+            }
+            for (asset_id, i, bucket), agg in aggs.items()
+            if i == name and (asset_id, i, bucket) not in seen
+        )
+    for offset in range(0, len(fresh), REBUILD_BATCH_ROWS):
+        db.execute(insert(PriceCandle), fresh[offset : offset + REBUILD_BATCH_ROWS])
+
+
+def _values(agg: _Agg) -> Dict[str, object]:
+    return {
+        "open": agg.open,
+        "high": agg.high,
+        "low": agg.low,
+        "close": agg.close,
+        "open_ts": agg.open_ts,
+        "close_ts": agg.close_ts,
+        "count": agg.count,
+        "price_sum": agg.price_sum,
+    }
+
+
+def rebuild_candles(db: Session, asset_id: int) -> int:
+    """Recompute candles for the range covered by raw history.
+
+    Candles older than the oldest raw sample (e.g. kept after retention pruned
+    `price_history`) are left untouched. Streams raw rows so memory is bounded
+    by the number of candles, not samples. Caller commits.
+    """
+    oldest = db.execute(
+        select(func.min(PriceHistory.ts)).where(PriceHistory.asset_id == asset_id)
+    ).scalar_one()
+    if oldest is None:
+        return 0
+    for name, seconds in INTERVALS.items():
+        db.execute(
+            delete(PriceCandle).where(
+                PriceCandle.asset_id == asset_id,
+                PriceCandle.interval == name,
+                PriceCandle.bucket_start >= bucket_start(oldest, seconds),
+            )
+        )
+    aggs: Dict[Tuple[str, datetime], _Agg] = {}
+    result = db.execute(
+        select(PriceHistory.ts, PriceHistory.price)
+        .where(PriceHistory.asset_id == asset_id)
+        .order_by(PriceHistory.ts),
+        execution_options={"yield_per": REBUILD_BATCH_ROWS},
+    )
+    for batch in result.partitions():
+        _aggregate(batch, aggs)
+    rows: List[Dict[str, object]] = [
+        {"asset_id": asset_id, "interval": name, "bucket_start": bucket, **_values(agg)}
+        for (name, bucket), agg in aggs.items()
+    ]
+    for offset in range(0, len(rows), REBUILD_BATCH_ROWS):
+        db.execute(insert(PriceCandle), rows[offset : offset + REBUILD_BATCH_ROWS])
+    return len(rows)
@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+import json
+from datetime import datetime, timezone
+from typing import Any
+
+from starlette.responses import Response
+
+try:  # orjson is much faster, but keep the API importable without it
+    import orjson
+except ImportError:  # pragma: no cover - exercised only without orjson
+    orjson = None  # type: ignore[assignment]
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        if value.tzinfo is not None and value.utcoffset() == timezone.utc.utcoffset(
+            None
+        ):
+            return value.replace(tzinfo=None).isoformat() + "Z"
+        return value.isoformat()
+    raise TypeError(f"not JSON serializable: {type(value).__name__}")
+
+
+def dumps(obj: Any) -> bytes:
+    """Serialize plain Python data (dicts, lists, floats, datetimes) to JSON bytes.
+
+    UTC datetimes are rendered with a `Z` suffix, matching what Pydantic emits
+    for the same values, so fast-path responses look like the model-based ones.
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_UTC_Z)
+    return json.dumps(obj, default=_default, separators=(",", ":")).encode()
+
+
+class FastJSONResponse(Response):
+    """JSON response that skips FastAPI's response_model validation pass.
+
+    Endpoints build plain dicts from column tuples and return this directly.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
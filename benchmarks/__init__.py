@@ -0,0 +1 @@
+# Stand-alone performance scripts; run as `python -m benchmarks.<name>`.
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Iterator, TypeVar
+
+from sqlalchemy import insert
+from sqlalchemy.engine import Engine
+
+from app.db import create_all, get_engine
+from app.models import Asset, PriceHistory
+
+T = TypeVar("T")
+
+
+@contextmanager
+def bench_database(name: str) -> Iterator[Engine]:
+    """Point DATABASE_URL at a throwaway SQLite file (or BENCH_DATABASE_URL).
+
+    Set BENCH_DATABASE_URL to a dedicated Postgres database to benchmark the
+    production backend; its tables are created but never dropped.
+    """
+    previous = os.environ.get("DATABASE_URL")
+    with tempfile.TemporaryDirectory() as tmp:
+        url = os.getenv("BENCH_DATABASE_URL") or f"sqlite:///{Path(tmp) / name}.db"
+        os.environ["DATABASE_URL"] = url
+        try:
+            create_all()
+            yield get_engine()
+        finally:
+            get_engine().dispose()
+            if previous is None:
+                os.environ.pop("DATABASE_URL", None)
+            else:
+                os.environ["DATABASE_URL"] = previous
+
+
+def create_asset(engine: Engine, symbol: str) -> int:
+    with engine.begin() as conn:
+        result = conn.execute(
+            insert(Asset).values(symbol=symbol, name=None).returning(Asset.id)
+        )
+        return int(result.scalar_one())
+
+
+def seed_series(
+    engine: Engine,
+    asset_id: int,
+    end: datetime,
+    count: int,
+    step_seconds: int = 60,
+    chunk_size: int = 50_000,
+) -> None:
+    """Insert `count` points ending at `end`, `step_seconds` apart."""
+    start = end - timedelta(seconds=step_seconds * (count - 1))
+    for offset in range(0, count, chunk_size):
+        rows = [
+            {
+                "asset_id": asset_id,
+                "ts": start + timedelta(seconds=step_seconds * i),
+                "price": 100.0 + (i % 500) * 0.01,
+            }
+            for i in range(offset, min(offset + chunk_size, count))
+        ]
+        with engine.begin() as conn:
+            conn.execute(insert(PriceHistory), rows)
+
+
+def best_of(fn: Callable[[], T], repeat: int = 3) -> tuple[float, T]:
+    """Return the fastest wall time of `repeat` runs and the last result."""
+    best = float("inf")
+    result: T
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    return best, result
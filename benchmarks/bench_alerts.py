@@ -0,0 +1,113 @@
+"""compute_alerts cost vs. window length and sample density.
+
+Usage: python -m benchmarks.bench_alerts [window_minutes...]
+
+For each window (default 60, 1440 and 10080 minutes) and sample step (60 s and
+10 s) seeds one asset with exactly a window's worth of history and times one
+`compute_alerts` run: the current two-point lookup against the previous
+implementation, which loaded every row of the window as ORM objects to compare
+the first and the last one.
+
+Then seeds ALL_ASSETS assets with two hours of minute samples and compares one
+`compute_alerts` task per asset (what the per-asset beat schedule runs) with a
+single `compute_alerts_all` pass, then warms a `worker.alert_stream.AlertStream`
+from the same rows and times pushing one new sample per asset through it.
+"""
+
+from __future__ import annotations
+
+import sys
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.models import PriceHistory
+from benchmarks._common import bench_database, best_of, create_asset, seed_series
+from worker.alert_stream import AlertStream
+from worker.tasks.alerts import compute_alerts, compute_alerts_all
+
+STEPS_SECONDS = (60, 10)
+ALL_ASSETS = 2_000
+
+
+def _legacy_change(engine: Engine, asset_id: int, window_minutes: int) -> int:
+    # The previous body of compute_alerts, minus the alert insert.
+    start = datetime.now(timezone.utc) - timedelta(minutes=window_minutes)
+    with Session(bind=engine) as db:
+        rows = (
+            db.execute(
+                select(PriceHistory)
+                .where(PriceHistory.asset_id == asset_id, PriceHistory.ts >= start)
+                .order_by(PriceHistory.ts.asc())
+            )
+            .scalars()
+            .all()
+        )
+        if len(rows) < 2:
+            return 0
+        change = (float(rows[-1].price) - float(rows[0].price)) / float(rows[0].price)
+        return int(abs(change) * 100.0 >= 1_000)
+
+
+def main(windows: list[int]) -> None:
+    print(
+        f"{'window':>8} {'step':>5} {'rows':>9} {'two-point (ms)':>15} {'legacy (ms)':>12}"
+    )
+    with bench_database("bench_alerts") as engine:
+        end = datetime.now(timezone.utc)
+        for window in windows:
+            for step in STEPS_SECONDS:
+                count = window * 60 // step
+                symbol = f"W{window}S{step}"
+                asset_id = create_asset(engine, symbol)
+                seed_series(engine, asset_id, end, count, step_seconds=step)
+                # A threshold nothing reaches: time the evaluation, not the insert
+                fast, _ = best_of(
+                    lambda: compute_alerts.run(
+                        symbol, window_minutes=window, threshold_pct=1_000
+                    ),
+                    repeat=5,
+                )
+                slow, _ = best_of(lambda: _legacy_change(engine, asset_id, window))
+                print(
+                    f"{window:>7}m {step:>4}s {count:>9,} {fast * 1000:>15.2f}"
+                    f" {slow * 1000:>12.2f}"
+                )
+
+        _bench_all_assets(engine, end)
+
+
+def _bench_all_assets(engine: Engine, end: datetime) -> None:
+    symbols = [f"ALL{n:05d}" for n in range(ALL_ASSETS)]
+    for symbol in symbols:
+        seed_series(engine, create_asset(engine, symbol), end, 120)
+    # A threshold nothing reaches, so both variants only evaluate
+    per_asset, _ = best_of(
+        lambda: [compute_alerts.run(s, threshold_pct=1_000) for s in symbols],
+        repeat=1,
+    )
+    batched, _ = best_of(lambda: compute_alerts_all.run(symbols, threshold_pct=1_000))
+    print(
+        f"{ALL_ASSETS:,} assets: compute_alerts per asset {per_asset:.2f} s,"
+        f" compute_alerts_all {batched:.2f} s"
+    )
+
+    stream = AlertStream()
+    with Session(bind=engine) as db:
+        warm, loaded = best_of(lambda: stream.warm(db, symbols), repeat=1)
+    ts = datetime.now(timezone.utc)
+    # The last warmed price again: nothing moves, as with the threshold above
+    prices = {s: stream.window(s).last[1] for s in symbols}  # type: ignore[index,union-attr]
+    pushed, _ = best_of(
+        lambda: [stream.push(s, ts, prices[s]) for s in symbols], repeat=1
+    )
+    print(
+        f"{ALL_ASSETS:,} assets: AlertStream warm-up {warm:.2f} s ({loaded:,} rows),"
+        f" one sample per asset {pushed * 1000:.2f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or [60, 1_440, 10_080])
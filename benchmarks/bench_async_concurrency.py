@@ -0,0 +1,119 @@
+"""Compare how many requests the sync and ASYNC_DB API modes keep in flight.
+
+Usage: python -m benchmarks.bench_async_concurrency [requests] [latency_ms]
+
+Fires `requests` concurrent GET /prices/summary calls (default 200) at an
+in-process app. The session dependency first waits `latency_ms` (default 500)
+to stand in for a slow database round trip: the sync mode blocks a threadpool
+thread for it (at most 40 run at once), the async mode only awaits. Reports
+wall time, throughput and the peak number of requests waiting at once.
+
+DB_POOL_SIZE defaults to `requests` so the connection pool never caps either
+mode; only the threadpool limits the sync one.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import sys
+import threading
+import time
+from contextlib import aclosing
+from datetime import datetime, timezone
+from typing import AsyncIterator, Iterator
+
+import httpx
+from fastapi import FastAPI
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.db import get_async_session, get_session
+from benchmarks._common import bench_database, create_asset, seed_series
+
+
+class _Gauge:
+    """Counts callers inside the block and remembers the maximum."""
+
+    def __init__(self) -> None:
+        self.current = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> None:
+        with self._lock:
+            self.current += 1
+            self.peak = max(self.peak, self.current)
+
+    def __exit__(self, *exc: object) -> None:
+        with self._lock:
+            self.current -= 1
+
+
+def _app(async_db: bool, latency: float, gauge: _Gauge) -> FastAPI:
+    from app.main import create_app
+
+    os.environ["ASYNC_DB"] = "true" if async_db else "false"
+    app = create_app()
+
+    def _slow_session() -> Iterator[Session]:
+        with gauge:
+            time.sleep(latency)
+        yield from get_session()
+
+    async def _slow_async_session() -> AsyncIterator[AsyncSession]:
+        with gauge:
+            await asyncio.sleep(latency)
+        async with aclosing(get_async_session()) as sessions:
+            async for db in sessions:
+                yield db
+
+    app.dependency_overrides[get_session] = _slow_session
+    app.dependency_overrides[get_async_session] = _slow_async_session
+    return app
+
+
+async def _fire(app: FastAPI, requests: int) -> float:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench"
+    ) as client:
+        started = time.perf_counter()
+        responses = await asyncio.gather(
+            *(
+                client.get("/prices/summary", params={"asset": "BENCH"})
+                for _ in range(requests)
+            )
+        )
+        elapsed = time.perf_counter() - started
+    assert all(r.status_code == 200 for r in responses)
+    return elapsed
+
+
+def main(requests: int, latency_ms: int) -> None:
+    os.environ.setdefault("DB_POOL_SIZE", str(requests))
+    os.environ.setdefault("DB_MAX_OVERFLOW", "0")
+    previous = os.environ.get("ASYNC_DB")
+    with bench_database("bench_async") as engine:
+        asset_id = create_asset(engine, "BENCH")
+        seed_series(engine, asset_id, datetime.now(timezone.utc), 60)
+        print(f"{'mode':>6} {'wall (s)':>9} {'req/s':>8} {'peak in flight':>15}")
+        for async_db in (False, True):
+            gauge = _Gauge()
+            app = _app(async_db, latency_ms / 1000, gauge)
+            elapsed = asyncio.run(_fire(app, requests))
+            mode = "async" if async_db else "sync"
+            print(
+                f"{mode:>6} {elapsed:>9.3f} {requests / elapsed:>8.0f} {gauge.peak:>15}"
+            )
+    if previous is None:
+        os.environ.pop("ASYNC_DB", None)
+    else:
+        os.environ["ASYNC_DB"] = previous
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 200,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 500,
+    )
@@ -0,0 +1,94 @@
+"""Compare the per-row commit backfill with the bulk ON CONFLICT insert.
+
+Usage: python -m benchmarks.bench_backfill [sizes...]
+
+For each size (default 10,000 and 1,000,000 minute samples) runs
+`backfill_prices` against a fresh asset, then runs it again so every point is
+a duplicate. The previous per-row implementation (one commit per point) is
+timed only up to LEGACY_MAX_POINTS; beyond that it takes too long to be useful.
+"""
+
+from __future__ import annotations
+
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable
+
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+import worker.tasks.prices as prices_tasks
+from app.models import PriceHistory
+from app.rollups import apply_points
+from benchmarks._common import bench_database, create_asset
+
+LEGACY_MAX_POINTS = 20_000
+
+
+def _series(count: int) -> list[tuple[datetime, float]]:
+    end = datetime.now(timezone.utc).replace(second=0, microsecond=0)
+    start = end - timedelta(minutes=count - 1)
+    return [
+        (start + timedelta(minutes=i), 100.0 + (i % 500) * 0.01) for i in range(count)
+    ]
+
+
+def _legacy_backfill(
+    engine: Engine, asset_id: int, points: list[tuple[datetime, float]]
+) -> int:
+    # The previous implementation: add + commit per point, rollback on duplicates.
+    inserted = 0
+    fresh: list[tuple[datetime, float]] = []
+    with Session(bind=engine) as db:
+        for ts, price in points:
+            db.add(PriceHistory(asset_id=asset_id, ts=ts, price=price))
+            try:
+                db.commit()
+                inserted += 1
+                fresh.append((ts, price))
+            except Exception:
+                db.rollback()
+        apply_points(db, asset_id, fresh)
+        db.commit()
+    return inserted
+
+
+def _timed(fn: Callable[..., int], *args: object) -> tuple[float, int]:
+    started = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - started, result
+
+
+def main(sizes: list[int]) -> None:
+    header = f"{'points':>10} {'impl':>7} {'first run (s)':>14} {'rerun (s)':>10}"
+    with bench_database("bench_backfill") as engine:
+        print(header)
+        for n, size in enumerate(sizes):
+            points = _series(size)
+
+            def _fake_chart(
+                symbol: str, hours: int = 24
+            ) -> list[tuple[datetime, float]]:
+                return points
+
+            # Serve the synthetic series instead of calling the upstream
+            prices_tasks._get_market_chart_usd = _fake_chart
+            symbol = f"BULK{n}"
+            create_asset(engine, symbol)
+            first, inserted = _timed(prices_tasks.backfill_prices.run, symbol)
+            rerun, again = _timed(prices_tasks.backfill_prices.run, symbol)
+            assert (inserted, again) == (size, 0)
+            print(f"{size:>10,} {'bulk':>7} {first:>14.3f} {rerun:>10.3f}")
+            if size > LEGACY_MAX_POINTS:
+                print(f"{size:>10,} {'legacy':>7} {'(skipped)':>14} {'':>10}")
+                continue
+            asset_id = create_asset(engine, f"LEGACY{n}")
+            first, inserted = _timed(_legacy_backfill, engine, asset_id, points)
+            rerun, again = _timed(_legacy_backfill, engine, asset_id, points)
+            assert (inserted, again) == (size, 0)
+            print(f"{size:>10,} {'legacy':>7} {first:>14.3f} {rerun:>10.3f}")
+
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or [10_000, 1_000_000])
@@ -0,0 +1,132 @@
+"""Offline ingestion throughput and backoff against the fake exchange.
+
+Usage: python -m benchmarks.bench_ingest [symbols] [latency_ms]
+
+Starts `benchmarks.fake_exchange` in-process with `symbols` synthetic ids
+(default 5,000) and `latency_ms` per request (default 50), sets
+PRICE_SOURCE=fake, and times one full round of:
+
+- fetch_price: one upstream call + commit per symbol (sampled, at most
+  PER_SYMBOL_MAX symbols, then extrapolated);
+- fetch_prices_batch: BATCH_SIZE symbols per call, run one after another;
+- IngestService: concurrent batches and a single bulk flush.
+
+Each mode runs a warm-up round first (it creates the assets) and reports the
+second. A last run puts the service behind a server rate limit it exceeds,
+with smaller batches, and reports how many requests were answered 429 and how
+many symbols got through.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import sys
+import time
+from typing import Callable
+
+from benchmarks._common import bench_database
+from benchmarks.fake_exchange import ExchangeConfig, FakeExchange, start
+
+PER_SYMBOL_MAX = 200
+BATCH_SIZE = 250
+
+
+def _symbols(count: int) -> list[str]:
+    width = max(4, len(str(count - 1)))
+    return [f"SYN{n:0{width}d}" for n in range(count)]
+
+
+def _ingest_round(
+    symbols: list[str], batch_size: int = BATCH_SIZE, rate: float = 60_000
+) -> int:
+    from worker.ingest_service import IngestService
+
+    async def _run() -> int:
+        service = IngestService(
+            symbols,
+            60,
+            batch_size=batch_size,
+            concurrency=8,
+            rate_per_minute=rate,
+        )
+        await service.tick()
+        return await service.flush()
+
+    return asyncio.run(_run())
+
+
+def _timed(fn: Callable[[], int]) -> tuple[float, int]:
+    fn()  # warm-up: creates the assets
+    started = time.perf_counter()
+    stored = fn()
+    return time.perf_counter() - started, stored
+
+
+def _serve(config: ExchangeConfig) -> FakeExchange:
+    server, url = start(config)
+    os.environ["FAKE_EXCHANGE_URL"] = url
+    return server
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000
+    latency_ms = float(sys.argv[2]) if len(sys.argv) > 2 else 50.0
+    os.environ["PRICE_SOURCE"] = "fake"
+    symbols = _symbols(count)
+
+    from worker.tasks.prices import fetch_price, fetch_prices_batch
+
+    print(f"{count} symbols, {latency_ms:.0f} ms upstream latency")
+    server = _serve(ExchangeConfig(symbols=count, latency_ms=latency_ms))
+    try:
+        sample = symbols[:PER_SYMBOL_MAX]
+        with bench_database("bench_ingest_single"):
+            elapsed, _ = _timed(lambda: len([fetch_price.run(s) for s in sample]))
+        print(
+            f"  fetch_price          {len(sample) / elapsed:9.0f} symbols/s"
+            f"  (~{elapsed / len(sample) * count:.1f} s per round)"
+        )
+
+        def _batches() -> int:
+            return sum(
+                len(fetch_prices_batch.run(symbols[i : i + BATCH_SIZE]))
+                for i in range(0, count, BATCH_SIZE)
+            )
+
+        with bench_database("bench_ingest_batch"):
+            elapsed, stored = _timed(_batches)
+        print(
+            f"  fetch_prices_batch   {stored / elapsed:9.0f} symbols/s  ({elapsed:.2f} s)"
+        )
+
+        with bench_database("bench_ingest_service"):
+            elapsed, stored = _timed(lambda: _ingest_round(symbols))
+        print(
+            f"  IngestService        {stored / elapsed:9.0f} symbols/s  ({elapsed:.2f} s)"
+        )
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    # Server allows 120 req/min (burst 20); the service asks for far more
+    server = _serve(
+        ExchangeConfig(symbols=count, latency_ms=latency_ms, rate_limit=120)
+    )
+    try:
+        with bench_database("bench_ingest_throttled"):
+            started = time.perf_counter()
+            stored = _ingest_round(symbols, batch_size=50)
+            elapsed = time.perf_counter() - started
+        stats = server.stats
+        print(
+            f"  throttled (120/min)  {stored}/{count} symbols stored in {elapsed:.2f} s,"
+            f" {stats['throttled']}/{stats['requests']} requests answered 429"
+        )
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Compare the ORM-based /prices/summary with the SQL-aggregate version.
+
+Usage: python -m benchmarks.bench_price_summary [max_rows]
+
+Seeds one asset with `max_rows` minute samples (default 1,000,000) and then
+times both implementations for windows covering a growing share of them.
+"""
+
+from __future__ import annotations
+
+import sys
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.api.prices import PriceSummary, _summary_for
+from app.models import PriceHistory
+from benchmarks._common import bench_database, best_of, create_asset, seed_series
+
+
+def _orm_summary(db: Session, asset_id: int, cutoff: datetime) -> PriceSummary:
+    # The previous implementation: hydrate every row, aggregate in Python.
+    rows = (
+        db.execute(
+            select(PriceHistory)
+            .where(PriceHistory.asset_id == asset_id)
+            .where(PriceHistory.ts >= cutoff)
+            .order_by(PriceHistory.ts)
+        )
+        .scalars()
+        .all()
+    )
+    prices = [float(r.price) for r in rows]
+    return PriceSummary(
+        points=len(prices),
+        first=prices[0],
+        last=prices[-1],
+        min=min(prices),
+        max=max(prices),
+        avg=sum(prices) / len(prices),
+    )
+
+
+def main(max_rows: int) -> None:
+    now = datetime.now(timezone.utc)
+    with bench_database("bench_summary") as engine:
+        asset_id = create_asset(engine, "BENCH")
+        seed_series(engine, asset_id, now, max_rows)
+        print(f"{'rows in window':>15} {'orm (s)':>10} {'sql (s)':>10} {'speedup':>8}")
+        window = 1_000
+        while window <= max_rows:
+            cutoff = now - timedelta(minutes=window - 1)
+            with Session(bind=engine) as db:
+                orm_s, _ = best_of(lambda: _orm_summary(db, asset_id, cutoff))
+                db.expunge_all()
+                sql_s, summary = best_of(lambda: _summary_for(db, asset_id, cutoff))
+            assert summary.points == window
+            print(f"{window:>15,} {orm_s:>10.4f} {sql_s:>10.4f} {orm_s / sql_s:>7.1f}x")
+            window *= 10
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
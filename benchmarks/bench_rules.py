@@ -0,0 +1,89 @@
+"""evaluate_alert_rules: 1,000 assets x 10 rules against one fetch interval.
+
+Usage: python -m benchmarks.bench_rules [assets] [hours]
+
+Seeds `assets` assets (default 1,000) with `hours` of minute samples (default
+24) and ten rules each: change 60/240 min, drawdown 60/240/1440, volatility
+60/1440 and zscore 60/240/1440. Times the phases of one pass (rule lookup,
+series load, vectorized evaluation) and the whole task, with thresholds no
+rule reaches so only the evaluation is measured, and compares the total with
+FETCH_INTERVAL_SECONDS (default 300).
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+from datetime import datetime, timezone
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.models import AlertRule
+from benchmarks._common import bench_database, best_of, create_asset, seed_series
+from worker import rule_engine
+from worker.tasks.alerts import evaluate_alert_rules
+
+RULES = [
+    ("change", 60),
+    ("change", 240),
+    ("drawdown", 60),
+    ("drawdown", 240),
+    ("drawdown", 1_440),
+    ("volatility", 60),
+    ("volatility", 1_440),
+    ("zscore", 60),
+    ("zscore", 240),
+    ("zscore", 1_440),
+]
+
+
+def main(assets: int, hours: int) -> None:
+    interval = float(os.getenv("FETCH_INTERVAL_SECONDS", "300"))
+    with bench_database("bench_rules") as engine:
+        end = datetime.now(timezone.utc)
+        ids = [create_asset(engine, f"RUL{n:05d}") for n in range(assets)]
+        for asset_id in ids:
+            seed_series(engine, asset_id, end, hours * 60)
+        with engine.begin() as conn:
+            conn.execute(
+                insert(AlertRule),
+                [
+                    {
+                        "asset_id": a,
+                        "kind": kind,
+                        "window_minutes": window,
+                        "threshold": 10_000,
+                    }
+                    for a in ids
+                    for kind, window in RULES
+                ],
+            )
+
+        now = datetime.now(timezone.utc)
+        with Session(bind=engine) as db:
+            t_rules, rules = best_of(lambda: rule_engine.load_rules(db), repeat=1)
+            t_load, series = best_of(
+                lambda: rule_engine.load_series(db, rules, now), repeat=1
+            )
+        t_eval, _ = best_of(lambda: rule_engine.evaluate(series, rules, now))
+        total, created = best_of(lambda: evaluate_alert_rules.run(), repeat=1)
+
+    print(
+        f"{assets:,} assets x {len(RULES)} rules, {len(series.price):,} rows"
+        f" ({hours} h of minute samples)"
+    )
+    print(f"  load_rules   {t_rules * 1000:9.1f} ms")
+    print(f"  load_series  {t_load * 1000:9.1f} ms")
+    print(f"  evaluate     {t_eval * 1000:9.1f} ms")
+    print(
+        f"  task total   {total * 1000:9.1f} ms ({created} alerts),"
+        f" {total / interval:.1%} of a {interval:.0f} s fetch interval"
+    )
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 1_000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 24,
+    )
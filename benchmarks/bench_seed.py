@@ -0,0 +1,76 @@
+"""Synthetic seeding throughput: NumPy walk + bulk insert vs. the previous loop.
+
+Usage: python -m benchmarks.bench_seed [assets] [points_per_asset]
+
+Seeds `assets` synthetic assets (default 20) with `points_per_asset` minute
+samples each (default 1,000,000) via `seed_synthetic_assets`, then times the
+previous implementation (random.Random walk, add + commit per row) on a single
+asset with at most LEGACY_MAX_POINTS points for comparison.
+"""
+
+from __future__ import annotations
+
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+import worker.tasks.seed as seed_tasks
+from app.models import PriceHistory
+from app.rollups import apply_points
+from benchmarks._common import bench_database, create_asset
+
+LEGACY_MAX_POINTS = 20_000
+
+
+def _legacy_seed(engine: Engine, symbol: str, points: int) -> int:
+    # The previous seed_mock_prices body: one commit per generated sample.
+    asset_id = create_asset(engine, symbol)
+    end = datetime.now(timezone.utc)
+    start = end - timedelta(minutes=points - 1)
+    base = seed_tasks._baseline_for_symbol(symbol)
+    seed = sum(ord(c) for c in symbol)
+    inserted = 0
+    fresh: list[tuple[datetime, float]] = []
+    with Session(bind=engine) as db:
+        for ts, price in seed_tasks._gen_series(start, end, 60, base, seed):
+            db.add(PriceHistory(asset_id=asset_id, ts=ts, price=price))
+            try:
+                db.commit()
+                inserted += 1
+                fresh.append((ts, price))
+            except Exception:
+                db.rollback()
+        apply_points(db, asset_id, fresh)
+        db.commit()
+    return inserted
+
+
+def main(assets: int, points: int) -> None:
+    impl = "numpy" if seed_tasks.np is not None else "pure Python (numpy missing)"
+    with bench_database("bench_seed") as engine:
+        hours = points // 60
+        started = time.perf_counter()
+        total = seed_tasks.seed_synthetic_assets.run(
+            assets, hours=hours, interval_seconds=60
+        )
+        elapsed = time.perf_counter() - started
+        print(
+            f"bulk ({impl}): {total:,} rows for {assets} assets in {elapsed:.1f}s"
+            f" ({total / elapsed:,.0f} rows/s)"
+        )
+        legacy_points = min(points, LEGACY_MAX_POINTS)
+        started = time.perf_counter()
+        inserted = _legacy_seed(engine, "LEGACY", legacy_points)
+        elapsed = time.perf_counter() - started
+        print(
+            f"legacy: {inserted:,} rows for 1 asset in {elapsed:.1f}s"
+            f" ({inserted / elapsed:,.0f} rows/s)"
+        )
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:]]
+    main(args[0] if args else 20, args[1] if len(args) > 1 else 1_000_000)
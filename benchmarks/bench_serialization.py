@@ -0,0 +1,104 @@
+"""Rows/sec of the /prices/ and /alerts/ serialization paths.
+
+Usage: python -m benchmarks.bench_serialization [rows]
+
+"before" reproduces the previous path: ORM entities, `model_validate` per row
+and FastAPI's second response_model validation + JSON encoding. "after" is the
+current one: Core column tuples serialized straight to bytes.
+"""
+
+from __future__ import annotations
+
+import sys
+from datetime import datetime, timedelta, timezone
+from typing import List
+
+from fastapi import Request
+from pydantic import TypeAdapter
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from app.api.alerts import AlertOut, get_alerts
+from app.api.prices import PricePoint, get_prices
+from app.models import Alert, PriceHistory
+from benchmarks._common import bench_database, best_of, create_asset, seed_series
+
+# Endpoints are called directly; an empty request never matches an ETag.
+_REQUEST = Request({"type": "http", "headers": []})
+
+
+def main(rows: int) -> None:
+    now = datetime.now(timezone.utc)
+    with bench_database("bench_serialization") as engine:
+        asset_id = create_asset(engine, "BENCH")
+        seed_series(engine, asset_id, now, rows)
+        with engine.begin() as conn:
+            conn.execute(
+                insert(Alert),
+                [
+                    {
+                        "asset_id": asset_id,
+                        "triggered_at": now - timedelta(minutes=i),
+                        "window_minutes": 60,
+                        "change_pct": 5.0,
+                    }
+                    for i in range(rows)
+                ],
+            )
+
+        prices_adapter = TypeAdapter(List[PricePoint])
+        alerts_adapter = TypeAdapter(List[AlertOut])
+
+        def prices_before() -> bytes:
+            with Session(bind=engine) as db:
+                q = (
+                    select(PriceHistory)
+                    .where(PriceHistory.asset_id == asset_id)
+                    .order_by(PriceHistory.ts)
+                )
+                models = [PricePoint.model_validate(r) for r in db.scalars(q)]
+                return prices_adapter.dump_json(prices_adapter.validate_python(models))
+
+        def prices_after() -> bytes:
+            with Session(bind=engine) as db:
+                response = get_prices(
+                    request=_REQUEST,
+                    asset="BENCH",
+                    window=None,
+                    max_points=None,
+                    mode="lttb",
+                    format="json",
+                    after_ts=None,
+                    limit=None,
+                    db=db,
+                )
+                return bytes(response.body)
+
+        def alerts_before() -> bytes:
+            with Session(bind=engine) as db:
+                q = select(Alert).where(Alert.asset_id == asset_id)
+                models = [AlertOut.model_validate(r) for r in db.scalars(q)]
+                return alerts_adapter.dump_json(alerts_adapter.validate_python(models))
+
+        def alerts_after() -> bytes:
+            with Session(bind=engine) as db:
+                response = get_alerts(
+                    request=_REQUEST, asset="BENCH", limit=rows, db=db
+                )
+                return bytes(response.body)
+
+        print(f"{'path':>10} {'before rows/s':>15} {'after rows/s':>15} {'speedup':>8}")
+        for name, before, after in (
+            ("prices", prices_before, prices_after),
+            ("alerts", alerts_before, alerts_after),
+        ):
+            before_s, _ = best_of(before)
+            after_s, _ = best_of(after)
+            print(
+                f"{name:>10} {rows / before_s:>15,.0f} {rows / after_s:>15,.0f}"
+                f" {before_s / after_s:>7.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
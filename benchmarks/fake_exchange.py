@@ -0,0 +1,227 @@
+"""Local stand-in for the CoinGecko v3 endpoints the worker calls.
+
+Usage: python -m benchmarks.fake_exchange [--port 8900] [--symbols 5000]
+       [--latency-ms 50] [--error-rate 0.01] [--rate-limit 600]
+
+Serves simple/price, coins/{id}/market_chart and coins/{id}/market_chart/range
+for `btc`, `eth` and `syn0000`...: ids are lowercase tickers, which is what
+PRICE_SOURCE=fake sends, and the synthetic names match the assets
+`seed_synthetic_assets` creates. Prices are a deterministic function of id and
+time, so charts and spot prices agree across requests and runs.
+
+Every request waits --latency-ms (+/-50% jitter); --error-rate of them answer
+500; beyond --rate-limit requests per minute (all clients together) the
+server answers 429 with Retry-After. GET /stats returns the counters as JSON.
+
+Point the worker at it with
+PRICE_SOURCE=fake FAKE_EXCHANGE_URL=http://localhost:8900/api/v3
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+import math
+import random
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+
+@dataclass
+class ExchangeConfig:
+    symbols: int = 1000
+    latency_ms: float = 0.0
+    error_rate: float = 0.0
+    rate_limit: int = 0  # requests per minute; 0 = unlimited
+    seed: int = 0
+
+
+def coin_ids(count: int) -> List[str]:
+    width = max(4, len(str(count - 1)))
+    return ["btc", "eth"] + [f"syn{n:0{width}d}" for n in range(count)]
+
+
+def price_at(coin_id: str, ts: float) -> float:
+    """Deterministic price: a daily and an hourly wave plus per-minute noise."""
+    h = zlib.crc32(coin_id.encode())
+    base = 10.0 + h % 990
+    phase = (h >> 10) % 86_400
+    wave = 0.05 * math.sin(2 * math.pi * (ts + phase) / 86_400)
+    wave += 0.01 * math.sin(2 * math.pi * (ts + phase) / 3_600)
+    minute = int(ts) // 60
+    noise = (zlib.crc32(f"{coin_id}:{minute}".encode()) % 2001 - 1000) / 100_000
+    return round(base * (1.0 + wave + noise), 8)
+
+
+def _step_for(span_seconds: float) -> int:
+    # Coarser points for longer spans, like the real API
+    if span_seconds <= 86_400:
+        return 60
+    if span_seconds <= 7 * 86_400:
+        return 300
+    return 3_600
+
+
+class FakeExchange(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], config: ExchangeConfig) -> None:
+        super().__init__(address, _Handler)
+        self.config = config
+        self.known = set(coin_ids(config.symbols))
+        self.stats: Dict[str, int] = {
+            "requests": 0,
+            "ok": 0,
+            "errors": 0,
+            "throttled": 0,
+        }
+        self._lock = threading.Lock()
+        self._rng = random.Random(config.seed)
+        burst = max(1, config.rate_limit // 6)  # ~10s worth of requests
+        self._burst = float(burst)
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+
+    def admit(self) -> Tuple[str, float]:
+        """('ok' | 'throttled' | 'error', retry_after) for the next request."""
+        with self._lock:
+            self.stats["requests"] += 1
+            if self.config.rate_limit > 0:
+                rate = self.config.rate_limit / 60.0
+                now = time.monotonic()
+                self._tokens = min(
+                    self._burst, self._tokens + (now - self._updated) * rate
+                )
+                self._updated = now
+                if self._tokens < 1.0:
+                    self.stats["throttled"] += 1
+                    return "throttled", (1.0 - self._tokens) / rate
+                self._tokens -= 1.0
+            if self._rng.random() < self.config.error_rate:
+                self.stats["errors"] += 1
+                return "error", 0.0
+            self.stats["ok"] += 1
+            return "ok", 0.0
+
+    def latency(self) -> float:
+        with self._lock:
+            jitter = self._rng.uniform(0.5, 1.5)
+        return self.config.latency_ms / 1000.0 * jitter
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: FakeExchange
+
+    def log_message(self, format: str, *args: Any) -> None:
+        return None
+
+    def do_GET(self) -> None:  # noqa: N802 - http.server naming
+        url = urlsplit(self.path)
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        if url.path == "/stats":
+            self._send(200, self.server.stats)
+            return
+        time.sleep(self.server.latency())
+        verdict, retry_after = self.server.admit()
+        if verdict == "throttled":
+            self._send(429, {"status": {"error_code": 429}}, retry_after)
+            return
+        if verdict == "error":
+            self._send(500, {"error": "injected failure"})
+            return
+        parts = url.path.rstrip("/").split("/")
+        if url.path.endswith("/simple/price"):
+            self._send(200, self._simple_price(query))
+        elif len(parts) >= 3 and parts[-3] == "coins" and parts[-1] == "market_chart":
+            self._chart(parts[-2], query, range_=False)
+        elif len(parts) >= 4 and parts[-4] == "coins" and parts[-1] == "range":
+            self._chart(parts[-3], query, range_=True)
+        else:
+            self._send(404, {"error": "not found"})
+
+    def _simple_price(self, query: Dict[str, str]) -> Dict[str, Any]:
+        now = time.time()
+        ids = [i for i in query.get("ids", "").split(",") if i in self.server.known]
+        return {i: {"usd": price_at(i, now)} for i in ids}
+
+    def _chart(self, coin_id: str, query: Dict[str, str], range_: bool) -> None:
+        if coin_id not in self.server.known:
+            self._send(404, {"error": "coin not found"})
+            return
+        try:
+            if range_:
+                start, end = float(query["from"]), float(query["to"])
+            else:
+                end = time.time()
+                start = end - float(query.get("days", "1")) * 86_400
+        except (KeyError, ValueError):
+            self._send(400, {"error": "invalid range"})
+            return
+        step = _step_for(end - start)
+        first = math.ceil(start / step) * step
+        prices = [
+            [t * 1000, price_at(coin_id, t)]
+            for t in range(int(first), int(end) + 1, step)
+        ]
+        self._send(200, {"prices": prices})
+
+    def _send(
+        self, status: int, payload: Any, retry_after: Optional[float] = None
+    ) -> None:
+        body = json.dumps(payload).encode()
+        gzipped = "gzip" in self.headers.get("Accept-Encoding", "") and len(body) > 1024
+        if gzipped:
+            body = gzip.compress(body, compresslevel=1)
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        if gzipped:
+            self.send_header("Content-Encoding", "gzip")
+        if retry_after is not None:
+            self.send_header("Retry-After", str(max(1, math.ceil(retry_after))))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def start(
+    config: ExchangeConfig, host: str = "127.0.0.1", port: int = 0
+) -> Tuple[FakeExchange, str]:
+    """Serve in a daemon thread; returns the server and its API root URL."""
+    server = FakeExchange((host, port), config)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}/api/v3"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--symbols", type=int, default=1000)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit", type=int, default=0)
+    args = parser.parse_args()
+    config = ExchangeConfig(
+        args.symbols, args.latency_ms, args.error_rate, args.rate_limit
+    )
+    server = FakeExchange((args.host, args.port), config)
+    print(
+        f"fake exchange on http://{args.host}:{args.port}/api/v3 ({args.symbols} symbols)"
+    )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
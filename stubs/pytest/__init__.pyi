@@ -1,4 +1,4 @@
-from typing import Optional, overload, Any, ContextManager
+from typing import Optional, overload, Any, ContextManager, NoReturn
 
 class MonkeyPatch:
     def setenv(
@@ -14,3 +14,17 @@ class MonkeyPatch:
 
 # Common helper used in tests
 def raises(*args: Any, **kwargs: Any) -> ContextManager[Any]: ...
+
+class FixtureRequest:
+    param: Any
+
+class _MarkGenerator:
+    def __getattr__(self, name: str) -> Any: ...
+
+mark: _MarkGenerator
+
+def fixture(*args: Any, **kwargs: Any) -> Any: ...
+def skip(reason: str = "", *, allow_module_level: bool = False) -> NoReturn: ...
+def importorskip(
+    modname: str, minversion: Optional[str] = None, reason: Optional[str] = None
+) -> Any: ...
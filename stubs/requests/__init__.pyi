@@ -1,10 +1,19 @@
-from typing import Any, Mapping
+from typing import Any, Mapping, MutableMapping
+
+from .adapters import BaseAdapter
 
 class Response:
     status_code: int
     def raise_for_status(self) -> None: ...
     def json(self) -> Mapping[str, Any]: ...
 
+class Session:
+    headers: MutableMapping[str, str]
+    def mount(self, prefix: str, adapter: BaseAdapter) -> None: ...
+    def get_adapter(self, url: str) -> BaseAdapter: ...
+    def get(self, url: str, *args: Any, **kwargs: Any) -> Response: ...
+    def close(self) -> None: ...
+
 def get(url: str, *args: Any, **kwargs: Any) -> Response: ...
 
 class RequestException(Exception): ...
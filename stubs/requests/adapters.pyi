@@ -0,0 +1,14 @@
+from typing import Any
+
+class BaseAdapter:
+    def close(self) -> None: ...
+
+class HTTPAdapter(BaseAdapter):
+    poolmanager: Any
+    def __init__(
+        self,
+        pool_connections: int = ...,
+        pool_maxsize: int = ...,
+        max_retries: Any = ...,
+        pool_block: bool = ...,
+    ) -> None: ...
@@ -0,0 +1,227 @@
+from __future__ import annotations
+
+import math
+import random
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Optional
+
+import pytest
+from pytest import MonkeyPatch
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+pytest.importorskip("numpy")
+
+Points = list[tuple[datetime, float]]
+
+
+def _setup(monkeypatch: MonkeyPatch, tmp_path: Path) -> None:
+    from app.asset_cache import asset_cache
+    from app.db import create_all
+
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path}/alert_rules.db")
+    for name in ("DEADBAND_PCT", "ALERT_COOLDOWN_MINUTES", "ALERT_THRESHOLD_PCT"):
+        monkeypatch.delenv(name, raising=False)
+    create_all()
+    asset_cache.invalidate()
+
+
+def _reference(
+    kind: str, points: Points, now: datetime, window: int, span: int, carry_in: bool
+) -> Optional[float]:
+    """The rule spelled out one sample at a time."""
+    from worker.rule_engine import ZSCORE_MIN_STD
+
+    start = now - timedelta(minutes=window)
+    inside = [p for ts, p in points if start <= ts <= now]
+    held = [p for ts, p in points if ts <= start]
+    if carry_in and held:
+        inside = [held[-1]] + [p for ts, p in points if start < ts <= now]
+    if kind in ("change", "drawdown") and len(inside) < 2:
+        return None
+    if kind in ("volatility", "zscore") and len(inside) < 3:
+        return None
+    if kind == "change":
+        return (inside[-1] - inside[0]) / inside[0] * 100.0
+    if kind == "drawdown":
+        peak, worst = inside[0], 0.0
+        for p in inside:
+            peak = max(peak, p)
+            worst = max(worst, (peak - p) / peak)
+        return worst * 100.0
+    if kind == "volatility":
+        returns = [math.log(b / a) for a, b in zip(inside, inside[1:])]
+        mean = sum(returns) / len(returns)
+        var = sum((r - mean) ** 2 for r in returns) / (len(returns) - 1)
+        return math.sqrt(var) * 100.0
+    decay = 1.0 - 2.0 / (span + 1.0)
+    before = inside[:-1]
+    weights = [decay ** (len(before) - 1 - i) for i in range(len(before))]
+    mean = sum(w * p for w, p in zip(weights, before)) / sum(weights)
+    var = sum(w * (p - mean) ** 2 for w, p in zip(weights, before)) / sum(weights)
+    if var <= (ZSCORE_MIN_STD * mean) ** 2:
+        return None
+    return (inside[-1] - mean) / math.sqrt(var)
+
+
+def test_evaluate_matches_a_per_rule_reference(
+    monkeypatch: MonkeyPatch, tmp_path: Path
+) -> None:
+    from app.db import get_engine
+    from app.models import AlertRule, Asset, PriceHistory
+    from worker import rule_engine
+
+    _setup(monkeypatch, tmp_path)
+    rng = random.Random(5)
+    now = datetime.now(timezone.utc)
+    series: dict[int, Points] = {}
+    with Session(bind=get_engine()) as db:
+        for n in range(6):
+            asset = Asset(symbol=f"R{n}")
+            if n == 1:
+                asset.deadband_pct = 1.0  # sparse rows: the held one opens windows
+            db.add(asset)
+            db.flush()
+            step = 17 * 60 if n == 1 else rng.choice([30, 60, 90])
+            count = {4: 2, 5: 0}.get(n, 300 * 60 // step)  # 4 and 5: too little data
+            price, points = 100.0, []
+            for k in range(count, 0, -1):
+                price *= 1 + rng.gauss(0, 0.02)
+                points.append((now - timedelta(seconds=k * step - 7), price))
+            series[asset.id] = points
+            db.add_all(
+                PriceHistory(asset_id=asset.id, ts=ts, price=p) for ts, p in points
+            )
+            for kind in rule_engine.KINDS:
+                for window in (15, 60, 240):
+                    db.add(
+                        AlertRule(
+                            asset_id=asset.id,
+                            kind=kind,
+                            window_minutes=window,
+                            threshold=1.0,
+                            span=10 if window == 60 else None,
+                        )
+                    )
+        db.add(AlertRule(asset_id=1, kind="nope", window_minutes=5, threshold=1))
+        db.add(
+            AlertRule(
+                asset_id=1, kind="change", window_minutes=5, threshold=1, enabled=False
+            )
+        )
+        db.commit()
+
+        rules = rule_engine.load_rules(db)
+        assert len(rules) == 6 * 4 * 3  # unknown kinds and disabled rules skipped
+        series_arrays = rule_engine.load_series(db, rules, now)
+        values = rule_engine.evaluate(series_arrays, rules, now)
+
+    checked = 0
+    for rule, value in zip(rules, values.tolist()):
+        expected = _reference(
+            rule.kind,
+            series[rule.asset_id],
+            now,
+            rule.window_minutes,
+            rule.span,
+            rule.carry_in,
+        )
+        if expected is None:
+            assert math.isnan(value), rule
+        else:
+            assert math.isclose(value, expected, rel_tol=1e-6, abs_tol=1e-9), rule
+            checked += 1
+    assert checked >= 3 * 4 * 3
+
+
+def test_evaluate_alert_rules_writes_one_episode_per_rule(
+    monkeypatch: MonkeyPatch, tmp_path: Path
+) -> None:
+    from app.db import get_engine
+    from app.models import Alert, AlertRule, Asset, PriceHistory
+    from worker.tasks.alerts import compute_alerts, evaluate_alert_rules
+
+    _setup(monkeypatch, tmp_path)
+    now = datetime.now(timezone.utc)
+    with Session(bind=get_engine()) as db:
+        btc = Asset(symbol="BTC", alert_cooldown_min=30)
+        db.add(btc)
+        db.flush()
+        # Up 10% then down to +6%: a 3.6% drawdown and a +6% change in the hour
+        db.add_all(
+            PriceHistory(asset_id=btc.id, ts=now - timedelta(minutes=m), price=p)
+            for m, p in ((50, 100.0), (30, 110.0), (5, 106.0))
+        )
+        rules = {
+            "change": AlertRule(
+                asset_id=btc.id, kind="change", window_minutes=60, threshold=5
+            ),
+            "drawdown": AlertRule(
+                asset_id=btc.id, kind="drawdown", window_minutes=60, threshold=3
+            ),
+            "calm": AlertRule(
+                asset_id=btc.id, kind="drawdown", window_minutes=60, threshold=10
+            ),
+        }
+        db.add_all(rules.values())
+        db.commit()
+        ids = {name: rule.id for name, rule in rules.items()}
+
+    assert evaluate_alert_rules.run() == 2
+    assert evaluate_alert_rules.run(["btc"]) == 0  # folded into the open episodes
+    # The asset's own threshold alert is a separate episode
+    assert compute_alerts.run("BTC") == 1
+
+    with Session(bind=get_engine()) as db:
+        rows = db.execute(
+            select(Alert.rule_id, Alert.occurrences, Alert.change_pct)
+        ).all()
+    by_rule = {rule_id: (n, float(v)) for rule_id, n, v in rows}
+    assert set(by_rule) == {ids["change"], ids["drawdown"], None}
+    assert by_rule[ids["change"]][0] == by_rule[ids["drawdown"]][0] == 2
+    assert abs(by_rule[ids["change"]][1] - 6.0) < 1e-3
+    assert abs(by_rule[ids["drawdown"]][1] - 100 * 4 / 110) < 1e-3
+    assert abs(by_rule[None][1] - by_rule[ids["change"]][1]) < 1e-3
+
+
+def test_zscore_ignores_a_tick_on_a_flat_series(
+    monkeypatch: MonkeyPatch, tmp_path: Path
+) -> None:
+    from app.db import get_engine
+    from app.models import Alert, AlertRule, Asset, PriceHistory
+    from worker import rule_engine
+    from worker.tasks.alerts import evaluate_alert_rules
+
+    _setup(monkeypatch, tmp_path)
+    now = datetime.now(timezone.utc)
+    with Session(bind=get_engine()) as db:
+        for symbol, flat, tick in (("A", 1.0001, 1.0002), ("B", 3.3, 3.31)):
+            asset = Asset(symbol=symbol)
+            db.add(asset)
+            db.flush()
+            prices = [flat] * 30 + [tick]
+            db.add_all(
+                PriceHistory(
+                    asset_id=asset.id,
+                    ts=now - timedelta(minutes=len(prices) - k),
+                    price=p,
+                )
+                for k, p in enumerate(prices)
+            )
+            db.add(
+                AlertRule(
+                    asset_id=asset.id, kind="zscore", window_minutes=60, threshold=3
+                )
+            )
+        db.commit()
+
+        rules = rule_engine.load_rules(db)
+        values = rule_engine.evaluate(
+            rule_engine.load_series(db, rules, now), rules, now
+        )
+    # Float rounding leaves a tiny EWMA variance: no z from it
+    assert all(math.isnan(v) for v in values.tolist())
+    assert evaluate_alert_rules.run() == 0
+    with Session(bind=get_engine()) as db:
+        assert db.execute(select(Alert.id)).first() is None
@@ -0,0 +1,207 @@
+from __future__ import annotations
+
+import asyncio
+import random
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import httpx
+from pytest import MonkeyPatch
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+
+def _setup(monkeypatch: MonkeyPatch, tmp_path: Path) -> None:
+    from app.asset_cache import asset_cache
+    from app.db import create_all
+
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path}/alert_stream.db")
+    monkeypatch.delenv("DEADBAND_PCT", raising=False)
+    monkeypatch.delenv("ALERT_WINDOW_MINUTES", raising=False)
+    monkeypatch.delenv("ALERT_THRESHOLD_PCT", raising=False)
+    create_all()
+    asset_cache.invalidate()
+
+
+def test_sliding_window_matches_brute_force() -> None:
+    from worker.alert_stream import SlidingWindow
+
+    rng = random.Random(7)
+    window = SlidingWindow(timedelta(minutes=10))
+    t0 = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    seen: list[tuple[datetime, float]] = []
+    ts = t0
+    for _ in range(2_000):
+        ts += timedelta(seconds=rng.choice([5, 30, 60, 240, 900]))
+        price = round(rng.uniform(90, 110), 1)  # repeats exercise ties
+        assert window.push(ts, price)
+        seen.append((ts, price))
+        inside = [p for p in seen if p[0] > ts - timedelta(minutes=10)]
+        assert window.first == inside[0] and window.last == inside[-1]
+        assert window.min == min(p for _, p in inside)
+        assert window.max == max(p for _, p in inside)
+        assert len(window) == len(inside)
+    assert not window.push(ts, 100.0)  # not newer than the last sample
+
+
+def test_stream_matches_compute_alerts(
+    monkeypatch: MonkeyPatch, tmp_path: Path
+) -> None:
+    from app.db import get_engine
+    from app.models import Alert, Asset, PriceHistory
+    from worker.alert_stream import AlertStream
+    from worker.tasks.alerts import compute_alerts
+
+    _setup(monkeypatch, tmp_path)
+    rng = random.Random(11)
+    last = datetime.now(timezone.utc) - timedelta(seconds=1)
+    series: dict[str, list[tuple[datetime, float]]] = {}
+    with Session(bind=get_engine()) as db:
+        for n in range(24):
+            symbol = f"S{n:02d}"
+            asset = Asset(symbol=symbol)
+            step = 60
+            if n % 4 == 1:
+                asset.alert_window_min, asset.alert_pct = 30, 2.0
+            if n % 4 == 2:
+                # Sparse step series: the row held at the window start matters
+                asset.deadband_pct, step = 1.0, 25 * 60
+            db.add(asset)
+            points = []
+            price = 100.0
+            for k in range(180 * 60 // step, -1, -1):
+                # Off the minute grid so no sample sits on a window boundary
+                jitter = rng.uniform(5, 55) if k else 0
+                price *= 1 + rng.gauss(0, 0.01 if step == 60 else 0.04)
+                points.append((last - timedelta(seconds=k * step - jitter), price))
+            series[symbol] = points
+        db.commit()
+        ids = {s: i for s, i in db.execute(select(Asset.symbol, Asset.id))}
+
+        # History before the split is in the DB when the stream starts
+        split = last - timedelta(minutes=40)
+        db.add_all(
+            PriceHistory(asset_id=ids[s], ts=ts, price=p)
+            for s, points in series.items()
+            for ts, p in points
+            if ts <= split
+        )
+        db.commit()
+        stream = AlertStream()
+        assert stream.warm(db) > 0
+
+        # The rest arrives through the stream (and is stored as ingestion would)
+        verdicts = {}
+        for symbol, points in series.items():
+            for ts, p in points:
+                if ts > split:
+                    db.add(PriceHistory(asset_id=ids[symbol], ts=ts, price=p))
+                    verdicts[symbol] = stream.push(symbol, ts, p)
+        db.commit()
+
+    for symbol, streamed in verdicts.items():
+        assert compute_alerts.run(symbol) == (streamed is not None), symbol
+        if streamed is not None:
+            with Session(bind=get_engine()) as db:
+                stored = db.execute(
+                    select(Alert.window_minutes, Alert.change_pct).where(
+                        Alert.asset_id == ids[symbol]
+                    )
+                ).one()
+            assert stored.window_minutes == streamed.window_minutes
+            assert streamed.change_pct is not None
+            assert abs(float(stored.change_pct) - streamed.change_pct) < 1e-3
+    raised = sum(v is not None for v in verdicts.values())
+    assert 0 < raised < len(verdicts)
+
+
+def test_ingest_service_writes_streamed_alerts(
+    monkeypatch: MonkeyPatch, tmp_path: Path
+) -> None:
+    from app.db import get_engine
+    from app.models import Alert, Asset, PriceHistory
+    from worker.alert_stream import AlertStream
+    from worker.ingest_service import IngestService
+
+    _setup(monkeypatch, tmp_path)
+    with Session(bind=get_engine()) as db:
+        btc = Asset(symbol="BTC")
+        db.add(btc)
+        db.flush()
+        db.add(
+            PriceHistory(
+                asset_id=btc.id,
+                ts=datetime.now(timezone.utc) - timedelta(minutes=30),
+                price=100.0,
+            )
+        )
+        db.commit()
+    quotes = iter([103.0, 106.0])
+
+    def _handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json={"bitcoin": {"usd": next(quotes)}})
+
+    async def _run() -> None:
+        async with httpx.AsyncClient(transport=httpx.MockTransport(_handler)) as client:
+            service = IngestService(["BTC"], 60, client=client, alerts=AlertStream())
+            assert await service.warm_alerts() == 1
+            for _ in range(2):
+                await service.tick()
+                await service.flush()
+
+    asyncio.run(_run())
+
+    with Session(bind=get_engine()) as db:
+        alerts = db.execute(select(Alert.change_pct)).scalars().all()
+    # +3% stays under the default 5%; +6% against the warmed 100 raises one
+    assert [round(float(c), 3) for c in alerts] == [6.0]
+
+
+def test_streamed_alerts_survive_a_failed_flush(
+    monkeypatch: MonkeyPatch, tmp_path: Path
+) -> None:
+    from app.db import get_engine
+    from app.models import Alert, Asset, PriceHistory
+    from worker.alert_stream import AlertStream
+    from worker.ingest_service import IngestService
+
+    _setup(monkeypatch, tmp_path)
+    with Session(bind=get_engine()) as db:
+        btc = Asset(symbol="BTC")
+        db.add(btc)
+        db.flush()
+        db.add(
+            PriceHistory(
+                asset_id=btc.id,
+                ts=datetime.now(timezone.utc) - timedelta(minutes=30),
+                price=100.0,
+            )
+        )
+        db.commit()
+
+    def _handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json={"bitcoin": {"usd": 106.0}})
+
+    async def _run() -> None:
+        async with httpx.AsyncClient(transport=httpx.MockTransport(_handler)) as client:
+            service = IngestService(["BTC"], 60, client=client, alerts=AlertStream())
+            await service.warm_alerts()
+            await service.tick()
+            write = service._write
+
+            def _broken(*args: object) -> object:
+                raise RuntimeError("database is gone")
+
+            monkeypatch.setattr(service, "_write", _broken)
+            try:
+                await service.flush()
+            except RuntimeError:
+                pass
+            monkeypatch.setattr(service, "_write", write)
+            assert await service.flush() == 1
+
+    asyncio.run(_run())
+
+    with Session(bind=get_engine()) as db:
+        alerts = db.execute(select(Alert.change_pct)).scalars().all()
+    assert [round(float(c), 3) for c in alerts] == [6.0]
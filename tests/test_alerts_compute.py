@@ -2,9 +2,10 @@ from __future__ import annotations
 
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
+from typing import Any
 
 from pytest import MonkeyPatch
-from sqlalchemy import select
+from sqlalchemy import select, update
 from sqlalchemy.orm import Session
 
 
@@ -143,3 +144,206 @@ def test_compute_alerts_respects_env_window(
         session.execute(select(Alert).where(Alert.asset_id == asset.id)).scalars().all()
     )
     assert len(alerts) == 0
+
+
+def test_compute_alerts_reads_only_the_window_ends(
+    monkeypatch: MonkeyPatch, tmp_path: Path
+) -> None:
+    session = _setup_db(monkeypatch, tmp_path)
+    from sqlalchemy import event
+
+    from app.db import get_engine
+    from app.models import Asset, PriceHistory
+    from worker.tasks.alerts import compute_alerts
+
+    asset = session.execute(select(Asset).where(Asset.symbol == "BTC")).scalar_one()
+    now = datetime.now(timezone.utc)
+    # A dense window whose middle spikes; only the ends (100 → 103) count
+    session.add_all(
+        PriceHistory(
+            asset_id=asset.id,
+            ts=now - timedelta(minutes=59) + timedelta(seconds=10 * i),
+            price=100.0 if i == 0 else 103.0 if i == 350 else 150.0,
+        )
+        for i in range(351)
+    )
+    session.commit()
+
+    selects: list[str] = []
+
+    def _record(
+        conn: Any, cursor: Any, statement: str, params: Any, context: Any, many: bool
+    ) -> None:
+        if "price_history" in statement and statement.lstrip().startswith("SELECT"):
+            selects.append(statement)
+
+    event.listen(get_engine(), "before_cursor_execute", _record)
+    try:
+        assert compute_alerts.run("BTC") == 0
+    finally:
+        event.remove(get_engine(), "before_cursor_execute", _record)
+    assert len(selects) == 2
+    assert all("LIMIT" in s for s in selects)
+
+
+def test_compute_alerts_uses_price_held_at_window_start_with_deadband(
+    monkeypatch: MonkeyPatch, tmp_path: Path
+) -> None:
+    session = _setup_db(monkeypatch, tmp_path)
+    from app.models import Asset, PriceHistory
+    from worker.tasks.alerts import compute_alerts
+
+    asset = session.execute(select(Asset).where(Asset.symbol == "BTC")).scalar_one()
+    asset.deadband_pct = 1.0
+    now = datetime.now(timezone.utc)
+    # Stored at 100 two hours ago and unchanged until the jump to 106
+    session.add_all(
+        [
+            PriceHistory(asset_id=asset.id, ts=now - timedelta(hours=2), price=100.0),
+            PriceHistory(asset_id=asset.id, ts=now - timedelta(minutes=5), price=106.0),
+        ]
+    )
+    session.commit()
+
+    assert compute_alerts.run("BTC") == 1
+
+
+def test_compute_alerts_all_matches_per_asset_runs(
+    monkeypatch: MonkeyPatch, tmp_path: Path
+) -> None:
+    session = _setup_db(monkeypatch, tmp_path)
+    from app.models import Alert, Asset, PriceHistory
+    from worker.tasks.alerts import compute_alerts, compute_alerts_all
+
+    now = datetime.now(timezone.utc)
+    # symbol: (alert_pct, alert_window_min, prices 50 and 5 minutes ago)
+    cases = {
+        "BTC": (None, None, (100.0, 106.0)),  # +6% vs default 5%: alert
+        "ETH": (None, None, (100.0, 104.0)),  # +4%: none
+        "SOL": (3.0, None, (100.0, 96.0)),  # -4% vs own 3%: alert
+        "ADA": (None, 30, (100.0, 110.0)),  # 30 min window holds one sample: none
+        "DOT": (None, None, ()),  # no data: none
+    }
+    ids = {}
+    for symbol, (pct, window, prices) in cases.items():
+        asset = session.execute(
+            select(Asset).where(Asset.symbol == symbol)
+        ).scalar_one_or_none() or Asset(symbol=symbol)
+        asset.alert_pct = pct
+        asset.alert_window_min = window
+        session.add(asset)
+        session.flush()
+        ids[symbol] = asset.id
+        for minutes, price in zip((50, 5), prices):
+            session.add(
+                PriceHistory(
+                    asset_id=asset.id, ts=now - timedelta(minutes=minutes), price=price
+                )
+            )
+    session.commit()
+
+    assert compute_alerts_all.run() == 2
+    rows = session.execute(select(Alert.asset_id, Alert.window_minutes)).all()
+    assert sorted(rows) == sorted([(ids["BTC"], 60), (ids["SOL"], 60)])
+
+    # Same verdicts as the per-asset task
+    per_asset = {s: compute_alerts.run(s) for s in cases}
+    assert per_asset == {"BTC": 1, "ETH": 0, "SOL": 1, "ADA": 0, "DOT": 0}
+
+    # Explicit arguments beat per-asset overrides, and symbols narrow the set
+    assert compute_alerts_all.run(["eth", "ADA"], threshold_pct=3) == 1
+
+
+def test_alert_episodes_update_one_row_per_move(
+    monkeypatch: MonkeyPatch, tmp_path: Path
+) -> None:
+    session = _setup_db(monkeypatch, tmp_path)
+    from prometheus_client import REGISTRY
+
+    from app.models import Alert, Asset, PriceHistory
+    from worker.tasks.alerts import compute_alerts
+
+    monkeypatch.setenv("ALERT_COOLDOWN_MINUTES", "30")
+    monkeypatch.setenv("ALERT_HYSTERESIS_PCT", "1")
+    asset = session.execute(select(Asset).where(Asset.symbol == "BTC")).scalar_one()
+    now = datetime.now(timezone.utc)
+    session.add(
+        PriceHistory(asset_id=asset.id, ts=now - timedelta(minutes=50), price=100.0)
+    )
+    session.commit()
+    minute = iter(range(40, 0, -1))
+
+    def _run(price: float) -> int:
+        session.add(
+            PriceHistory(
+                asset_id=asset.id,
+                ts=now - timedelta(minutes=next(minute)),
+                price=price,
+            )
+        )
+        session.commit()
+        return compute_alerts.run("BTC")
+
+    def _episodes() -> list[tuple[float, int, bool]]:
+        session.expire_all()
+        rows = session.execute(select(Alert).order_by(Alert.id)).scalars()
+        return [(float(a.change_pct), a.occurrences, a.closed_at is None) for a in rows]
+
+    def _suppressed() -> float:
+        return (
+            REGISTRY.get_sample_value("alerts_suppressed_total", {"symbol": "BTC"})
+            or 0.0
+        )
+
+    suppressed = _suppressed()
+    assert _run(106.0) == 1  # opens an episode
+    assert _run(107.0) == 0  # same move: the open row is updated
+    assert _run(104.5) == 0  # inside the hysteresis band (4-5%): still open
+    assert _episodes() == [(7.0, 2, True)]
+    assert _suppressed() == suppressed + 1
+
+    assert _run(102.0) == 0  # below 5 - 1: closed
+    assert _episodes() == [(7.0, 2, False)]
+    assert _run(106.0) == 0  # back within the cooldown: reopened, not re-inserted
+    assert _episodes() == [(7.0, 3, True)]
+
+    # Once the cooldown has passed since the last trigger, a new move is a new row
+    session.execute(
+        update(Alert).values(
+            last_triggered_at=now - timedelta(hours=2),
+            closed_at=now - timedelta(hours=1),
+        )
+    )
+    session.commit()
+    assert _run(108.0) == 1
+    assert _episodes() == [(7.0, 3, False), (8.0, 1, True)]
+
+
+def test_compute_alerts_all_folds_into_open_episodes(
+    monkeypatch: MonkeyPatch, tmp_path: Path
+) -> None:
+    session = _setup_db(monkeypatch, tmp_path)
+    from app.models import Alert, Asset, PriceHistory
+    from worker.tasks.alerts import compute_alerts_all
+
+    now = datetime.now(timezone.utc)
+    btc = session.execute(select(Asset).where(Asset.symbol == "BTC")).scalar_one()
+    btc.alert_cooldown_min = 10  # per-asset episodes; ETH keeps one row per run
+    eth = Asset(symbol="ETH")
+    session.add(eth)
+    session.flush()
+    for asset in (btc, eth):
+        session.add_all(
+            PriceHistory(asset_id=asset.id, ts=now - timedelta(minutes=m), price=p)
+            for m, p in ((50, 100.0), (5, 106.0))
+        )
+    session.commit()
+
+    assert compute_alerts_all.run() == 2
+    assert compute_alerts_all.run() == 1
+    rows = session.execute(
+        select(Alert.asset_id, Alert.occurrences, Alert.closed_at.is_(None))
+    ).all()
+    assert sorted(rows) == sorted(
+        [(btc.id, 2, True), (eth.id, 1, False), (eth.id, 1, False)]
+    )
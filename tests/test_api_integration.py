@@ -16,7 +16,7 @@ def test_prices_after_worker_fetch(monkeypatch: MonkeyPatch, tmp_path: Path) ->
     create_all()
 
     # mock price to deterministic value
-    import requests
+    from worker import http_client
 
     class _Resp:
         def __init__(self, data: dict[str, object]) -> None:
@@ -33,7 +33,7 @@ def test_prices_after_worker_fetch(monkeypatch: MonkeyPatch, tmp_path: Path) ->
         assert "bitcoin" in url
         return _Resp({"bitcoin": {"usd": 100.0}})
 
-    monkeypatch.setattr(requests, "get", _fake_get)
+    monkeypatch.setattr(http_client, "get", _fake_get)
 
     # run task to insert a price point
     result = fetch_price.run("BTC")
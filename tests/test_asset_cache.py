@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+
+from prometheus_client import REGISTRY
+from pytest import MonkeyPatch
+from sqlalchemy.orm import Session
+
+
+def _setup_db(monkeypatch: MonkeyPatch, tmp_path: Path, name: str = "cache") -> Session:
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path}/{name}.db")
+    from app.db import create_all, get_engine
+
+    create_all()
+    return Session(bind=get_engine())
+
+
+def _counter(name: str) -> float:
+    return REGISTRY.get_sample_value(name) or 0.0
+
+
+def test_cache_hits_misses_and_ttl(monkeypatch: MonkeyPatch, tmp_path: Path) -> None:
+    from app.asset_cache import AssetCache
+    from app.models import Asset
+
+    session = _setup_db(monkeypatch, tmp_path)
+    session.add(Asset(symbol="BTC", name=None, alert_pct=2.5))
+    session.commit()
+
+    now = [0.0]
+    cache = AssetCache(maxsize=8, ttl_seconds=10, clock=lambda: now[0])
+    hits, misses = (
+        _counter("asset_cache_hits_total"),
+        _counter("asset_cache_misses_total"),
+    )
+
+    ref = cache.get(session, "btc")
+    assert ref is not None and ref.symbol == "BTC" and ref.alert_pct == 2.5
+    assert cache.get(session, "BTC") == ref
+    assert _counter("asset_cache_misses_total") == misses + 1
+    assert _counter("asset_cache_hits_total") == hits + 1
+
+    # Unknown symbols are not cached and always go to the database
+    assert cache.get(session, "ETH") is None
+    assert cache.get(session, "ETH") is None
+    assert _counter("asset_cache_misses_total") == misses + 3
+
+    # Expired entries are reloaded and pick up config changes
+    asset = session.query(Asset).filter_by(symbol="BTC").one()
+    asset.alert_pct = 7.0
+    session.commit()
+    assert cache.get(session, "BTC").alert_pct == 2.5  # type: ignore[union-attr]
+    now[0] = 11.0
+    assert cache.get(session, "BTC").alert_pct == 7.0  # type: ignore[union-attr]
+    session.close()
+
+
+def test_cache_lru_eviction_and_invalidate(
+    monkeypatch: MonkeyPatch, tmp_path: Path
+) -> None:
+    from app.asset_cache import AssetCache
+    from app.models import Asset
+
+    session = _setup_db(monkeypatch, tmp_path)
+    session.add_all([Asset(symbol=s, name=None) for s in ("AAA", "BBB", "CCC")])
+    session.commit()
+
+    cache = AssetCache(maxsize=2, ttl_seconds=60)
+    cache.get(session, "AAA")
+    cache.get(session, "BBB")
+    cache.get(session, "AAA")  # AAA is now most recently used
+    cache.get(session, "CCC")  # evicts BBB
+    keys = {k[1] for k in cache._data}
+    assert keys == {"AAA", "CCC"}
+
+    cache.invalidate("aaa")
+    assert {k[1] for k in cache._data} == {"CCC"}
+    cache.invalidate()
+    assert not cache._data
+    session.close()
+
+
+def test_cache_is_keyed_by_database(monkeypatch: MonkeyPatch, tmp_path: Path) -> None:
+    from app.asset_cache import AssetCache
+    from app.models import Asset
+
+    cache = AssetCache()
+    first = _setup_db(monkeypatch, tmp_path, "first")
+    first.add_all([Asset(symbol="ETH", name=None), Asset(symbol="BTC", name=None)])
+    first.commit()
+    assert cache.get(first, "BTC").id == 2  # type: ignore[union-attr]
+
+    second = _setup_db(monkeypatch, tmp_path, "second")
+    second.add(Asset(symbol="BTC", name=None))
+    second.commit()
+    assert cache.get(second, "BTC").id == 1  # type: ignore[union-attr]
+    first.close()
+    second.close()
+
+
+def test_sync_and_async_lookups_share_entries(
+    monkeypatch: MonkeyPatch, tmp_path: Path
+) -> None:
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+    from app.asset_cache import AssetCache
+    from app.db import get_async_engine
+    from app.models import Asset
+
+    session = _setup_db(monkeypatch, tmp_path)
+    session.add(Asset(symbol="BTC", name=None))
+    session.commit()
+    cache = AssetCache()
+    ref = cache.get(session, "BTC")
+
+    async def _aget() -> object:
+        async with AsyncSession(bind=get_async_engine()) as db:
+            return await cache.aget(db, "BTC")
+
+    hits = _counter("asset_cache_hits_total")
+    assert asyncio.run(_aget()) == ref
+    assert _counter("asset_cache_hits_total") == hits + 1
+    assert len(cache._data) == 1
+    session.close()
+
+
+def test_created_asset_is_visible_immediately(
+    monkeypatch: MonkeyPatch, tmp_path: Path
+) -> None:
+    from fastapi.testclient import TestClient
+
+    from app.main import create_app
+
+    _setup_db(monkeypatch, tmp_path).close()
+    client = TestClient(create_app())
+
+    # The miss is not cached, so the new asset needs no invalidation
+    assert client.get("/alerts/", params={"asset": "SOL"}).status_code == 404
+    assert client.post("/assets/", json={"symbol": "sol"}).status_code == 201
+    assert client.get("/alerts/", params={"asset": "SOL"}).status_code == 200
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import inspect
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from fastapi.routing import APIRoute
+from fastapi.testclient import TestClient
+from pytest import MonkeyPatch
+from sqlalchemy.orm import Session
+
+
+def _clients(monkeypatch: MonkeyPatch, tmp_path: Path) -> tuple[TestClient, TestClient]:
+    """A sync-mode and an ASYNC_DB-mode client over the same SQLite file."""
+    from app.db import create_all
+    from app.main import create_app
+
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path}/async_api.db")
+    create_all()
+    sync_client = TestClient(create_app())
+    monkeypatch.setenv("ASYNC_DB", "true")
+    async_client = TestClient(create_app())
+    return sync_client, async_client
+
+
+def _seed(symbol: str, count: int) -> None:
+    from app.db import get_engine
+    from app.models import Alert, Asset, PriceHistory
+
+    now = datetime.now(timezone.utc)
+    with Session(bind=get_engine()) as session:
+        asset = session.query(Asset).filter_by(symbol=symbol).one()
+        session.add_all(
+            PriceHistory(
+                asset_id=asset.id, ts=now - timedelta(minutes=i), price=100.0 + i
+            )
+            for i in range(count)
+        )
+        session.add(
+            Alert(
+                asset_id=asset.id, triggered_at=now, window_minutes=60, change_pct=5.5
+            )
+        )
+        session.commit()
+
+
+def test_async_mode_mounts_coroutine_endpoints(
+    monkeypatch: MonkeyPatch, tmp_path: Path
+) -> None:
+    from app.api import alerts, assets, prices
+
+    for router in (assets.async_router, prices.async_router, alerts.async_router):
+        routes = [r for r in router.routes if isinstance(r, APIRoute)]
+        assert routes
+        assert all(inspect.iscoroutinefunction(r.endpoint) for r in routes)
+
+    sync_client, async_client = _clients(monkeypatch, tmp_path)
+    # Operation ids are derived from endpoint names, so they show which set is mounted
+    sync_ops = _operation_ids(sync_client)
+    async_ops = _operation_ids(async_client)
+    assert len(sync_ops) == len(async_ops) > 0
+    assert not any("_async_" in op for op in sync_ops)
+    assert all("_async_" in op for op in async_ops)
+
+
+def _operation_ids(client: TestClient) -> list[str]:
+    schema = client.get("/openapi.json").json()
+    return [
+        op["operationId"]
+        for path, methods in schema["paths"].items()
+        if path.startswith(("/prices", "/alerts", "/assets"))
+        for op in methods.values()
+    ]
+
+
+def test_async_endpoints_match_sync(monkeypatch: MonkeyPatch, tmp_path: Path) -> None:
+    sync_client, async_client = _clients(monkeypatch, tmp_path)
+    assert async_client.post("/assets/", json={"symbol": "btc"}).status_code == 201
+    assert async_client.post("/assets/", json={"symbol": "BTC"}).status_code == 409
+    assert sync_client.post("/assets/", json={"symbol": "ETH"}).status_code == 201
+    _seed("BTC", 50)
+
+    requests = [
+        ("/assets/", {}),
+        ("/prices/", {"asset": "BTC"}),
+        ("/prices/", {"asset": "BTC", "window": "1h", "max_points": 10}),
+        ("/prices/", {"asset": "BTC", "limit": 7}),
+        ("/prices/", {"asset": "BTC", "format": "ndjson", "limit": 7}),
+        ("/prices/summary", {"asset": "BTC", "window": "1h"}),
+        ("/prices/summary/batch", {"assets": "BTC,ETH,XYZ"}),
+        ("/prices/candles", {"asset": "BTC", "interval": "1h"}),
+        ("/alerts/", {"asset": "BTC"}),
+    ]
+    for url, params in requests:
+        expected = sync_client.get(url, params=params)
+        got = async_client.get(url, params=params)
+        assert got.status_code == expected.status_code == 200, url
+        assert got.content == expected.content, (url, params)
+        assert got.headers.get("etag") == expected.headers.get("etag")
+        assert got.headers.get("x-next-cursor") == expected.headers.get("x-next-cursor")
+
+
+def test_async_errors_and_revalidation(
+    monkeypatch: MonkeyPatch, tmp_path: Path
+) -> None:
+    _, client = _clients(monkeypatch, tmp_path)
+    assert client.get("/prices/", params={"asset": "NOPE"}).status_code == 404
+    assert client.get("/alerts/", params={"asset": "NOPE"}).status_code == 404
+    assert client.post("/assets/", json={"symbol": "BTC"}).status_code == 201
+    bad = client.get("/prices/summary", params={"asset": "BTC", "window": "xx"})
+    assert bad.status_code == 400
+
+    first = client.get("/prices/summary", params={"asset": "BTC"})
+    again = client.get(
+        "/prices/summary",
+        params={"asset": "BTC"},
+        headers={"If-None-Match": first.headers["etag"]},
+    )
+    assert again.status_code == 304
@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+import random
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any
+
+from fastapi.testclient import TestClient
+from pytest import MonkeyPatch
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+
+def _setup_db(monkeypatch: MonkeyPatch, tmp_path: Path) -> Session:
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path}/candles.db")
+    from app.db import create_all, get_engine
+    from app.models import Asset
+
+    create_all()
+    session = Session(bind=get_engine())
+    session.add(Asset(symbol="BTC", name=None))
+    session.commit()
+    return session
+
+
+def _candles(session: Session, interval: str) -> list[tuple[Any, ...]]:
+    from app.models import PriceCandle
+
+    rows = session.execute(
+        select(PriceCandle)
+        .where(PriceCandle.interval == interval)
+        .order_by(PriceCandle.bucket_start)
+    ).scalars()
+    return [
+        (
+            c.bucket_start,
+            float(c.open),
+            float(c.high),
+            float(c.low),
+            float(c.close),
+            c.count,
+            round(float(c.price_sum), 6),
+        )
+        for c in rows
+    ]
+
+
+def test_incremental_rollups_match_rebuild(
+    monkeypatch: MonkeyPatch, tmp_path: Path
+) -> None:
+    from app.models import PriceHistory
+    from app.rollups import INTERVALS, apply_points, rebuild_candles
+
+    session = _setup_db(monkeypatch, tmp_path)
+    rnd = random.Random(7)
+    start = datetime(2024, 3, 1, 22, 0, tzinfo=timezone.utc)
+    points = [
+        (start + timedelta(seconds=37 * i), round(100 + rnd.uniform(-5, 5), 4))
+        for i in range(400)
+    ]
+    # Feed in shuffled batches, as fetches and backfills would
+    shuffled = points[:]
+    rnd.shuffle(shuffled)
+    for offset in range(0, len(shuffled), 50):
+        batch = shuffled[offset : offset + 50]
+        session.add_all(PriceHistory(asset_id=1, ts=ts, price=p) for ts, p in batch)
+        apply_points(session, 1, batch)
+        session.commit()
+    incremental = {name: _candles(session, name) for name in INTERVALS}
+
+    assert rebuild_candles(session, 1) == sum(len(v) for v in incremental.values())
+    session.commit()
+    session.expire_all()
+    for name in INTERVALS:
+        assert _candles(session, name) == incremental[name]
+
+    # Spot-check one hourly candle against the raw samples
+    hour = [p for p in points if p[0].hour == 23]
+    candle = next(c for c in incremental["1h"] if c[0].hour == 23)
+    prices = [p for _, p in hour]
+    assert candle[1:6] == (prices[0], max(prices), min(prices), prices[-1], len(prices))
+    session.close()
+
+
+def test_fetch_price_maintains_candles_and_endpoint(
+    monkeypatch: MonkeyPatch, tmp_path: Path
+) -> None:
+    from worker import http_client
+
+    from app.main import create_app
+    from worker.tasks.prices import fetch_price
+
+    session = _setup_db(monkeypatch, tmp_path)
+    quotes = iter([100.0, 104.0, 98.0, 101.0])
+
+    class _Resp:
+        status_code = 200
+
+        def __init__(self, price: float) -> None:
+            self._price = price
+
+        def raise_for_status(self) -> None:
+            return None
+
+        def json(self) -> dict[str, Any]:
+            return {"bitcoin": {"usd": self._price}}
+
+    def _fake_get(url: str, timeout: int = 10) -> _Resp:
+        return _Resp(next(quotes))
+
+    monkeypatch.setattr(http_client, "get", _fake_get)
+    for _ in range(4):
+        fetch_price.run("BTC")
+
+    daily = _candles(session, "1d")
+    assert sum(c[5] for c in daily) == 4
+
+    client = TestClient(create_app())
+    resp = client.get(
+        "/prices/candles", params={"asset": "BTC", "interval": "1d", "window": "1h"}
+    )
+    assert resp.status_code == 200
+    body = resp.json()
+    assert sum(c["count"] for c in body) == 4
+    assert max(c["high"] for c in body) == 104.0
+    assert min(c["low"] for c in body) == 98.0
+    assert body[-1]["close"] == 101.0
+    assert resp.headers["etag"]
+
+    resp = client.get("/prices/candles", params={"asset": "BTC", "interval": "2h"})
+    assert resp.status_code == 422
+    session.close()
+
+
+def test_rebuild_candles_task(monkeypatch: MonkeyPatch, tmp_path: Path) -> None:
+    from app.models import PriceCandle, PriceHistory
+    from worker.tasks.candles import rebuild_candles
+
+    session = _setup_db(monkeypatch, tmp_path)
+    now = datetime.now(timezone.utc)
+    session.add_all(
+        PriceHistory(asset_id=1, ts=now - timedelta(minutes=m), price=100.0 + m)
+        for m in range(10)
+    )
+    session.commit()
+    assert session.execute(select(PriceCandle)).first() is None
+
+    written = rebuild_candles.run("btc")
+    assert written >= 4  # at least one candle per interval
+    minute = _candles(session, "1m")
+    assert sum(c[5] for c in minute) == 10
+    # Idempotent
+    assert rebuild_candles.run() == written
+    session.close()
+
+
+def test_overlapping_applies_merge_into_one_candle(
+    monkeypatch: MonkeyPatch, tmp_path: Path
+) -> None:
+    import threading
+
+    from app.db import get_engine
+    from app.rollups import apply_points
+
+    session = _setup_db(monkeypatch, tmp_path)
+    start = datetime(2024, 3, 1, 12, 0, tzinfo=timezone.utc)
+    # A backfill (older and newer samples) and a live fetch in the same buckets
+    backfill = [(start + timedelta(seconds=s), p) for s, p in ((5, 100.0), (50, 97.0))]
+    live = [(start + timedelta(seconds=30), 105.0)]
+    applied = threading.Event()
+
+    def _backfill() -> None:
+        with Session(bind=get_engine()) as other:
+            apply_points(other, 1, backfill)
+            applied.set()
+            # Still uncommitted while the live writer applies its point
+            threading.Event().wait(0.3)
+            other.commit()
+
+    writer = threading.Thread(target=_backfill)
+    writer.start()
+    assert applied.wait(5)
+    with Session(bind=get_engine()) as live_session:
+        apply_points(live_session, 1, live)
+        live_session.commit()
+    writer.join()
+
+    for name in ("1m", "5m", "1h", "1d"):
+        [(_, open_, high, low, close, count, price_sum)] = _candles(session, name)
+        assert (open_, high, low, close, count) == (100.0, 105.0, 97.0, 97.0, 3)
+        assert price_sum == 302.0
+    session.close()
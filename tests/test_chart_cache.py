@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import os
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any
+
+from prometheus_client import REGISTRY
+from pytest import MonkeyPatch
+
+
+class _Resp:
+    status_code = 200
+
+    def __init__(self, data: dict[str, Any]) -> None:
+        self._data = data
+
+    def raise_for_status(self) -> None:
+        return None
+
+    def json(self) -> dict[str, Any]:
+        return self._data
+
+
+def _setup(monkeypatch: MonkeyPatch, tmp_path: Path) -> list[str]:
+    from app.db import create_all
+    from worker import http_client
+
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path}/chart_cache.db")
+    monkeypatch.setenv("MARKET_CHART_CACHE_DIR", str(tmp_path / "cache"))
+    create_all()
+    now_ms = int(datetime.now(timezone.utc).timestamp() * 1000)
+    payload = {"prices": [[now_ms - m * 60_000, 100.0 + m] for m in range(30)]}
+    urls: list[str] = []
+
+    def _fake_get(url: str, timeout: float | None = None) -> _Resp:
+        urls.append(url)
+        return _Resp(payload)
+
+    monkeypatch.setattr(http_client, "get", _fake_get)
+    return urls
+
+
+def _lookups(result: str) -> float:
+    return (
+        REGISTRY.get_sample_value("market_chart_cache_total", {"result": result}) or 0.0
+    )
+
+
+def test_backfill_retry_reads_market_chart_from_cache(
+    monkeypatch: MonkeyPatch, tmp_path: Path
+) -> None:
+    from worker.tasks.prices import backfill_prices
+
+    urls = _setup(monkeypatch, tmp_path)
+    hits = _lookups("hit")
+
+    assert backfill_prices.run("BTC", hours=1) == 30
+    # A retry (or another worker) within the TTL does not go upstream again
+    assert backfill_prices.run("BTC", hours=1) == 0
+    assert len(urls) == 1
+    assert _lookups("hit") == hits + 1
+    assert len(list((tmp_path / "cache").glob("*.json"))) == 1
+
+
+def test_expired_entry_is_fetched_again(
+    monkeypatch: MonkeyPatch, tmp_path: Path
+) -> None:
+    from worker.tasks.prices import _get_market_chart_usd
+
+    urls = _setup(monkeypatch, tmp_path)
+    monkeypatch.setenv("MARKET_CHART_CACHE_TTL_SECONDS", "60")
+
+    _get_market_chart_usd("BTC", hours=1)
+    (entry,) = (tmp_path / "cache").glob("*.json")
+    stale = time.time() - 120
+    os.utime(entry, (stale, stale))
+    _get_market_chart_usd("BTC", hours=1)
+    assert len(urls) == 2
+
+
+def test_range_fetches_share_an_aligned_key(
+    monkeypatch: MonkeyPatch, tmp_path: Path
+) -> None:
+    from worker.tasks.prices import _get_market_chart_range_usd
+
+    urls = _setup(monkeypatch, tmp_path)
+    epoch = int(time.time()) // 300 * 300
+    start = datetime.fromtimestamp(epoch - 1190, timezone.utc)
+    end = datetime.fromtimestamp(epoch - 60, timezone.utc)
+
+    first = _get_market_chart_range_usd("BTC", start, end)
+    # A retry seconds later falls inside the same 5-minute-aligned range
+    retry = _get_market_chart_range_usd(
+        "BTC", start + timedelta(seconds=5), end + timedelta(seconds=5)
+    )
+    assert len(urls) == 1
+    assert f"from={epoch - 1200}&to={epoch}" in urls[0]
+    # Points outside the requested span are still filtered out
+    assert first and all(start <= ts <= end for ts, _ in first)
+    assert retry and all(ts >= start + timedelta(seconds=5) for ts, _ in retry)
+
+
+def test_size_cap_evicts_oldest_entries(
+    tmp_path: Path, monkeypatch: MonkeyPatch
+) -> None:
+    from worker import chart_cache
+
+    monkeypatch.setenv("MARKET_CHART_CACHE_DIR", str(tmp_path))
+    monkeypatch.setenv("MARKET_CHART_CACHE_MAX_BYTES", "2500")
+    payload = [[i, float(i)] for i in range(100)]  # ~1.1 KB as JSON
+    for n in range(4):
+        chart_cache.read_through(
+            chart_cache.cache_key("c", str(n), "x", "g"), lambda: payload
+        )
+        # distinct mtimes so "oldest" is well defined
+        for entry in tmp_path.glob("*.json"):
+            st = entry.stat()
+            os.utime(entry, (st.st_atime, st.st_mtime - 1))
+
+    names = {p.stem for p in tmp_path.glob("*.json")}
+    assert names == {
+        chart_cache.cache_key("c", "2", "x", "g"),
+        chart_cache.cache_key("c", "3", "x", "g"),
+    }
+
+
+def test_eviction_removes_stale_temp_files(
+    tmp_path: Path, monkeypatch: MonkeyPatch
+) -> None:
+    from worker import chart_cache
+
+    monkeypatch.setenv("MARKET_CHART_CACHE_DIR", str(tmp_path))
+    monkeypatch.setenv("MARKET_CHART_CACHE_MAX_BYTES", "2500")
+    payload = [[i, float(i)] for i in range(100)]  # ~1.1 KB as JSON
+    # Left by a writer that died before the rename, and one still being written
+    stale = tmp_path / "dead.tmp"
+    stale.write_bytes(b"x" * 5000)
+    old = time.time() - chart_cache.STALE_TMP_SECONDS - 1
+    os.utime(stale, (old, old))
+    in_flight = tmp_path / "live.tmp"
+    in_flight.write_bytes(b"x" * 1000)
+
+    for n in range(2):
+        chart_cache.read_through(
+            chart_cache.cache_key("c", str(n), "x", "g"), lambda: payload
+        )
+        for entry in tmp_path.glob("*.json"):
+            st = entry.stat()
+            os.utime(entry, (st.st_atime, st.st_mtime - 1))
+
+    assert not stale.exists()
+    # The live temp file counts against the cap, so only the newest entry fits
+    assert in_flight.exists()
+    assert {p.stem for p in tmp_path.glob("*.json")} == {
+        chart_cache.cache_key("c", "1", "x", "g")
+    }
+
+
+def test_empty_payload_is_not_cached(tmp_path: Path, monkeypatch: MonkeyPatch) -> None:
+    from worker import chart_cache
+
+    monkeypatch.setenv("MARKET_CHART_CACHE_DIR", str(tmp_path))
+    calls: list[int] = []
+
+    def _fetch() -> list[Any]:
+        calls.append(1)
+        return []
+
+    key = chart_cache.cache_key("c", "0", "x", "g")
+    assert chart_cache.read_through(key, _fetch) == []
+    assert chart_cache.read_through(key, _fetch) == []
+    assert len(calls) == 2
+    assert not list(tmp_path.iterdir())
@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any
+
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+from pytest import MonkeyPatch
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+
+class _Resp:
+    status_code = 200
+
+    def __init__(self, price: float) -> None:
+        self._price = price
+
+    def raise_for_status(self) -> None:
+        return None
+
+    def json(self) -> dict[str, Any]:
+        return {"bitcoin": {"usd": self._price}}
+
+
+def _setup(
+    monkeypatch: MonkeyPatch, tmp_path: Path, age: timedelta = timedelta(minutes=1)
+) -> tuple[int, int]:
+    """BTC with a 1% deadband / 2h heartbeat, ETH without; both stored at 100."""
+    from app.asset_cache import asset_cache
+    from app.db import create_all, get_engine
+    from app.models import Asset, PriceHistory
+
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path}/deadband.db")
+    monkeypatch.delenv("DEADBAND_PCT", raising=False)
+    create_all()
+    asset_cache.invalidate()
+    start = datetime.now(timezone.utc) - age
+    with Session(bind=get_engine()) as db:
+        btc = Asset(symbol="BTC", deadband_pct=1.0, deadband_heartbeat_min=120)
+        eth = Asset(symbol="ETH")
+        db.add_all([btc, eth])
+        db.flush()
+        db.add_all(
+            PriceHistory(asset_id=a.id, ts=start, price=100.0) for a in (btc, eth)
+        )
+        db.commit()
+        return btc.id, eth.id
+
+
+def _stored(asset_id: int) -> list[float]:
+    from app.db import get_engine
+    from app.models import PriceHistory
+
+    with Session(bind=get_engine()) as db:
+        rows = db.execute(
+            select(PriceHistory.price)
+            .where(PriceHistory.asset_id == asset_id)
+            .order_by(PriceHistory.ts)
+        )
+        return [float(p) for p in rows.scalars()]
+
+
+def test_filter_samples_keeps_changes_and_heartbeats(
+    monkeypatch: MonkeyPatch, tmp_path: Path
+) -> None:
+    from app.db import get_engine
+    from app.deadband import filter_samples
+
+    btc, eth = _setup(monkeypatch, tmp_path)
+    t0 = datetime.now(timezone.utc)
+    samples = [
+        (btc, t0, 100.5),  # within 1% of the stored 100: dropped
+        (btc, t0 + timedelta(minutes=1), 101.5),  # moved: kept
+        (btc, t0 + timedelta(minutes=2), 101.9),  # within 1% of 101.5: dropped
+        (btc, t0 + timedelta(minutes=121), 101.9),  # heartbeat since 101.5: kept
+        (eth, t0, 100.0),  # no deadband: kept as-is
+        (btc, t0 - timedelta(hours=4), 99.0),  # older than the last row: kept
+    ]
+    skipped = REGISTRY.get_sample_value("price_samples_deadband_skipped_total") or 0
+    with Session(bind=get_engine()) as db:
+        kept = filter_samples(db, samples)
+    assert kept == [samples[1], samples[3], samples[4], samples[5]]
+    assert REGISTRY.get_sample_value("price_samples_deadband_skipped_total") == (
+        skipped + 2
+    )
+
+    # The global default applies to assets without their own setting
+    monkeypatch.setenv("DEADBAND_PCT", "5")
+    with Session(bind=get_engine()) as db:
+        assert filter_samples(db, [(eth, t0, 104.0)]) == []
+
+
+def test_fetch_price_stores_only_changes(
+    monkeypatch: MonkeyPatch, tmp_path: Path
+) -> None:
+    from worker import http_client
+    from worker.tasks.prices import fetch_price
+
+    btc, _ = _setup(monkeypatch, tmp_path)
+    quotes = iter([100.2, 100.4, 103.0, 102.9])
+    monkeypatch.setattr(
+        http_client, "get", lambda url, timeout=None: _Resp(next(quotes))
+    )
+    for _ in range(4):
+        fetch_price.run("BTC")
+    assert _stored(btc) == [100.0, 103.0]
+
+
+def test_window_reads_include_the_row_before_the_cutoff(
+    monkeypatch: MonkeyPatch, tmp_path: Path
+) -> None:
+    from app.db import get_engine
+    from app.main import create_app
+    from app.models import PriceHistory
+
+    btc, eth = _setup(monkeypatch, tmp_path, age=timedelta(minutes=90))
+    now = datetime.now(timezone.utc)
+    with Session(bind=get_engine()) as db:
+        db.add_all(
+            PriceHistory(asset_id=a, ts=now - timedelta(minutes=10), price=110.0)
+            for a in (btc, eth)
+        )
+        db.commit()
+    client = TestClient(create_app())
+
+    # BTC held 100 from 90 to 10 minutes ago: that row opens the 1h window
+    prices = client.get("/prices/", params={"asset": "BTC", "window": "1h"}).json()
+    assert [p["price"] for p in prices] == [100.0, 110.0]
+    summary = client.get("/prices/summary", params={"asset": "BTC", "window": "1h"})
+    assert summary.json()["first"] == 100.0
+    assert summary.json()["min"] == 100.0
+
+    # Assets without a deadband keep the plain window
+    prices = client.get("/prices/", params={"asset": "ETH", "window": "1h"}).json()
+    assert [p["price"] for p in prices] == [110.0]
+
+    batch = client.get("/prices/summary/batch", params={"window": "1h"}).json()
+    assert batch["BTC"]["first"] == 100.0 and batch["BTC"]["points"] == 2
+    assert batch["ETH"]["first"] == 110.0 and batch["ETH"]["points"] == 1
+
+
+def test_batch_summary_carry_in_is_per_asset(
+    monkeypatch: MonkeyPatch, tmp_path: Path
+) -> None:
+    from app.db import get_engine
+    from app.main import create_app
+    from app.models import PriceHistory
+
+    # BTC last stored 100 three hours ago, ETH 90 minutes ago
+    btc, eth = _setup(monkeypatch, tmp_path, age=timedelta(hours=3))
+    now = datetime.now(timezone.utc)
+    with Session(bind=get_engine()) as db:
+        db.add_all(
+            [
+                PriceHistory(asset_id=eth, ts=now - timedelta(minutes=90), price=95.0),
+                PriceHistory(asset_id=btc, ts=now - timedelta(minutes=10), price=200.0),
+            ]
+        )
+        db.commit()
+    client = TestClient(create_app())
+
+    single = client.get("/prices/summary", params={"asset": "BTC", "window": "1h"})
+    assert single.json()["first"] == 100.0
+    batch = client.get("/prices/summary/batch", params={"window": "1h"}).json()
+    assert batch["BTC"] == single.json()
+
+
+def test_batch_etag_covers_carry_in_and_deadband_config(
+    monkeypatch: MonkeyPatch, tmp_path: Path
+) -> None:
+    from app.asset_cache import asset_cache
+    from app.db import get_engine
+    from app.main import create_app
+    from app.models import Asset, PriceHistory
+
+    btc, eth = _setup(monkeypatch, tmp_path, age=timedelta(hours=3))
+    client = TestClient(create_app())
+
+    def etag() -> str:
+        resp = client.get("/prices/summary/batch", params={"window": "1h"})
+        return str(resp.headers["ETag"])
+
+    first = etag()
+    # A backfilled row before the cutoff moves BTC's carry-in row
+    with Session(bind=get_engine()) as db:
+        db.add(
+            PriceHistory(
+                asset_id=btc,
+                ts=datetime.now(timezone.utc) - timedelta(hours=2),
+                price=150.0,
+            )
+        )
+        db.commit()
+    backfilled = etag()
+    assert backfilled != first
+
+    # So does giving ETH a deadband (and with it a carry-in row)
+    with Session(bind=get_engine()) as db:
+        db.get_one(Asset, eth).deadband_pct = 1.0
+        db.commit()
+    asset_cache.invalidate()
+    assert etag() != backfilled
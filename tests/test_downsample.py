@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import math
+from datetime import datetime, timedelta, timezone
+
+from app.downsample import downsample, lttb, minmax
+
+
+def _series(n: int) -> list[tuple[datetime, float]]:
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    points = [
+        (start + timedelta(minutes=i), 100.0 + 5.0 * math.sin(i / 50.0))
+        for i in range(n)
+    ]
+    # Inject a sharp spike and dip that a chart must not lose
+    points[2500] = (points[2500][0], 250.0)
+    points[7100] = (points[7100][0], 10.0)
+    return points
+
+
+def test_lttb_keeps_first_last_and_extremes() -> None:
+    points = _series(10000)
+    out = lttb(points, 200)
+    assert len(out) == 200
+    assert out[0] == points[0]
+    assert out[-1] == points[-1]
+    prices = [p for _, p in out]
+    assert max(prices) == 250.0
+    assert min(prices) == 10.0
+    # Output stays in time order
+    assert all(a[0] < b[0] for a, b in zip(out, out[1:]))
+
+
+def test_minmax_keeps_first_last_and_extremes() -> None:
+    points = _series(10000)
+    out = minmax(points, 101)
+    assert len(out) <= 101
+    assert out[0] == points[0]
+    assert out[-1] == points[-1]
+    prices = [p for _, p in out]
+    assert max(prices) == 250.0
+    assert min(prices) == 10.0
+    assert all(a[0] < b[0] for a, b in zip(out, out[1:]))
+
+
+def test_downsample_is_noop_below_threshold() -> None:
+    points = _series(10000)[:50]
+    assert downsample(points, 100) == points
+    assert downsample(points, 100, "minmax") == points
@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+from pytest import MonkeyPatch
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+
+def _client(monkeypatch: MonkeyPatch, tmp_path: Path) -> TestClient:
+    from app.db import create_all
+    from app.main import create_app
+
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path}/test_etag.db")
+    create_all()
+    client = TestClient(create_app())
+    assert client.post("/assets/", json={"symbol": "BTC"}).status_code == 201
+    return client
+
+
+def _add_price(minutes_ago: int, price: float) -> None:
+    from app.db import get_engine
+    from app.models import Asset, PriceHistory
+
+    session = Session(bind=get_engine())
+    try:
+        asset = session.execute(select(Asset).where(Asset.symbol == "BTC")).scalar_one()
+        ts = datetime.now(timezone.utc) - timedelta(minutes=minutes_ago)
+        session.add(PriceHistory(asset_id=asset.id, ts=ts, price=price))
+        session.commit()
+    finally:
+        session.close()
+
+
+def _revalidate(client: TestClient, url: str, params: dict[str, str]) -> str:
+    first = client.get(url, params=params)
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    assert first.headers["cache-control"] == "no-cache"
+    again = client.get(url, params=params, headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.content == b""
+    assert again.headers["etag"] == etag
+    return etag
+
+
+def test_prices_and_summary_etags(monkeypatch: MonkeyPatch, tmp_path: Path) -> None:
+    client = _client(monkeypatch, tmp_path)
+    _add_price(30, 100.0)
+
+    endpoints = [
+        ("/prices/", {"asset": "BTC", "window": "24h"}),
+        ("/prices/", {"asset": "BTC", "window": "24h", "format": "ndjson"}),
+        ("/prices/summary", {"asset": "BTC", "window": "24h"}),
+        ("/prices/summary/batch", {"window": "24h"}),
+    ]
+    etags = [_revalidate(client, url, params) for url, params in endpoints]
+    # Different representations never share a validator
+    assert len(set(etags)) == len(etags)
+
+    # A new sample invalidates every validator
+    _add_price(1, 101.0)
+    for (url, params), etag in zip(endpoints, etags):
+        resp = client.get(url, params=params, headers={"If-None-Match": etag})
+        assert resp.status_code == 200
+        assert resp.headers["etag"] != etag
+
+    # A backfilled point inside the window changes the validator as well
+    etag = _revalidate(client, "/prices/", {"asset": "BTC", "window": "24h"})
+    _add_price(10, 99.0)
+    resp = client.get(
+        "/prices/",
+        params={"asset": "BTC", "window": "24h"},
+        headers={"If-None-Match": etag},
+    )
+    assert resp.status_code == 200
+
+
+def test_not_modified_skips_heavy_query(
+    monkeypatch: MonkeyPatch, tmp_path: Path
+) -> None:
+    import app.api.prices as prices
+
+    client = _client(monkeypatch, tmp_path)
+    _add_price(30, 100.0)
+    params = {"asset": "BTC", "window": "24h"}
+    etag = _revalidate(client, "/prices/summary", params)
+
+    def _boom(*args: object) -> None:
+        raise AssertionError("summary must not be computed for a 304")
+
+    monkeypatch.setattr(prices, "_summary_query", _boom)
+    resp = client.get("/prices/summary", params=params, headers={"If-None-Match": etag})
+    assert resp.status_code == 304
+
+
+def test_alerts_etag(monkeypatch: MonkeyPatch, tmp_path: Path) -> None:
+    from app.db import get_engine
+    from app.models import Alert
+
+    client = _client(monkeypatch, tmp_path)
+    params = {"asset": "BTC", "limit": "20"}
+    etag = _revalidate(client, "/alerts/", params)
+
+    session = Session(bind=get_engine())
+    try:
+        session.add(
+            Alert(
+                asset_id=1,
+                triggered_at=datetime.now(timezone.utc),
+                window_minutes=60,
+                change_pct=6.0,
+            )
+        )
+        session.commit()
+    finally:
+        session.close()
+
+    resp = client.get("/alerts/", params=params, headers={"If-None-Match": etag})
+    assert resp.status_code == 200
+    assert len(resp.json()) == 1
+    # Weak and strong forms of the same tag both match
+    tag = resp.headers["etag"]
+    strong = tag.removeprefix("W/")
+    resp = client.get("/alerts/", params=params, headers={"If-None-Match": strong})
+    assert resp.status_code == 304
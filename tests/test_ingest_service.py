@@ -0,0 +1,230 @@
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+from urllib.parse import parse_qs
+
+import httpx
+from prometheus_client import REGISTRY
+from pytest import MonkeyPatch
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+
+def _setup(monkeypatch: MonkeyPatch, tmp_path: Path) -> None:
+    from app.db import create_all
+
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path}/ingest_service.db")
+    create_all()
+
+
+def _metric(name: str, symbol: str) -> float:
+    return REGISTRY.get_sample_value(name, {"symbol": symbol}) or 0.0
+
+
+def test_ingest_service_fetches_many_symbols_in_concurrent_batches(
+    monkeypatch: MonkeyPatch, tmp_path: Path
+) -> None:
+    from app.db import get_engine
+    from app.models import PriceCandle, PriceHistory
+    from worker.ingest_service import IngestService
+
+    _setup(monkeypatch, tmp_path)
+    calls: list[list[str]] = []
+
+    def _handler(request: httpx.Request) -> httpx.Response:
+        ids = parse_qs(request.url.query.decode())["ids"][0].split(",")
+        calls.append(ids)
+        if "id0042" in ids:
+            return httpx.Response(503)
+        return httpx.Response(200, json={i: {"usd": 1.0 + int(i[2:])} for i in ids})
+
+    symbols = [f"S{n:04d}" for n in range(1000)]
+    before_ok = _metric("fetch_price_success_total", "S0101")
+    before_fail = _metric("fetch_price_failure_total", "S0042")
+
+    async def _run() -> int:
+        async with httpx.AsyncClient(transport=httpx.MockTransport(_handler)) as client:
+            service = IngestService(
+                symbols,
+                60,
+                batch_size=100,
+                concurrency=4,
+                rate_per_minute=60_000,
+                client=client,
+                resolve_id=lambda s: "id" + s[1:],
+            )
+            await service.tick()
+            return await service.flush()
+
+    stored = asyncio.run(_run())
+
+    # 10 requests of 100 ids; the batch holding id0042 failed as a whole
+    assert sorted(len(ids) for ids in calls) == [100] * 10
+    assert stored == 900
+    assert _metric("fetch_price_success_total", "S0101") == before_ok + 1
+    assert _metric("fetch_price_failure_total", "S0042") == before_fail + 1
+
+    with Session(bind=get_engine()) as db:
+        assert (
+            db.execute(select(func.count()).select_from(PriceHistory)).scalar_one()
+            == 900
+        )
+        candles = db.execute(
+            select(func.count())
+            .select_from(PriceCandle)
+            .where(PriceCandle.interval == "1m")
+        ).scalar_one()
+        assert candles == 900
+
+
+def test_ingest_service_run_flushes_on_stop(
+    monkeypatch: MonkeyPatch, tmp_path: Path
+) -> None:
+    from app.db import get_engine
+    from app.models import PriceHistory
+    from worker.ingest_service import IngestService
+
+    _setup(monkeypatch, tmp_path)
+
+    def _handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json={"bitcoin": {"usd": 100.0}})
+
+    async def _run() -> None:
+        async with httpx.AsyncClient(transport=httpx.MockTransport(_handler)) as client:
+            # flush cadence far longer than the run: only the final flush writes
+            service = IngestService(
+                ["BTC", "DOGE"], 0.05, flush_seconds=60, client=client
+            )
+            stop = asyncio.Event()
+            asyncio.get_running_loop().call_later(0.2, stop.set)
+            await service.run(stop)
+
+    asyncio.run(_run())
+
+    with Session(bind=get_engine()) as db:
+        rows = db.execute(select(func.count()).select_from(PriceHistory)).scalar_one()
+    # several ticks, every sample kept (distinct timestamps); DOGE unsupported
+    assert rows >= 2
+
+
+def test_ingest_service_keeps_samples_when_a_flush_fails(
+    monkeypatch: MonkeyPatch, tmp_path: Path
+) -> None:
+    from app.db import get_engine
+    from app.models import PriceHistory
+    from worker.ingest_service import IngestService
+
+    _setup(monkeypatch, tmp_path)
+    prices = iter([100.0, 101.0, 102.0, 103.0])
+
+    def _handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json={"bitcoin": {"usd": next(prices)}})
+
+    before_ok = _metric("fetch_price_success_total", "BTC")
+    before_fail = _metric("fetch_price_failure_total", "BTC")
+
+    async def _run() -> int:
+        async with httpx.AsyncClient(transport=httpx.MockTransport(_handler)) as client:
+            service = IngestService(["BTC"], 60, client=client, max_pending=3)
+            write = service._write
+
+            def _broken(*args: object) -> object:
+                raise RuntimeError("database is gone")
+
+            monkeypatch.setattr(service, "_write", _broken)
+            for ticks in (3, 1):
+                for _ in range(ticks):
+                    await service.tick()
+                try:
+                    await service.flush()
+                except RuntimeError:
+                    pass
+                else:
+                    raise AssertionError("flush should have failed")
+            monkeypatch.setattr(service, "_write", write)
+            return await service.flush()
+
+    # Four samples against a cap of three: only the oldest is dropped
+    assert asyncio.run(_run()) == 3
+    # Every fetch counts as a success, whatever happens to the sample later
+    assert _metric("fetch_price_success_total", "BTC") == before_ok + 4
+    assert _metric("fetch_price_failure_total", "BTC") == before_fail + 1
+    with Session(bind=get_engine()) as db:
+        stored = db.execute(select(PriceHistory.price).order_by(PriceHistory.ts))
+        assert [float(p) for p in stored.scalars()] == [101.0, 102.0, 103.0]
+
+
+def test_ingest_service_pauses_on_429(monkeypatch: MonkeyPatch, tmp_path: Path) -> None:
+    import time
+
+    from worker.ingest_service import IngestService, _retry_after
+
+    _setup(monkeypatch, tmp_path)
+    responses = iter(
+        [
+            httpx.Response(429, headers={"Retry-After": "0.3"}),
+            httpx.Response(200, json={"bitcoin": {"usd": 100.0}}),
+        ]
+    )
+    before_fail = _metric("fetch_price_failure_total", "BTC")
+
+    async def _run() -> float:
+        transport = httpx.MockTransport(lambda request: next(responses))
+        async with httpx.AsyncClient(transport=transport) as client:
+            service = IngestService(["BTC"], 60, rate_per_minute=60_000, client=client)
+            await service.tick()
+            started = time.monotonic()
+            await service.tick()
+            return time.monotonic() - started
+
+    # The second request waited out Retry-After instead of the token bucket
+    assert asyncio.run(_run()) >= 0.25
+    assert _metric("fetch_price_failure_total", "BTC") == before_fail + 1
+
+    assert _retry_after(httpx.Response(429, headers={"Retry-After": "120"})) == 120
+    assert (
+        _retry_after(
+            httpx.Response(
+                429, headers={"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"}
+            )
+        )
+        == 0
+    )
+    assert _retry_after(httpx.Response(429)) == 60
+
+
+def test_ingest_service_flushes_on_sigterm(
+    monkeypatch: MonkeyPatch, tmp_path: Path
+) -> None:
+    import os
+    import signal
+
+    from app.db import get_engine
+    from app.models import PriceHistory
+    from worker import ingest_service
+
+    _setup(monkeypatch, tmp_path)
+    requests: list[int] = []
+
+    async def _handler(request: httpx.Request) -> httpx.Response:
+        requests.append(1)
+        if len(requests) > 1:
+            await asyncio.sleep(60)  # a slow tick, cancelled by the signal
+        return httpx.Response(200, json={"bitcoin": {"usd": 100.0}})
+
+    async def _run() -> None:
+        async with httpx.AsyncClient(transport=httpx.MockTransport(_handler)) as client:
+            service = ingest_service.IngestService(
+                ["BTC"], 0.05, flush_seconds=60, client=client
+            )
+            asyncio.get_running_loop().call_later(
+                0.3, os.kill, os.getpid(), signal.SIGTERM
+            )
+            await asyncio.wait_for(ingest_service._serve(service), timeout=10)
+
+    asyncio.run(_run())
+
+    with Session(bind=get_engine()) as db:
+        rows = db.execute(select(func.count()).select_from(PriceHistory)).scalar_one()
+    assert rows == 1
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 from datetime import datetime, timezone
 from pathlib import Path
+from typing import Any
 
 from pytest import MonkeyPatch
 from sqlalchemy import select
@@ -15,6 +16,20 @@ def _setup(monkeypatch: MonkeyPatch, tmp_path: Path) -> None:
     create_all()
 
 
+def _freeze_clock(monkeypatch: MonkeyPatch) -> None:
+    """Pin `now` in worker.tasks.seed so re-runs see the same grid."""
+    import worker.tasks.seed as seed
+
+    frozen = datetime.now(timezone.utc).replace(second=30, microsecond=0)
+
+    class _Frozen(datetime):
+        @classmethod
+        def now(cls, tz: Any = None) -> "_Frozen":
+            return cls.fromtimestamp(frozen.timestamp(), tz)
+
+    monkeypatch.setattr(seed, "datetime", _Frozen)
+
+
 def test_seed_mock_prices_inserts_when_empty(
     monkeypatch: MonkeyPatch, tmp_path: Path
 ) -> None:
@@ -52,6 +67,7 @@ def test_seed_mock_prices_noop_when_data_present(
     from worker.tasks.seed import seed_mock_prices
 
     _setup(monkeypatch, tmp_path)
+    _freeze_clock(monkeypatch)
 
     # First seed
     first = seed_mock_prices.run(symbol="ETH", hours=1, interval_seconds=300)
@@ -59,3 +75,39 @@ def test_seed_mock_prices_noop_when_data_present(
     # Second call should be a no-op (returns 0)
     second = seed_mock_prices.run(symbol="ETH", hours=1, interval_seconds=300)
     assert second == 0
+
+
+def test_seed_synthetic_assets_vectorized_and_fallback_match_counts(
+    monkeypatch: MonkeyPatch, tmp_path: Path
+) -> None:
+    import worker.tasks.seed as seed
+
+    _setup(monkeypatch, tmp_path)
+    _freeze_clock(monkeypatch)
+
+    # 2h every 60s -> 121 samples per asset; a small chunk forces several commits
+    monkeypatch.setattr(seed, "INSERT_CHUNK_ROWS", 50)
+    assert seed.seed_synthetic_assets.run(3, hours=2, interval_seconds=60) == 3 * 121
+    # Re-running only hits duplicates
+    assert seed.seed_synthetic_assets.run(3, hours=2, interval_seconds=60) == 0
+
+    monkeypatch.setattr(seed, "np", None)
+    fallback = seed.seed_synthetic_assets.run(
+        2, hours=2, interval_seconds=60, prefix="py"
+    )
+    assert fallback == 2 * 121
+
+
+def test_vectorized_walk_is_deterministic_per_seed() -> None:
+    import pytest
+
+    seed = pytest.importorskip("worker.tasks.seed")
+    if seed.np is None:
+        pytest.skip("numpy not installed")
+
+    first = seed._walk_np(1000, 100.0, 42)
+    assert first == seed._walk_np(1000, 100.0, 42)
+    assert first != seed._walk_np(1000, 100.0, 43)
+    assert min(first) >= 0.01
+    # +/-1% steps: each point within ~1.05% of the previous one
+    assert all(abs(b / a - 1.0) < 0.0106 for a, b in zip(first, first[1:]))
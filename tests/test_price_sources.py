@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from collections.abc import Iterator
+from pathlib import Path
+from urllib.error import HTTPError
+from urllib.request import urlopen
+
+import pytest
+from pytest import MonkeyPatch
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from benchmarks.fake_exchange import ExchangeConfig, FakeExchange, start
+
+
+@pytest.fixture
+def exchange(monkeypatch: MonkeyPatch, tmp_path: Path) -> Iterator[FakeExchange]:
+    from app.db import create_all
+
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path}/price_sources.db")
+    monkeypatch.setenv("MARKET_CHART_CACHE_DIR", "")
+    create_all()
+    server, url = start(ExchangeConfig(symbols=500))
+    monkeypatch.setenv("PRICE_SOURCE", "fake")
+    monkeypatch.setenv("FAKE_EXCHANGE_URL", url)
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_get_source_follows_price_source(monkeypatch: MonkeyPatch) -> None:
+    from worker.sources import CoinGeckoSource, FakeExchangeSource, get_source
+
+    monkeypatch.delenv("PRICE_SOURCE", raising=False)
+    assert type(get_source()) is CoinGeckoSource
+    assert get_source().resolve("btc") == "bitcoin"
+    assert get_source().resolve("SYN0001") is None
+
+    monkeypatch.setenv("PRICE_SOURCE", "fake")
+    assert type(get_source()) is FakeExchangeSource
+    assert not isinstance(get_source(), CoinGeckoSource)
+    assert get_source().resolve("SYN0001") == "syn0001"
+
+    monkeypatch.setenv("PRICE_SOURCE", "nope")
+    with pytest.raises(ValueError, match="PRICE_SOURCE"):
+        get_source()
+
+
+def test_fetch_tasks_ingest_synthetic_symbols_from_fake_exchange(
+    exchange: FakeExchange,
+) -> None:
+    from app.db import get_engine
+    from app.models import PriceHistory
+    from worker.tasks.prices import backfill_prices, fetch_price, fetch_prices_batch
+
+    assert fetch_price.run("SYN0007") > 0
+    symbols = [f"SYN{n:04d}" for n in range(200)] + ["NOPE"]
+    prices = fetch_prices_batch.run(symbols)
+    assert len(prices) == 200 and "NOPE" not in prices
+    assert backfill_prices.run("SYN0001", hours=2) >= 100
+
+    with Session(bind=get_engine()) as db:
+        rows = db.execute(select(func.count()).select_from(PriceHistory)).scalar_one()
+    assert rows >= 201 + 100
+
+
+def test_ingest_service_reads_from_fake_exchange(exchange: FakeExchange) -> None:
+    from worker.ingest_service import IngestService
+
+    async def _run() -> int:
+        service = IngestService(
+            [f"SYN{n:04d}" for n in range(500)],
+            60,
+            batch_size=100,
+            concurrency=4,
+            rate_per_minute=60_000,
+        )
+        await service.tick()
+        return await service.flush()
+
+    assert asyncio.run(_run()) == 500
+    assert exchange.stats["requests"] == 5
+
+
+def test_fake_exchange_throttles_and_injects_errors() -> None:
+    server, url = start(ExchangeConfig(symbols=10, rate_limit=6))
+    try:
+        # burst of one, then 429 with a Retry-After hint
+        with urlopen(f"{url}/simple/price?ids=syn0001") as resp:
+            assert "syn0001" in json.load(resp)
+        with pytest.raises(HTTPError) as throttled:
+            urlopen(f"{url}/simple/price?ids=syn0001")
+        assert throttled.value.code == 429
+        assert int(throttled.value.headers["Retry-After"]) >= 1
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    server, url = start(ExchangeConfig(symbols=10, error_rate=1.0))
+    try:
+        with pytest.raises(HTTPError) as failed:
+            urlopen(f"{url}/simple/price?ids=syn0001")
+        assert failed.value.code == 500
+        root = url.rsplit("/api/v3", 1)[0]
+        with urlopen(f"{root}/stats") as resp:
+            assert json.load(resp)["errors"] == 1
+    finally:
+        server.shutdown()
+        server.server_close()
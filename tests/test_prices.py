@@ -24,7 +24,9 @@ def _create_asset(client: TestClient, symbol: str) -> int:
     return int(resp.json()["id"])  # type: ignore[return-value]
 
 
-def test_get_prices_window_minutes_filters(monkeypatch: MonkeyPatch, tmp_path: Path) -> None:
+def test_get_prices_window_minutes_filters(
+    monkeypatch: MonkeyPatch, tmp_path: Path
+) -> None:
     from app.db import get_engine
     from app.models import Asset, PriceHistory
 
@@ -38,8 +40,12 @@ def test_get_prices_window_minutes_filters(monkeypatch: MonkeyPatch, tmp_path: P
         now = datetime.now(timezone.utc)
         session.add_all(
             [
-                PriceHistory(asset_id=asset.id, ts=now - timedelta(minutes=90), price=100.0),
-                PriceHistory(asset_id=asset.id, ts=now - timedelta(minutes=5), price=105.0),
+                PriceHistory(
+                    asset_id=asset.id, ts=now - timedelta(minutes=90), price=100.0
+                ),
+                PriceHistory(
+                    asset_id=asset.id, ts=now - timedelta(minutes=5), price=105.0
+                ),
             ]
         )
         session.commit()
@@ -65,3 +71,131 @@ def test_get_prices_invalid_window_returns_400(
     assert resp.status_code == 400
     assert resp.json()["detail"] == "invalid window"
 
+
+def test_get_prices_max_points_downsamples(
+    monkeypatch: MonkeyPatch, tmp_path: Path
+) -> None:
+    from app.db import get_engine
+    from app.models import Asset, PriceHistory
+
+    client = _client(monkeypatch, tmp_path)
+    _create_asset(client, "BTC")
+
+    session = Session(bind=get_engine())
+    try:
+        asset = session.execute(select(Asset).where(Asset.symbol == "BTC")).scalar_one()
+        start = datetime.now(timezone.utc) - timedelta(minutes=600)
+        rows = [
+            PriceHistory(
+                asset_id=asset.id, ts=start + timedelta(minutes=i), price=100.0
+            )
+            for i in range(600)
+        ]
+        rows[123].price = 180.0
+        rows[456].price = 40.0
+        session.add_all(rows)
+        session.commit()
+    finally:
+        session.close()
+
+    for mode in ("lttb", "minmax"):
+        resp = client.get(
+            "/prices/",
+            params={"asset": "BTC", "window": "24h", "max_points": 50, "mode": mode},
+        )
+        assert resp.status_code == 200
+        data = resp.json()
+        assert 2 < len(data) <= 50
+        prices = [float(p["price"]) for p in data]
+        assert max(prices) == 180.0
+        assert min(prices) == 40.0
+        assert prices[0] == 100.0 and prices[-1] == 100.0
+
+    # Without max_points every stored row is returned
+    resp = client.get("/prices/", params={"asset": "BTC", "window": "24h"})
+    assert len(resp.json()) == 600
+
+
+def _seed_minutes(count: int) -> datetime:
+    from app.db import get_engine
+    from app.models import Asset, PriceHistory
+
+    session = Session(bind=get_engine())
+    try:
+        asset = session.execute(select(Asset).where(Asset.symbol == "BTC")).scalar_one()
+        start = datetime.now(timezone.utc).replace(microsecond=0) - timedelta(
+            minutes=count
+        )
+        session.add_all(
+            [
+                PriceHistory(
+                    asset_id=asset.id, ts=start + timedelta(minutes=i), price=100.0 + i
+                )
+                for i in range(count)
+            ]
+        )
+        session.commit()
+    finally:
+        session.close()
+    return start
+
+
+def test_get_prices_keyset_pagination(monkeypatch: MonkeyPatch, tmp_path: Path) -> None:
+    client = _client(monkeypatch, tmp_path)
+    _create_asset(client, "BTC")
+    _seed_minutes(25)
+
+    seen: list[float] = []
+    params: dict[str, str | int] = {"asset": "BTC", "limit": 10}
+    while True:
+        resp = client.get("/prices/", params=params)
+        assert resp.status_code == 200
+        page = resp.json()
+        seen.extend(float(p["price"]) for p in page)
+        cursor = resp.headers.get("x-next-cursor")
+        if cursor is None:
+            break
+        params["after_ts"] = cursor
+    assert seen == [100.0 + i for i in range(25)]
+
+
+def test_get_prices_ndjson_stream(monkeypatch: MonkeyPatch, tmp_path: Path) -> None:
+    import json
+
+    client = _client(monkeypatch, tmp_path)
+    _create_asset(client, "BTC")
+    _seed_minutes(30)
+
+    resp = client.get("/prices/", params={"asset": "BTC", "format": "ndjson"})
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in resp.text.splitlines()]
+    assert [p["price"] for p in lines] == [100.0 + i for i in range(30)]
+    assert "x-next-cursor" not in resp.headers
+
+    # Paged stream: cursor points at the last line of the page
+    resp = client.get(
+        "/prices/", params={"asset": "BTC", "format": "ndjson", "limit": 12}
+    )
+    lines = [json.loads(line) for line in resp.text.splitlines()]
+    assert len(lines) == 12
+    cursor = resp.headers["x-next-cursor"]
+    assert datetime.fromisoformat(cursor) == datetime.fromisoformat(lines[-1]["ts"])
+    resp = client.get(
+        "/prices/",
+        params={"asset": "BTC", "format": "ndjson", "limit": 12, "after_ts": cursor},
+    )
+    lines = [json.loads(line) for line in resp.text.splitlines()]
+    assert lines[0]["price"] == 112.0
+
+
+def test_get_prices_max_points_rejects_pagination(
+    monkeypatch: MonkeyPatch, tmp_path: Path
+) -> None:
+    client = _client(monkeypatch, tmp_path)
+    _create_asset(client, "BTC")
+
+    resp = client.get(
+        "/prices/", params={"asset": "BTC", "max_points": 10, "format": "ndjson"}
+    )
+    assert resp.status_code == 400
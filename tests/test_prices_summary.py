@@ -46,9 +46,15 @@ def test_price_summary_stats(monkeypatch: MonkeyPatch, tmp_path: Path) -> None:
         now = datetime.now(timezone.utc)
         session.add_all(
             [
-                PriceHistory(asset_id=asset.id, ts=now - timedelta(hours=2), price=100.0),
-                PriceHistory(asset_id=asset.id, ts=now - timedelta(hours=1), price=110.0),
-                PriceHistory(asset_id=asset.id, ts=now - timedelta(minutes=10), price=105.0),
+                PriceHistory(
+                    asset_id=asset.id, ts=now - timedelta(hours=2), price=100.0
+                ),
+                PriceHistory(
+                    asset_id=asset.id, ts=now - timedelta(hours=1), price=110.0
+                ),
+                PriceHistory(
+                    asset_id=asset.id, ts=now - timedelta(minutes=10), price=105.0
+                ),
             ]
         )
         session.commit()
@@ -83,3 +89,67 @@ def test_price_summary_invalid_window(monkeypatch: MonkeyPatch, tmp_path: Path)
     r = client.get("/prices/summary", params={"asset": "BTC", "window": "bad-window"})
     assert r.status_code == 400
     assert r.json()["detail"] == "invalid window"
+
+
+def test_price_summary_batch(monkeypatch: MonkeyPatch, tmp_path: Path) -> None:
+    client = _client(monkeypatch, tmp_path)
+    for sym in ("BTC", "ETH", "SOL"):
+        assert client.post("/assets/", json={"symbol": sym}).status_code == 201
+
+    from app.db import get_engine
+    from app.models import Asset, PriceHistory
+
+    session = Session(bind=get_engine())
+    try:
+        ids = {a.symbol: a.id for a in session.execute(select(Asset)).scalars().all()}
+        now = datetime.now(timezone.utc)
+        session.add_all(
+            [
+                PriceHistory(
+                    asset_id=ids["BTC"], ts=now - timedelta(hours=5), price=90.0
+                ),
+                PriceHistory(
+                    asset_id=ids["BTC"], ts=now - timedelta(hours=2), price=100.0
+                ),
+                PriceHistory(
+                    asset_id=ids["BTC"], ts=now - timedelta(hours=1), price=110.0
+                ),
+                PriceHistory(
+                    asset_id=ids["BTC"], ts=now - timedelta(minutes=10), price=105.0
+                ),
+                PriceHistory(
+                    asset_id=ids["ETH"], ts=now - timedelta(minutes=30), price=20.0
+                ),
+            ]
+        )
+        session.commit()
+    finally:
+        session.close()
+
+    r = client.get("/prices/summary/batch", params={"window": "3h"})
+    assert r.status_code == 200
+    body = r.json()
+    assert set(body) == {"BTC", "ETH", "SOL"}
+    assert body["BTC"]["points"] == 3
+    assert body["BTC"]["first"] == 100.0
+    assert body["BTC"]["last"] == 105.0
+    assert body["BTC"]["min"] == 100.0
+    assert body["BTC"]["max"] == 110.0
+    assert body["ETH"]["points"] == 1
+    assert body["ETH"]["first"] == body["ETH"]["last"] == 20.0
+    assert body["SOL"]["points"] == 0
+    assert body["SOL"]["first"] is None
+
+    # Matches the single-asset endpoint
+    single = client.get("/prices/summary", params={"asset": "BTC", "window": "3h"})
+    assert single.json() == body["BTC"]
+
+    # Explicit subset; unknown symbols are skipped
+    r = client.get(
+        "/prices/summary/batch", params={"assets": "eth, nope", "window": "3h"}
+    )
+    assert r.status_code == 200
+    assert set(r.json()) == {"ETH"}
+
+    r = client.get("/prices/summary/batch", params={"window": "bad-window"})
+    assert r.status_code == 400
@@ -38,7 +38,9 @@ def test_fetch_price_network_error_records_failure(
     def _boom(url: str, timeout: int = 10) -> requests.Response:  # type: ignore[override]
         raise requests.RequestException("network down")
 
-    monkeypatch.setattr(requests, "get", _boom)
+    from worker import http_client
+
+    monkeypatch.setattr(http_client, "get", _boom)
 
     with raises(Exception):
         fetch_price.run("ETH")
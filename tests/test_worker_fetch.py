@@ -38,14 +38,14 @@ def test_fetch_price_inserts_price(monkeypatch: MonkeyPatch, tmp_path: Path) ->
     db.commit()
     db.refresh(asset)
 
-    # mock requests.get
+    # mock the upstream HTTP client
     def _fake_get(url: str, timeout: int = 10) -> _Resp:  # type: ignore[override]
         assert "bitcoin" in url
         return _Resp({"bitcoin": {"usd": 12345.67}})
 
-    import requests
+    from worker import http_client
 
-    monkeypatch.setattr(requests, "get", _fake_get)
+    monkeypatch.setattr(http_client, "get", _fake_get)
 
     # run task synchronously
     from worker.tasks.prices import fetch_price
@@ -60,3 +60,151 @@ def test_fetch_price_inserts_price(monkeypatch: MonkeyPatch, tmp_path: Path) ->
         .all()
     )
     assert len(count) == 1
+
+
+def test_fetch_prices_batch_uses_one_request(
+    monkeypatch: MonkeyPatch, tmp_path: Path
+) -> None:
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path}/worker_fetch_batch.db")
+    from app.db import create_all, get_engine
+    from prometheus_client import generate_latest
+    from sqlalchemy import select
+    from sqlalchemy.orm import Session
+    from app.models import Asset, PriceCandle, PriceHistory
+
+    create_all()
+
+    urls: list[str] = []
+
+    def _fake_get(url: str, timeout: int = 10) -> _Resp:  # type: ignore[override]
+        urls.append(url)
+        return _Resp({"bitcoin": {"usd": 100.5}, "ethereum": {"usd": 20.25}})
+
+    from worker import http_client
+
+    monkeypatch.setattr(http_client, "get", _fake_get)
+
+    from worker.tasks.prices import fetch_prices_batch
+
+    result = fetch_prices_batch.run(["btc", "ETH", "DOGE", "BTC"])
+    assert result == {"BTC": 100.5, "ETH": 20.25}
+    assert len(urls) == 1
+    assert "ids=bitcoin,ethereum&" in urls[0]
+
+    db = Session(bind=get_engine())
+    rows = db.execute(
+        select(Asset.symbol, PriceHistory.price, PriceHistory.ts)
+        .join(Asset, Asset.id == PriceHistory.asset_id)
+        .order_by(Asset.symbol)
+    ).all()
+    assert [(s, float(p)) for s, p, _ in rows] == [("BTC", 100.5), ("ETH", 20.25)]
+    # Written together: both samples share one timestamp
+    assert rows[0][2] == rows[1][2]
+    assert len(db.execute(select(PriceCandle)).scalars().all()) == 2 * 4
+
+    metrics_text = generate_latest().decode()
+    assert 'fetch_price_success_total{symbol="ETH"}' in metrics_text
+    assert 'fetch_price_failure_total{symbol="DOGE"}' in metrics_text
+
+
+def test_backfill_prices_bulk_insert_is_idempotent(
+    monkeypatch: MonkeyPatch, tmp_path: Path
+) -> None:
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path}/worker_backfill.db")
+    from datetime import datetime, timedelta, timezone
+
+    from sqlalchemy import func, select
+    from sqlalchemy.orm import Session
+
+    from app.db import create_all, get_engine
+    from app.models import PriceCandle, PriceHistory
+    import worker.tasks.prices as prices_tasks
+
+    create_all()
+    start = datetime(2024, 5, 1, tzinfo=timezone.utc)
+    series = [(start + timedelta(minutes=i), 100.0 + i) for i in range(120)]
+    served = {"points": series[:80]}
+    monkeypatch.setattr(
+        prices_tasks, "_get_market_chart_usd", lambda symbol, hours: served["points"]
+    )
+    monkeypatch.setattr(prices_tasks, "INSERT_CHUNK_ROWS", 25)
+
+    assert prices_tasks.backfill_prices.run("BTC", hours=2) == 80
+    assert prices_tasks.backfill_prices.run("BTC", hours=2) == 0
+    # Overlapping window: only the 40 new minutes count
+    served["points"] = series[40:]
+    assert prices_tasks.backfill_prices.run("BTC", hours=2) == 40
+
+    db = Session(bind=get_engine())
+    assert db.execute(select(func.count(PriceHistory.id))).scalar_one() == 120
+    # Rollups saw each sample exactly once
+    minute_count = db.execute(
+        select(func.sum(PriceCandle.count)).where(PriceCandle.interval == "1m")
+    ).scalar_one()
+    assert minute_count == 120
+    db.close()
+
+
+def test_ensure_backfill_fetches_only_missing_ranges(
+    monkeypatch: MonkeyPatch, tmp_path: Path
+) -> None:
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path}/worker_gaps.db")
+    from datetime import datetime, timedelta, timezone
+
+    from app.db import create_all, get_engine
+    from sqlalchemy import func, select
+    from sqlalchemy.orm import Session
+    from app.models import Asset, PriceHistory
+
+    import worker.tasks.prices as prices_tasks
+
+    create_all()
+    now = datetime.now(timezone.utc).replace(second=0, microsecond=0)
+    step = timedelta(minutes=5)
+    # 24h window at 5-minute spacing; first 3h and a 2h outage are missing
+    head_end = now - timedelta(hours=21)
+    outage = (now - timedelta(hours=12), now - timedelta(hours=10))
+    stored = [
+        now - timedelta(hours=24) + step * i
+        for i in range(24 * 12 + 1)
+        if now - timedelta(hours=24) + step * i >= head_end
+        and not outage[0] <= now - timedelta(hours=24) + step * i < outage[1]
+    ]
+    with Session(bind=get_engine()) as db:
+        asset = Asset(symbol="BTC", name=None)
+        db.add(asset)
+        db.commit()
+        db.add_all(PriceHistory(asset_id=asset.id, ts=ts, price=1.0) for ts in stored)
+        db.commit()
+
+    ranges: list[tuple[datetime, datetime]] = []
+
+    def _fake_range(
+        symbol: str, start: datetime, end: datetime
+    ) -> list[tuple[datetime, float]]:
+        ranges.append((start, end))
+        points = []
+        ts = start
+        while ts <= end:
+            points.append((ts, 2.0))
+            ts += step
+        return points
+
+    monkeypatch.setattr(prices_tasks, "_get_market_chart_range_usd", _fake_range)
+
+    inserted = prices_tasks.ensure_backfill.run("BTC", hours=24, interval_seconds=300)
+
+    # Only the head and the outage were requested, not the whole 24h window
+    assert len(ranges) == 2
+    assert ranges[0][1] == head_end
+    assert ranges[1] == (outage[0] - step, outage[1])
+    # Range boundaries already exist and are skipped on insert
+    assert inserted == 3 * 12 + 2 * 12
+    with Session(bind=get_engine()) as db:
+        total = db.execute(select(func.count()).select_from(PriceHistory)).scalar_one()
+    assert total == len(stored) + inserted
+
+    # Nothing left to fill: no upstream call
+    ranges.clear()
+    assert prices_tasks.ensure_backfill.run("BTC", hours=24, interval_seconds=300) == 0
+    assert ranges == []
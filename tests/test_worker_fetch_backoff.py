@@ -41,10 +41,10 @@ def test_fetch_price_retries_then_succeeds(
             return _Resp({}, status_code=500)
         return _Resp({"bitcoin": {"usd": 123.45}}, status_code=200)
 
-    import requests
+    from worker import http_client
     import time
 
-    monkeypatch.setattr(requests, "get", _fake_get)
+    monkeypatch.setattr(http_client, "get", _fake_get)
     monkeypatch.setattr(time, "sleep", lambda s: None)
 
     from worker.tasks.prices import fetch_price
@@ -73,10 +73,10 @@ def test_fetch_price_retries_and_fails(
     def _fake_get(url: str, timeout: int = 10) -> _Resp:  # type: ignore[override]
         return _Resp({}, status_code=500)
 
-    import requests
+    from worker import http_client
     import time
 
-    monkeypatch.setattr(requests, "get", _fake_get)
+    monkeypatch.setattr(http_client, "get", _fake_get)
     monkeypatch.setattr(time, "sleep", lambda s: None)
 
     from worker.tasks.prices import fetch_price
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import gzip
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+from prometheus_client import REGISTRY
+from pytest import MonkeyPatch
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1 so the client can keep the connection open between requests
+    protocol_version = "HTTP/1.1"
+    seen_encodings: list[str] = []
+
+    def do_GET(self) -> None:  # noqa: N802 - http.server naming
+        type(self).seen_encodings.append(self.headers.get("Accept-Encoding", ""))
+        body = gzip.compress(json.dumps({"bitcoin": {"usd": 101.5}}).encode())
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: object) -> None:
+        return None
+
+
+@pytest.fixture
+def stub_upstream(monkeypatch: MonkeyPatch) -> Iterator[str]:
+    from worker import http_client
+
+    _StubHandler.seen_encodings = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    host = f"127.0.0.1:{server.server_address[1]}"
+    monkeypatch.setenv("UPSTREAM_BASE_URL", f"http://{host}/api/v3")
+    http_client.set_session(None)
+    try:
+        yield host
+    finally:
+        http_client.set_session(None)
+        server.shutdown()
+        server.server_close()
+
+
+def _sample(name: str, host: str) -> float:
+    return REGISTRY.get_sample_value(name, {"host": host}) or 0.0
+
+
+def test_fetch_price_reuses_one_pooled_connection(
+    stub_upstream: str, monkeypatch: MonkeyPatch, tmp_path: Path
+) -> None:
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path}/worker_http.db")
+    from app.db import create_all
+    from worker.tasks.prices import fetch_price
+
+    create_all()
+
+    for _ in range(3):
+        assert fetch_price.run("BTC") == 101.5
+
+    # gzip body decoded transparently; three requests over a single connection
+    assert all("gzip" in enc for enc in _StubHandler.seen_encodings)
+    assert _sample("upstream_http_requests_total", stub_upstream) == 3
+    assert _sample("upstream_http_connections_opened_total", stub_upstream) == 1
+
+
+def test_session_is_shared_and_injectable(stub_upstream: str) -> None:
+    import requests
+
+    from worker import http_client
+
+    assert http_client.get_session() is http_client.get_session()
+
+    injected = requests.Session()
+    http_client.set_session(injected)
+    assert http_client.get_session() is injected
+    resp = http_client.get(f"{http_client.base_url()}/simple/price")
+    assert resp.json() == {"bitcoin": {"usd": 101.5}}
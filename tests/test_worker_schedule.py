@@ -37,3 +37,59 @@ def test_schedule_does_not_include_backfill(
 
     schedule = celery_app.conf.beat_schedule
     assert not any(k.startswith("ensure_backfill_") for k in schedule)
+
+
+def test_batch_schedule_has_one_fetch_entry() -> None:
+    from worker.schedule import build_beat_schedule
+
+    schedule = build_beat_schedule(["btc", "ETH", " "], 60, batch=True)
+    fetches = [v for v in schedule.values() if v["task"].startswith("fetch_")]
+    assert fetches == [schedule["fetch_batch"]]
+    assert schedule["fetch_batch"]["task"] == "fetch_prices_batch"
+    assert schedule["fetch_batch"]["args"] == (["BTC", "ETH"],)
+    # Alerts stay per asset
+    assert schedule["compute_BTC"]["args"] == ("BTC",)
+    assert schedule["compute_ETH"]["args"] == ("ETH",)
+
+
+def test_write_behind_schedules_buffer_flush(monkeypatch: MonkeyPatch) -> None:
+    monkeypatch.setenv("ENABLE_WORKER_METRICS", "false")
+    monkeypatch.setenv("ENABLE_BEAT", "true")
+    monkeypatch.setenv("ASSETS", "BTC")
+    monkeypatch.setenv("WRITE_BUFFER_FLUSH_SECONDS", "2")
+
+    from worker.worker_app import _build_schedule_from_env
+
+    assert "flush_price_buffer" not in _build_schedule_from_env()
+    monkeypatch.setenv("WRITE_BEHIND", "true")
+    entry = _build_schedule_from_env()["flush_price_buffer"]
+    assert entry["task"] == "flush_price_buffer"
+    assert entry["schedule"].run_every.total_seconds() == 2
+
+
+def test_alerts_mode_batch_schedules_one_compute_entry(
+    monkeypatch: MonkeyPatch,
+) -> None:
+    monkeypatch.setenv("ENABLE_WORKER_METRICS", "false")
+    monkeypatch.setenv("ENABLE_BEAT", "true")
+    monkeypatch.setenv("ASSETS", "BTC,ETH")
+    monkeypatch.setenv("ALERTS_MODE", "batch")
+
+    from worker.worker_app import _build_schedule_from_env
+
+    schedule = _build_schedule_from_env()
+    computes = [v for v in schedule.values() if v["task"].startswith("compute_")]
+    assert computes == [schedule["compute_all"]]
+    assert schedule["compute_all"]["task"] == "compute_alerts_all"
+    assert schedule["compute_all"]["args"] == (["BTC", "ETH"],)
+    # Fetching is unaffected
+    assert schedule["fetch_BTC"]["task"] == "fetch_price"
+
+    monkeypatch.setenv("ALERTS_MODE", "stream")
+    schedule = _build_schedule_from_env()
+    assert not [v for v in schedule.values() if v["task"].startswith("compute_")]
+
+    monkeypatch.setenv("ALERT_RULES", "true")
+    entry = _build_schedule_from_env()["evaluate_alert_rules"]
+    assert entry["task"] == "evaluate_alert_rules"
+    assert entry["args"] == (["BTC", "ETH"],)
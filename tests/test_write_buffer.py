@@ -0,0 +1,266 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, Iterator
+
+import pytest
+from prometheus_client import REGISTRY
+from pytest import MonkeyPatch
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+
+class _FakePipeline:
+    """WATCH/MULTI/EXEC over `_FakeRedis`, for the guarded LTRIM."""
+
+    def __init__(self, redis: "_FakeRedis") -> None:
+        self._redis = redis
+        self._watched: dict[str, bytes | None] = {}
+        self._queued: list[tuple[str, int, int]] = []
+
+    def __enter__(self) -> "_FakePipeline":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        return None
+
+    def watch(self, key: str) -> None:
+        self._watched[key] = self._redis.get(key)
+
+    def get(self, key: str) -> bytes | None:
+        return self._redis.get(key)
+
+    def multi(self) -> None:
+        return None
+
+    def ltrim(self, key: str, start: int, end: int) -> None:
+        self._queued.append((key, start, end))
+
+    def execute(self) -> None:
+        from redis.exceptions import WatchError
+
+        if any(self._redis.get(k) != v for k, v in self._watched.items()):
+            raise WatchError("watched key changed")
+        for key, start, end in self._queued:
+            self._redis.ltrim(key, start, end)
+
+
+class _FakeRedis:
+    """The handful of list/string commands the write buffer uses."""
+
+    def __init__(self) -> None:
+        self.lists: dict[str, list[bytes]] = {}
+        self.values: dict[str, bytes] = {}
+        self.fail_trim = False
+        self.expired: list[str] = []
+
+    def rpush(self, key: str, *items: str) -> int:
+        lst = self.lists.setdefault(key, [])
+        lst.extend(i.encode() for i in items)
+        return len(lst)
+
+    def lrange(self, key: str, start: int, end: int) -> list[bytes]:
+        return self.lists.get(key, [])[start : end + 1]
+
+    def ltrim(self, key: str, start: int, end: int) -> None:
+        if self.fail_trim:
+            raise ConnectionError("redis went away")
+        lst = self.lists.get(key, [])
+        self.lists[key] = lst[start:] if end == -1 else lst[start : end + 1]
+
+    def llen(self, key: str) -> int:
+        return len(self.lists.get(key, []))
+
+    def set(
+        self, key: str, value: str, nx: bool = False, ex: int | None = None
+    ) -> bool:
+        if nx and key in self.values:
+            return False
+        self.values[key] = value.encode()
+        return True
+
+    def get(self, key: str) -> bytes | None:
+        return self.values.get(key)
+
+    def delete(self, key: str) -> None:
+        self.values.pop(key, None)
+
+    def expire(self, key: str, seconds: int) -> None:
+        self.expired.append(key)
+
+    def pipeline(self) -> _FakePipeline:
+        return _FakePipeline(self)
+
+
+class _Resp:
+    status_code = 200
+
+    def __init__(self, price: float) -> None:
+        self._price = price
+
+    def raise_for_status(self) -> None:
+        return None
+
+    def json(self) -> dict[str, Any]:
+        return {"bitcoin": {"usd": self._price}}
+
+
+@pytest.fixture
+def redis(monkeypatch: MonkeyPatch, tmp_path: Path) -> Iterator[_FakeRedis]:
+    from app.db import create_all
+    from worker import write_buffer
+
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path}/write_buffer.db")
+    monkeypatch.setenv("WRITE_BEHIND", "true")
+    create_all()
+    fake = _FakeRedis()
+    write_buffer.set_client(fake)
+    try:
+        yield fake
+    finally:
+        write_buffer.set_client(None)
+
+
+def _rows() -> int:
+    from app.db import get_engine
+    from app.models import PriceHistory
+
+    with Session(bind=get_engine()) as db:
+        return int(
+            db.execute(select(func.count()).select_from(PriceHistory)).scalar_one()
+        )
+
+
+def test_fetch_price_buffers_until_flush(
+    redis: _FakeRedis, monkeypatch: MonkeyPatch
+) -> None:
+    from worker import http_client
+    from worker.tasks.prices import fetch_price, flush_price_buffer
+
+    quotes = iter([100.0, 101.0, 102.0])
+    monkeypatch.setattr(
+        http_client, "get", lambda url, timeout=None: _Resp(next(quotes))
+    )
+    for _ in range(3):
+        fetch_price.run("BTC")
+
+    assert _rows() == 0
+    assert REGISTRY.get_sample_value("price_buffer_depth") == 3
+
+    assert flush_price_buffer.run() == 3
+    assert _rows() == 3
+    assert redis.llen("price_buffer") == 0
+    assert REGISTRY.get_sample_value("price_buffer_depth") == 0
+    assert REGISTRY.get_sample_value("price_buffer_flush_seconds_count")
+
+
+def test_crossing_size_threshold_triggers_flush(
+    redis: _FakeRedis, monkeypatch: MonkeyPatch
+) -> None:
+    from datetime import datetime, timezone
+
+    from worker.tasks import prices as prices_tasks
+    from worker.worker_app import celery_app
+
+    monkeypatch.setenv("WRITE_BUFFER_MAX_ROWS", "3")
+    sent: list[str] = []
+    monkeypatch.setattr(celery_app, "send_task", lambda name, **kw: sent.append(name))
+
+    now = datetime.now(timezone.utc)
+    for n in range(5):
+        prices_tasks._buffer([("BTC", now.replace(microsecond=n), 1.0)])
+    # Only the push that crosses 3 kicks a flush, not every one after it
+    assert sent == ["flush_price_buffer"]
+
+
+def test_flush_replays_batch_after_crash_without_duplicates(
+    redis: _FakeRedis,
+) -> None:
+    from datetime import datetime, timedelta, timezone
+
+    from app.db import get_engine
+    from worker import write_buffer
+
+    start = datetime.now(timezone.utc)
+    write_buffer.push(("ETH", start + timedelta(seconds=i), 10.0 + i) for i in range(4))
+
+    # Crash after the commit but before the batch is trimmed off the list
+    redis.fail_trim = True
+    with Session(bind=get_engine()) as db, pytest.raises(ConnectionError):
+        write_buffer.flush(db)
+    assert _rows() == 4
+    assert redis.llen("price_buffer") == 4
+    redis.fail_trim = False
+    # the lock was released, the replay writes nothing twice
+    with Session(bind=get_engine()) as db:
+        assert write_buffer.flush(db) == 0
+    assert _rows() == 4
+    assert redis.llen("price_buffer") == 0
+
+
+def test_flush_skips_while_another_flush_holds_the_lock(redis: _FakeRedis) -> None:
+    from datetime import datetime, timezone
+
+    from app.db import get_engine
+    from worker import write_buffer
+
+    write_buffer.push([("BTC", datetime.now(timezone.utc), 1.0)])
+    redis.set("price_buffer:flush_lock", "someone-else")
+    with Session(bind=get_engine()) as db:
+        assert write_buffer.flush(db) == 0
+    assert redis.llen("price_buffer") == 1
+
+
+def test_flush_keeps_its_lock_alive_during_a_slow_write(
+    redis: _FakeRedis, monkeypatch: MonkeyPatch
+) -> None:
+    import time
+    from datetime import datetime, timezone
+
+    from app.db import get_engine
+    from worker import write_buffer
+
+    write_buffer.push([("BTC", datetime.now(timezone.utc), 1.0)])
+    write = write_buffer._write
+
+    def _slow(db: Session, samples: list[Any]) -> int:
+        time.sleep(0.5)
+        return write(db, samples)
+
+    monkeypatch.setattr(write_buffer, "_write", _slow)
+    with Session(bind=get_engine()) as db:
+        assert write_buffer.flush(db, lock_seconds=1) == 1
+    assert "price_buffer:flush_lock" in redis.expired
+    assert redis.llen("price_buffer") == 0
+
+
+def test_flush_that_lost_its_lock_does_not_trim(
+    redis: _FakeRedis, monkeypatch: MonkeyPatch
+) -> None:
+    from datetime import datetime, timedelta, timezone
+
+    from app.db import get_engine
+    from worker import write_buffer
+
+    start = datetime.now(timezone.utc)
+    write_buffer.push(("BTC", start + timedelta(seconds=i), 1.0) for i in range(3))
+    write = write_buffer._write
+
+    def _overtaken(db: Session, samples: list[Any]) -> int:
+        # The lock expired mid-write and another flush took it and read more
+        redis.values["price_buffer:flush_lock"] = b"another-flush"
+        write_buffer.push([("BTC", start + timedelta(seconds=9), 2.0)])
+        return write(db, samples)
+
+    monkeypatch.setattr(write_buffer, "_write", _overtaken)
+    with Session(bind=get_engine()) as db:
+        assert write_buffer.flush(db) == 3
+    # Nothing trimmed: the new lock holder replays the batch, duplicates skipped
+    assert redis.llen("price_buffer") == 4
+    assert redis.get("price_buffer:flush_lock") == b"another-flush"
+    monkeypatch.setattr(write_buffer, "_write", write)
+    redis.delete("price_buffer:flush_lock")
+    with Session(bind=get_engine()) as db:
+        assert write_buffer.flush(db) == 1
+    assert _rows() == 4
+    assert redis.llen("price_buffer") == 0
@@ -0,0 +1,263 @@
+"""Streaming alert evaluation: an in-memory alternative to `compute_alerts`.
+
+`AlertStream` keeps, per asset, the samples of its alert window in a deque,
+with monotonic deques alongside for the window minimum and maximum. Each
+pushed sample evicts what fell out of the window and applies the
+`compute_alerts` rule to the window's first and last price, so one sample
+costs O(1) amortized whatever the window length or sample density. Nothing is
+read back from `price_history`; only the resulting `Alert` rows are written.
+
+The window of a sample at `ts` is `(ts - window, ts]`: what `compute_alerts`
+sees when it runs right after that sample landed. Deadband assets start the
+window at the price held at its start (the last sample pushed out of it), as
+`compute_alerts` does with the row stored at or before the start.
+
+Alerts go through `app.alert_episodes.record`, so assets with episodes update
+their open alert instead of adding rows. `worker.ingest_service` feeds one
+with every fetched sample when ALERTS_MODE=stream; `warm` loads the windows from the database on startup.
+Per-asset overrides are read by `warm`: later changes need a restart.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from typing import (
+    Deque,
+    Dict,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.alert_episodes import Episodes, Evaluation, record
+from app.alert_episodes import settings_for as episode_settings
+from app.asset_cache import AssetRef, asset_ref
+from app.deadband import ASSETS_PER_QUERY, settings_for
+from app.models import Asset, PriceHistory
+from worker.tasks.alerts import default_settings, report_alerts
+
+Point = Tuple[datetime, float]
+
+
+class SlidingWindow:
+    """Samples of the last `window` for one asset; O(1) first/last/min/max."""
+
+    __slots__ = ("window", "carry_in", "held", "_points", "_min", "_max", "_evicted")
+
+    def __init__(self, window: timedelta, carry_in: bool = False) -> None:
+        self.window = window
+        self.carry_in = carry_in
+        # The last point pushed out of the window: the price held at its start
+        self.held: Optional[Point] = None
+        self._points: Deque[Point] = deque()
+        # (sequence number, price), prices increasing / decreasing from the left
+        self._min: Deque[Tuple[int, float]] = deque()
+        self._max: Deque[Tuple[int, float]] = deque()
+        self._evicted = 0
+
+    def __len__(self) -> int:
+        return len(self._points)
+
+    def push(self, ts: datetime, price: float) -> bool:
+        """Add a sample and evict what left the window; False if out of order."""
+        if self._points and ts <= self._points[-1][0]:
+            return False
+        seq = self._evicted + len(self._points)
+        self._points.append((ts, price))
+        while self._min and self._min[-1][1] >= price:
+            self._min.pop()
+        self._min.append((seq, price))
+        while self._max and self._max[-1][1] <= price:
+            self._max.pop()
+        self._max.append((seq, price))
+        cutoff = ts - self.window
+        while self._points[0][0] <= cutoff:
+            self.held = self._points.popleft()
+            if self._min[0][0] == self._evicted:
+                self._min.popleft()
+            if self._max[0][0] == self._evicted:
+                self._max.popleft()
+            self._evicted += 1
+        return True
+
+    @property
+    def first(self) -> Optional[Point]:
+        if self.carry_in and self.held is not None:
+            return self.held
+        return self._points[0] if self._points else None
+
+    @property
+    def last(self) -> Optional[Point]:
+        return self._points[-1] if self._points else None
+
+    @property
+    def min(self) -> Optional[float]:
+        """Lowest price inside the window (the held price is not included)."""
+        return self._min[0][1] if self._min else None
+
+    @property
+    def max(self) -> Optional[float]:
+        return self._max[0][1] if self._max else None
+
+    def change_pct(self) -> Optional[float]:
+        """First-to-last change, or None where `compute_alerts` would skip."""
+        first, last = self.first, self.last
+        if first is None or last is None or first[0] == last[0] or first[1] == 0.0:
+            return None
+        return (last[1] - first[1]) / first[1] * 100.0
+
+
+class _Tracked(NamedTuple):
+    window: SlidingWindow
+    window_minutes: int
+    threshold: float
+    episodes: Optional[Episodes]
+
+
+class AlertStream:
+    """Sliding windows for many assets; alerts wait in memory until `write`."""
+
+    def __init__(self) -> None:
+        self._assets: Dict[str, _Tracked] = {}
+        self._pending: List[Evaluation] = []
+
+    def track(self, asset: AssetRef) -> SlidingWindow:
+        """(Re)start the window of `asset` with its overrides over the env defaults."""
+        wm, tp = default_settings()
+        window_m = wm
+        if asset.alert_window_min is not None:
+            window_m = int(asset.alert_window_min)
+        threshold = float(asset.alert_pct) if asset.alert_pct is not None else tp
+        window = SlidingWindow(
+            timedelta(minutes=window_m), carry_in=settings_for(asset) is not None
+        )
+        self._assets[asset.symbol.upper()] = _Tracked(
+            window, window_m, threshold, episode_settings(asset)
+        )
+        return window
+
+    def window(self, symbol: str) -> Optional[SlidingWindow]:
+        tracked = self._assets.get(symbol.upper())
+        return tracked.window if tracked is not None else None
+
+    def warm(self, db: Session, symbols: Optional[Sequence[str]] = None) -> int:
+        """Track `symbols` (default: every asset) and load their windows.
+
+        Rows come in one ordered range scan per ASSETS_PER_QUERY assets, plus a
+        `LIMIT 1` seek per deadband asset for the price held at the window
+        start. Returns the number of samples loaded.
+        """
+        q = select(Asset).order_by(Asset.id)
+        if symbols is not None:
+            q = q.where(Asset.symbol.in_(sorted({s.upper() for s in symbols})))
+        refs = [asset_ref(a) for a in db.execute(q).scalars()]
+        now = datetime.now(timezone.utc)
+        windows = {ref.id: self.track(ref) for ref in refs}
+        ts = PriceHistory.ts
+        loaded = 0
+        for offset in range(0, len(refs), ASSETS_PER_QUERY):
+            chunk = [ref.id for ref in refs[offset : offset + ASSETS_PER_QUERY]]
+            start = now - max(windows[i].window for i in chunk)
+            rows = db.execute(
+                select(PriceHistory.asset_id, ts, PriceHistory.price)
+                .where(PriceHistory.asset_id.in_(chunk), ts > start)
+                .order_by(PriceHistory.asset_id, ts)
+            )
+            for asset_id, row_ts, price in rows:
+                window = windows[asset_id]
+                if row_ts > now - window.window:
+                    loaded += window.push(row_ts, float(price))
+        for asset_id, window in windows.items():
+            if not window.carry_in:
+                continue
+            held = db.execute(
+                select(ts, PriceHistory.price)
+                .where(PriceHistory.asset_id == asset_id, ts <= now - window.window)
+                .order_by(ts.desc())
+                .limit(1)
+            ).first()
+            if held is not None:
+                window.held = (held.ts, float(held.price))
+        return loaded
+
+    def push(self, symbol: str, ts: datetime, price: float) -> Optional[Evaluation]:
+        """Feed one sample; returns the evaluation if it crossed the threshold.
+
+        Unknown symbols (assets created after `warm`) are tracked with the env
+        defaults. Out-of-order samples are ignored.
+        """
+        symbol_u = symbol.upper()
+        tracked = self._assets.get(symbol_u)
+        if tracked is None:
+            self.track(
+                AssetRef(id=0, symbol=symbol_u, alert_pct=None, alert_window_min=None)
+            )
+            tracked = self._assets[symbol_u]
+        if not tracked.window.push(ts, price):
+            return None
+        evaluation = Evaluation(
+            0,
+            symbol_u,
+            ts,
+            tracked.window_minutes,
+            tracked.window.change_pct(),
+            tracked.threshold,
+            tracked.episodes,
+        )
+        # Quiet samples matter only to assets with episodes: they may close one
+        if evaluation.fired or evaluation.episodes is not None:
+            self._pending.append(evaluation)
+        return evaluation if evaluation.fired else None
+
+    def take(self) -> List[Evaluation]:
+        """Hand over the pending evaluations (oldest first) for `write`."""
+        pending, self._pending = self._pending, []
+        return pending
+
+    def requeue(
+        self, evaluations: Sequence[Evaluation], max_per_symbol: Optional[int] = None
+    ) -> None:
+        """Put evaluations whose `write` was rolled back ahead of newer ones.
+
+        With `max_per_symbol` only the newest that many per symbol are kept.
+        """
+        merged = list(evaluations) + self._pending
+        if max_per_symbol is not None:
+            kept: Dict[str, int] = {}
+            newest_first = []
+            for e in reversed(merged):
+                kept[e.symbol] = kept.get(e.symbol, 0) + 1
+                if kept[e.symbol] <= max_per_symbol:
+                    newest_first.append(e)
+            merged = newest_first[::-1]
+        self._pending = merged
+
+    @staticmethod
+    def write(
+        db: Session, asset_ids: Mapping[str, int], evaluations: Sequence[Evaluation]
+    ) -> List[Evaluation]:
+        """Record evaluations from `take` in `db`; the caller commits.
+
+        Returns the ones that created an alert. Evaluations of symbols missing
+        from `asset_ids` are dropped. If the transaction fails, `requeue` them.
+        """
+        return record(
+            db,
+            [
+                e._replace(asset_id=asset_ids[e.symbol])
+                for e in evaluations
+                if e.symbol in asset_ids
+            ],
+        )
+
+    @staticmethod
+    def report(alerts: Sequence[Evaluation]) -> None:
+        """Metrics and log lines for alerts once they are committed."""
+        report_alerts(list(alerts))
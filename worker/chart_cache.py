@@ -0,0 +1,133 @@
+"""On-disk read-through cache for upstream market_chart payloads.
+
+Entries are content-addressed files (sha256 of coin id + range + granularity)
+holding the parsed `prices` list as JSON, so a retried task or another worker
+sharing MARKET_CHART_CACHE_DIR reuses a download instead of spending upstream
+quota. Writes go through a temp file + os.replace, so concurrent writers never
+expose partial entries. Cache I/O errors degrade to a plain upstream fetch.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, List, Optional, Sequence
+
+import orjson
+from prometheus_client import Counter
+
+log = logging.getLogger(__name__)
+
+CACHE_LOOKUPS = Counter(
+    "market_chart_cache_total", "market_chart cache lookups", ["result"]
+)
+
+# A temp file older than this is left over from a writer that died between
+# write and rename; younger ones may still be in flight in another worker
+STALE_TMP_SECONDS = 600
+
+
+def _directory() -> Optional[Path]:
+    raw = os.getenv(
+        "MARKET_CHART_CACHE_DIR",
+        os.path.join(tempfile.gettempdir(), "telemetry-market-chart"),
+    )
+    # An empty value turns the cache off
+    return Path(raw) if raw.strip() else None
+
+
+def _ttl_seconds() -> float:
+    return float(os.getenv("MARKET_CHART_CACHE_TTL_SECONDS", "300"))
+
+
+def _max_bytes() -> int:
+    return int(os.getenv("MARKET_CHART_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+
+def cache_key(coin_id: str, start: str, end: str, granularity: str) -> str:
+    raw = "|".join((coin_id, start, end, granularity))
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def _read(path: Path, ttl: float) -> Optional[List[Any]]:
+    try:
+        age = time.time() - path.stat().st_mtime
+        if age > ttl:
+            path.unlink(missing_ok=True)
+            return None
+        data = orjson.loads(path.read_bytes())
+    except FileNotFoundError:
+        return None
+    except (OSError, orjson.JSONDecodeError) as exc:
+        log.warning("market_chart cache read %s failed: %s", path.name, exc)
+        return None
+    return data if isinstance(data, list) else None
+
+
+def _write(directory: Path, path: Path, prices: Sequence[Any]) -> None:
+    tmp: Optional[str] = None
+    try:
+        directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(orjson.dumps(list(prices)))
+        os.replace(tmp, path)
+        tmp = None
+        _evict(directory, _max_bytes())
+    except OSError as exc:
+        log.warning("market_chart cache write %s failed: %s", path.name, exc)
+        if tmp is not None:
+            Path(tmp).unlink(missing_ok=True)
+
+
+def _evict(directory: Path, max_bytes: int) -> None:
+    """Delete stale temp files, then the oldest entries until the directory
+    fits in `max_bytes`.
+
+    Temp files still being written count against the cap but are never
+    deleted here.
+    """
+    entries = []
+    total = 0
+    stale_before = time.time() - STALE_TMP_SECONDS
+    for entry in [*directory.glob("*.json"), *directory.glob("*.tmp")]:
+        try:
+            st = entry.stat()
+        except FileNotFoundError:  # removed by another worker
+            continue
+        if entry.suffix == ".tmp":
+            if st.st_mtime < stale_before:
+                entry.unlink(missing_ok=True)
+            else:
+                total += st.st_size
+            continue
+        entries.append((st.st_mtime, st.st_size, entry))
+    total += sum(size for _, size, _ in entries)
+    for _, size, entry in sorted(entries, key=lambda e: e[0]):
+        if total <= max_bytes:
+            break
+        entry.unlink(missing_ok=True)
+        total -= size
+
+
+def read_through(key: str, fetch: Callable[[], Sequence[Any]]) -> List[Any]:
+    """Cached `prices` payload for `key`, calling `fetch` on a miss."""
+    directory = _directory()
+    if directory is None:
+        return list(fetch())
+    path = directory / f"{key}.json"
+    cached = _read(path, _ttl_seconds())
+    if cached is not None:
+        CACHE_LOOKUPS.labels(result="hit").inc()
+        return cached
+    CACHE_LOOKUPS.labels(result="miss").inc()
+    prices = list(fetch())
+    # An empty payload is more likely an upstream hiccup than a real answer;
+    # don't pin it for the whole TTL
+    if prices:
+        _write(directory, path, prices)
+    return prices
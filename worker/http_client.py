@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import os
+import threading
+from urllib.parse import urlsplit
+
+import requests
+from prometheus_client import Counter
+from requests.adapters import HTTPAdapter
+
+# Upstream API root; point it at a local stub server in tests or staging.
+DEFAULT_BASE_URL = "https://api.coingecko.com/api/v3"
+
+UPSTREAM_REQUESTS = Counter(
+    "upstream_http_requests_total", "HTTP requests sent to upstream APIs", ["host"]
+)
+# requests_total / connections_opened_total is the keep-alive reuse ratio
+UPSTREAM_CONNECTIONS = Counter(
+    "upstream_http_connections_opened_total",
+    "New TCP (+TLS) connections opened to upstream APIs",
+    ["host"],
+)
+
+_lock = threading.Lock()
+_session: requests.Session | None = None
+_session_pid: int | None = None
+
+
+def base_url() -> str:
+    return os.getenv("UPSTREAM_BASE_URL", DEFAULT_BASE_URL).rstrip("/")
+
+
+def _timeouts(read: float | None) -> tuple[float, float]:
+    connect = float(os.getenv("UPSTREAM_CONNECT_TIMEOUT", "3.05"))
+    default_read = float(os.getenv("UPSTREAM_READ_TIMEOUT", "10"))
+    return connect, float(read) if read is not None else default_read
+
+
+def _build_session() -> requests.Session:
+    pool_size = int(os.getenv("UPSTREAM_POOL_SIZE", "10"))
+    session = requests.Session()
+    # Retries stay in the callers' backoff loops; the adapter only pools
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, max_retries=0)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    # requests decodes gzip/deflate bodies transparently
+    session.headers.update({"Accept-Encoding": "gzip, deflate"})
+    return session
+
+
+def get_session() -> requests.Session:
+    """The process-wide pooled session, created lazily.
+
+    Rebuilt after a fork (Celery prefork children) so processes never share
+    sockets inherited from the parent.
+    """
+    global _session, _session_pid
+    with _lock:
+        if _session is None or _session_pid != os.getpid():
+            _session = _build_session()
+            _session_pid = os.getpid()
+        return _session
+
+
+def set_session(session: requests.Session | None) -> None:
+    """Inject a session (e.g. with a custom adapter); None restores the default."""
+    global _session, _session_pid
+    with _lock:
+        if _session is not None and _session is not session:
+            _session.close()
+        _session = session
+        _session_pid = os.getpid() if session is not None else None
+
+
+def _opened_connections(session: requests.Session, url: str) -> int:
+    """Connections opened so far by the adapter's pools for the URL's host."""
+    manager = getattr(session.get_adapter(url), "poolmanager", None)
+    if manager is None:  # injected non-pooling adapter
+        return 0
+    hostname = urlsplit(url).hostname
+    total = 0
+    for key in manager.pools.keys():
+        pool = manager.pools.get(key)
+        if pool is not None and pool.host == hostname:
+            total += int(pool.num_connections)
+    return total
+
+
+def get(url: str, timeout: float | None = None) -> requests.Response:
+    """GET through the pooled session; `timeout` overrides the read timeout."""
+    session = get_session()
+    host = urlsplit(url).netloc
+    before = _opened_connections(session, url)
+    try:
+        return session.get(url, timeout=_timeouts(timeout))
+    finally:
+        UPSTREAM_REQUESTS.labels(host=host).inc()
+        opened = _opened_connections(session, url) - before
+        if opened > 0:
+            UPSTREAM_CONNECTIONS.labels(host=host).inc(opened)
@@ -0,0 +1,374 @@
+"""Asyncio ingestion loop: an alternative to per-symbol `fetch_price` tasks.
+
+Run with `python -m worker.ingest_service`. One process fetches every symbol in
+ASSETS each FETCH_INTERVAL_SECONDS, spreading them over concurrent simple/price
+requests (INGEST_BATCH_SIZE ids each) under one shared rate limit, which a 429
+pauses for its Retry-After. Buffered samples go to the DB every
+INGEST_FLUSH_SECONDS in one transaction.
+A failed flush puts its samples (and alert evaluations) back in the buffer, at
+most INGEST_MAX_PENDING per symbol with the newest kept, for the next one.
+SIGTERM/SIGINT stop the loop after a final flush. No broker or result backend
+is involved; FETCH_* metrics are the same ones the Celery tasks export.
+
+With ALERTS_MODE=stream the service also evaluates alerts itself: every
+fetched sample goes through a `worker.alert_stream.AlertStream` (warmed from
+the DB when `run` starts) and the alerts it raises are inserted in the same
+transaction as the samples.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import signal
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import httpx
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import Session
+
+from app.alert_episodes import Evaluation
+from app.asset_cache import get_or_create_asset
+from app.db import get_async_engine
+from app.deadband import filter_samples
+from app.ingest import insert_samples
+from app.rollups import apply_points_many
+from worker.alert_stream import AlertStream
+from worker.sources import get_source
+from worker.tasks.prices import FETCH_DURATION, FETCH_FAILURE, FETCH_SUCCESS
+
+log = logging.getLogger(__name__)
+
+Point = Tuple[datetime, float]
+
+# Pause after a 429 that carries no usable Retry-After
+DEFAULT_RETRY_AFTER_SECONDS = 60.0
+
+
+class RateLimiter:
+    """Token bucket shared by every request the service sends."""
+
+    def __init__(self, per_minute: float, burst: int = 1) -> None:
+        self._rate = per_minute / 60.0
+        self._burst = float(max(1, burst))
+        self._tokens = self._burst
+        self._updated = time.monotonic()
+        self._resume_at = 0.0
+        self._lock = asyncio.Lock()
+
+    def pause(self, seconds: float) -> None:
+        """Hold every request back for `seconds` (e.g. upstream's Retry-After)."""
+        self._resume_at = max(self._resume_at, time.monotonic() + seconds)
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._resume_at:
+                    await asyncio.sleep(self._resume_at - now)
+                    continue
+                self._tokens = min(
+                    self._burst, self._tokens + (now - self._updated) * self._rate
+                )
+                self._updated = now
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return
+                await asyncio.sleep((1.0 - self._tokens) / self._rate)
+
+
+class IngestService:
+    def __init__(
+        self,
+        symbols: Sequence[str],
+        interval_seconds: float,
+        *,
+        batch_size: int = 250,
+        concurrency: int = 8,
+        rate_per_minute: float = 30.0,
+        flush_seconds: float = 5.0,
+        client: Optional[httpx.AsyncClient] = None,
+        resolve_id: Optional[Callable[[str], Optional[str]]] = None,
+        alerts: Optional[AlertStream] = None,
+        max_pending: int = 1000,
+    ) -> None:
+        self.symbols = list(
+            dict.fromkeys(s.strip().upper() for s in symbols if s.strip())
+        )
+        self.interval_seconds = interval_seconds
+        self.batch_size = max(1, batch_size)
+        self.flush_seconds = flush_seconds
+        self.max_pending = max(1, max_pending)
+        self._client = client
+        # Any PRICE_SOURCE works: they all speak the simple/price protocol
+        self._source = get_source()
+        self._resolve_id = resolve_id or self._source.resolve
+        self._limiter = RateLimiter(rate_per_minute, burst=concurrency)
+        self._slots = asyncio.Semaphore(max(1, concurrency))
+        self._pending: Dict[str, List[Point]] = {}
+        self._asset_ids: Dict[str, int] = {}
+        self.alerts = alerts
+
+    def _batches(self) -> List[Dict[str, str]]:
+        """symbol -> upstream id, split into requests of `batch_size` ids."""
+        ids: Dict[str, str] = {}
+        for symbol in self.symbols:
+            cg_id = self._resolve_id(symbol)
+            if cg_id is None:
+                FETCH_FAILURE.labels(symbol=symbol).inc()
+                continue
+            ids[symbol] = cg_id
+        items = list(ids.items())
+        return [
+            dict(items[i : i + self.batch_size])
+            for i in range(0, len(items), self.batch_size)
+        ]
+
+    async def _fetch(self, client: httpx.AsyncClient, batch: Dict[str, str]) -> None:
+        ids = ",".join(sorted(set(batch.values())))
+        url = f"{self._source.base_url()}/simple/price"
+        async with self._slots:
+            await self._limiter.acquire()
+            started = time.perf_counter()
+            try:
+                resp = await client.get(
+                    url, params={"ids": ids, "vs_currencies": "usd"}
+                )
+                resp.raise_for_status()
+                data = resp.json()
+            except httpx.HTTPStatusError as exc:
+                if exc.response.status_code != 429:
+                    log.warning("simple/price for %d ids failed: %s", len(batch), exc)
+                else:
+                    # Over upstream's quota: back off everything, not just this batch
+                    pause = _retry_after(exc.response)
+                    self._limiter.pause(pause)
+                    log.warning(
+                        "simple/price rate limited (429); pausing requests for %.0f s",
+                        pause,
+                    )
+                for symbol in batch:
+                    FETCH_FAILURE.labels(symbol=symbol).inc()
+                return
+            except Exception as exc:
+                # The next tick retries; the limiter already spaces requests out
+                log.warning("simple/price for %d ids failed: %s", len(batch), exc)
+                for symbol in batch:
+                    FETCH_FAILURE.labels(symbol=symbol).inc()
+                return
+            finally:
+                elapsed = time.perf_counter() - started
+                for symbol in batch:
+                    FETCH_DURATION.labels(symbol=symbol).observe(elapsed)
+        ts = datetime.now(timezone.utc)
+        for symbol, cg_id in batch.items():
+            try:
+                price = float(data[cg_id]["usd"])
+            except (KeyError, TypeError, ValueError):
+                FETCH_FAILURE.labels(symbol=symbol).inc()
+                continue
+            # One per fetched sample, like the Celery tasks; deadband and
+            # dedup only decide what the flush stores
+            FETCH_SUCCESS.labels(symbol=symbol).inc()
+            self._pending.setdefault(symbol, []).append((ts, price))
+            if self.alerts is not None:
+                self.alerts.push(symbol, ts, price)
+
+    async def tick(self) -> None:
+        """Fetch every symbol once; results wait in the buffer for `flush`."""
+        client = self._client or _build_client()
+        try:
+            await asyncio.gather(*(self._fetch(client, b) for b in self._batches()))
+        finally:
+            if client is not self._client:
+                await client.aclose()
+
+    def _write(
+        self,
+        db: Session,
+        pending: Dict[str, List[Point]],
+        evaluations: List[Evaluation],
+    ) -> Tuple[Dict[str, int], List[Evaluation]]:
+        for symbol in pending:
+            if symbol not in self._asset_ids:
+                # Creation commits on its own, before the batch transaction
+                self._asset_ids[symbol] = get_or_create_asset(db, symbol).id
+        samples = filter_samples(
+            db,
+            [
+                (self._asset_ids[symbol], ts, price)
+                for symbol, points in pending.items()
+                for ts, price in points
+            ],
+        )
+        fresh: Dict[int, List[Point]] = {}
+        for asset_id, ts, price in insert_samples(db, samples):
+            fresh.setdefault(asset_id, []).append((ts, price))
+        apply_points_many(db, fresh)
+        alerts = AlertStream.write(db, self._asset_ids, evaluations)
+        db.commit()
+        return {s: len(fresh.get(self._asset_ids[s], ())) for s in pending}, alerts
+
+    async def flush(self) -> int:
+        """Write everything buffered so far in one transaction; returns row count."""
+        pending, self._pending = self._pending, {}
+        evaluations = self.alerts.take() if self.alerts is not None else []
+        if not pending and not evaluations:
+            return 0
+        SessionLocal = async_sessionmaker(
+            bind=get_async_engine(), expire_on_commit=False
+        )
+        try:
+            async with SessionLocal() as db:
+                stored, alerts = await db.run_sync(self._write, pending, evaluations)
+        except Exception:
+            self._requeue(pending)
+            if self.alerts is not None:
+                self.alerts.requeue(evaluations, self.max_pending)
+            raise
+        AlertStream.report(alerts)
+        return sum(stored.values())
+
+    def _requeue(self, pending: Dict[str, List[Point]]) -> None:
+        """Put unwritten samples back ahead of those buffered since."""
+        for symbol, points in pending.items():
+            merged = points + self._pending.get(symbol, [])
+            dropped = len(merged) - self.max_pending
+            if dropped > 0:
+                # Only the overflow is lost; it counts as failed fetches
+                FETCH_FAILURE.labels(symbol=symbol).inc(dropped)
+                merged = merged[dropped:]
+            self._pending[symbol] = merged
+
+    async def warm_alerts(self) -> int:
+        """Load the alert windows of `symbols` from the DB; returns samples read."""
+        if self.alerts is None:
+            return 0
+        SessionLocal = async_sessionmaker(bind=get_async_engine())
+        async with SessionLocal() as db:
+            return await db.run_sync(self.alerts.warm, self.symbols)
+
+    async def _flush_logged(self) -> None:
+        try:
+            await self.flush()
+        except Exception as exc:
+            log.error("ingest flush failed: %s", exc)
+
+    async def _flush_forever(self, stop: asyncio.Event) -> None:
+        while not stop.is_set():
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=self.flush_seconds)
+            except asyncio.TimeoutError:
+                await self._flush_logged()
+
+    async def run(self, stop: Optional[asyncio.Event] = None) -> None:
+        """Tick every `interval_seconds` until `stop` is set, then flush.
+
+        Setting `stop` cancels a tick in progress; whatever is buffered by
+        then goes out in one last flush.
+        """
+        stop = stop or asyncio.Event()
+        owned = self._client is None
+        # One keep-alive client for the whole run, shared by every tick
+        client = self._client = self._client or _build_client()
+        await self.warm_alerts()
+        flusher = asyncio.create_task(self._flush_forever(stop))
+        stopped = asyncio.create_task(stop.wait())
+        try:
+            while not stop.is_set():
+                started = time.monotonic()
+                tick = asyncio.create_task(self.tick())
+                await asyncio.wait({tick, stopped}, return_when=asyncio.FIRST_COMPLETED)
+                if not tick.done():
+                    tick.cancel()
+                    await asyncio.gather(tick, return_exceptions=True)
+                    break
+                tick.result()
+                delay = max(0.0, self.interval_seconds - (time.monotonic() - started))
+                try:
+                    await asyncio.wait_for(stop.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            stop.set()
+            await stopped
+            await flusher
+            await self._flush_logged()
+            if owned:
+                self._client = None
+                await client.aclose()
+
+
+def _retry_after(resp: httpx.Response) -> float:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)."""
+    value = resp.headers.get("Retry-After", "").strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return DEFAULT_RETRY_AFTER_SECONDS
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+def _build_client() -> httpx.AsyncClient:
+    connect = float(os.getenv("UPSTREAM_CONNECT_TIMEOUT", "3.05"))
+    read = float(os.getenv("UPSTREAM_READ_TIMEOUT", "10"))
+    pool = int(os.getenv("UPSTREAM_POOL_SIZE", "10"))
+    return httpx.AsyncClient(
+        timeout=httpx.Timeout(read, connect=connect),
+        limits=httpx.Limits(max_connections=pool, max_keepalive_connections=pool),
+    )
+
+
+def service_from_env() -> IngestService:
+    from worker.worker_app import _parse_assets_env
+
+    return IngestService(
+        _parse_assets_env(),
+        float(os.getenv("FETCH_INTERVAL_SECONDS", "300")),
+        batch_size=int(os.getenv("INGEST_BATCH_SIZE", "250")),
+        concurrency=int(os.getenv("INGEST_CONCURRENCY", "8")),
+        rate_per_minute=float(os.getenv("INGEST_RATE_PER_MINUTE", "30")),
+        flush_seconds=float(os.getenv("INGEST_FLUSH_SECONDS", "5")),
+        alerts=AlertStream() if _stream_alerts() else None,
+        max_pending=int(os.getenv("INGEST_MAX_PENDING", "1000")),
+    )
+
+
+def _stream_alerts() -> bool:
+    return os.getenv("ALERTS_MODE", "per_asset").strip().lower() == "stream"
+
+
+def main() -> None:
+    from worker.worker_app import _enable_metrics, _start_metrics_server
+
+    logging.basicConfig(level=logging.INFO)
+    if _enable_metrics():
+        _start_metrics_server()
+    service = service_from_env()
+    log.info(
+        "ingesting %d symbols every %ss", len(service.symbols), service.interval_seconds
+    )
+    asyncio.run(_serve(service))
+
+
+async def _serve(service: IngestService) -> None:
+    """Run until SIGTERM/SIGINT (e.g. `docker stop`), then flush and exit."""
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stop.set)
+    await service.run(stop)
+
+
+if __name__ == "__main__":
+    main()
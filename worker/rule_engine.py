@@ -0,0 +1,266 @@
+"""Vectorized evaluation of per-asset `AlertRule`s over NumPy arrays.
+
+Rule kinds (value compared with `threshold`; `change` and `zscore` by
+absolute value), each over the samples of the last `window_minutes`:
+
+- change: first-to-last percent change, as `compute_alerts`;
+- drawdown: largest percent fall from a running peak within the window;
+- volatility: sample standard deviation of the log returns, in percent;
+- zscore: last price against the EWMA mean/variance of the samples before
+  it (weights decay by `2 / (span + 1)` per sample, newest first); no value
+  for a flat series (stddev under ZSCORE_MIN_STD of the mean).
+
+Values are clipped to what `Alert.change_pct` can hold.
+
+`load_series` reads the rows of every asset with rules in one ordered range
+scan per ASSETS_PER_QUERY assets and concatenates them into flat arrays.
+`evaluate` then works on all rules at once: window bounds for every rule come
+from one `searchsorted` over (asset, timestamp) keys, and each kind is one
+pass over prefix sums or over the gathered windows of all its rules. Deadband
+assets start each window at the row held at its start, as `compute_alerts`
+does; their rows are loaded one heartbeat further back so it is there.
+
+Needs NumPy (extra "rules").
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from sqlalchemy import Float, cast, select
+from sqlalchemy.orm import Session
+
+from app.alert_episodes import Episodes
+from app.alert_episodes import settings_for as episode_settings
+from app.asset_cache import asset_ref
+from app.deadband import settings_for as deadband_settings
+from app.models import AlertRule, Asset, PriceHistory
+
+try:  # NumPy is optional (extra "rules"); evaluate_alert_rules needs it
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on the environment
+    np = None  # type: ignore[assignment]
+
+KINDS = ("change", "drawdown", "volatility", "zscore")
+DEFAULT_SPAN = 20
+ASSETS_PER_QUERY = 1000
+# zscore needs an EWMA stddev of at least this fraction of the mean: below it
+# the series is flat and one tick (or float rounding) would give a huge z
+ZSCORE_MIN_STD = 1e-6
+# Values are stored in Alert.change_pct, a Numeric(9, 4)
+MAX_VALUE = 99_999.9999
+
+# Timestamps as int64 milliseconds below the asset index: one sorted key array
+_TS_BITS = 42
+
+
+class Rule(NamedTuple):
+    id: int
+    asset_id: int
+    symbol: str
+    kind: str
+    window_minutes: int
+    threshold: float
+    span: int
+    # How far back rows are needed: the window, plus a heartbeat for deadband
+    lookback: timedelta
+    carry_in: bool
+    episodes: Optional[Episodes]
+
+
+class Series(NamedTuple):
+    """Rows of many assets, ordered by (asset, ts); asset i is [starts[i], ends[i])."""
+
+    asset_ids: Any
+    starts: Any
+    ends: Any
+    ts_ms: Any
+    price: Any
+
+
+def require_numpy() -> None:
+    if np is None:
+        raise RuntimeError("alert rules need NumPy: pip install .[rules]")
+
+
+def load_rules(db: Session, symbols: Optional[Sequence[str]] = None) -> List[Rule]:
+    """Enabled rules of known kinds, with their asset's deadband and episodes."""
+    q = (
+        select(AlertRule, Asset)
+        .join(Asset, AlertRule.asset_id == Asset.id)
+        .where(AlertRule.enabled.is_(True), AlertRule.kind.in_(KINDS))
+        .order_by(AlertRule.asset_id, AlertRule.id)
+    )
+    if symbols is not None:
+        q = q.where(Asset.symbol.in_(symbols))
+    rules = []
+    for rule, asset in db.execute(q):
+        ref = asset_ref(asset)
+        band = deadband_settings(ref)
+        window = timedelta(minutes=rule.window_minutes)
+        rules.append(
+            Rule(
+                id=rule.id,
+                asset_id=asset.id,
+                symbol=asset.symbol,
+                kind=rule.kind,
+                window_minutes=rule.window_minutes,
+                threshold=float(rule.threshold),
+                span=rule.span or DEFAULT_SPAN,
+                lookback=window + band.heartbeat if band is not None else window,
+                carry_in=band is not None,
+                episodes=episode_settings(ref),
+            )
+        )
+    return rules
+
+
+def load_series(db: Session, rules: Sequence[Rule], now: datetime) -> Series:
+    """Every row the rules can look at, as flat arrays (one scan per chunk)."""
+    require_numpy()
+    lookback: Dict[int, timedelta] = {}
+    for rule in rules:
+        lookback[rule.asset_id] = max(
+            rule.lookback, lookback.get(rule.asset_id, rule.lookback)
+        )
+    asset_ids = sorted(lookback)
+    id_parts: List[Any] = []
+    ts_parts: List[Any] = []
+    price_parts: List[Any] = []
+    for offset in range(0, len(asset_ids), ASSETS_PER_QUERY):
+        chunk = asset_ids[offset : offset + ASSETS_PER_QUERY]
+        start = now - max(lookback[a] for a in chunk)
+        rows = db.execute(
+            select(
+                PriceHistory.asset_id, PriceHistory.ts, cast(PriceHistory.price, Float)
+            )
+            .where(PriceHistory.asset_id.in_(chunk), PriceHistory.ts >= start)
+            .where(PriceHistory.ts <= now)
+            .order_by(PriceHistory.asset_id, PriceHistory.ts)
+        ).all()
+        count = len(rows)
+        id_parts.append(np.fromiter((r[0] for r in rows), np.int64, count))
+        ts_parts.append(
+            np.fromiter((int(r[1].timestamp() * 1000) for r in rows), np.int64, count)
+        )
+        price_parts.append(np.fromiter((r[2] for r in rows), np.float64, count))
+    ids = np.array(asset_ids, dtype=np.int64)
+    row_ids = np.concatenate(id_parts) if id_parts else np.zeros(0, np.int64)
+    return Series(
+        asset_ids=ids,
+        starts=np.searchsorted(row_ids, ids, side="left"),
+        ends=np.searchsorted(row_ids, ids, side="right"),
+        ts_ms=np.concatenate(ts_parts) if ts_parts else np.zeros(0, np.int64),
+        price=np.concatenate(price_parts) if price_parts else np.zeros(0),
+    )
+
+
+def _gather(lo: Any, hi: Any) -> Tuple[Any, Any, Any]:
+    """Indices of the concatenated ranges [lo, hi), range ids, range offsets."""
+    lengths = hi - lo
+    offsets = np.concatenate(([0], np.cumsum(lengths)))
+    owner = np.repeat(np.arange(len(lo)), lengths)
+    idx = np.arange(offsets[-1]) - offsets[owner] + lo[owner]
+    return idx, owner, offsets[:-1]
+
+
+def _change(p: Any, lo: Any, hi: Any) -> Any:
+    first, last = p[lo], p[hi - 1]
+    out = np.full(len(lo), np.nan)
+    ok = first != 0
+    out[ok] = (last[ok] - first[ok]) / first[ok] * 100.0
+    return out
+
+
+def _drawdown(p: Any, lo: Any, hi: Any) -> Any:
+    idx, owner, offsets = _gather(lo, hi)
+    x = p[idx]
+    # Lift each window above the previous one so a single running max restarts
+    # at every window boundary (prices are positive)
+    lift = owner * (2.0 * float(x.max(initial=0.0)) + 1.0)
+    peak = np.maximum.accumulate(x + lift) - lift
+    fall = np.where(peak > 0, (peak - x) / np.where(peak > 0, peak, 1.0), 0.0)
+    return np.maximum.reduceat(fall, offsets) * 100.0
+
+
+def _volatility(p: Any, starts: Any, lo: Any, hi: Any) -> Any:
+    logp = np.log(np.maximum(p, 1e-12))
+    r = np.diff(logp)
+    # Returns across two assets never fall inside a window; zero them anyway
+    # so the prefix sums stay small
+    r[starts[(starts > 0) & (starts < len(p))] - 1] = 0.0
+    s1 = np.concatenate(([0.0], np.cumsum(r)))
+    s2 = np.concatenate(([0.0], np.cumsum(r * r)))
+    n = (hi - 1 - lo).astype(np.float64)
+    total = s1[hi - 1] - s1[lo]
+    squares = s2[hi - 1] - s2[lo]
+    var = (squares - total * total / n) / (n - 1)
+    return np.sqrt(np.maximum(var, 0.0)) * 100.0
+
+
+def _zscore(p: Any, lo: Any, hi: Any, span: Any) -> Any:
+    # EWMA over the samples before the last one, newest weighted highest
+    idx, owner, offsets = _gather(lo, hi - 1)
+    x = p[idx]
+    age = (hi[owner] - 2) - idx
+    w = (1.0 - 2.0 / (span[owner] + 1.0)) ** age
+    sw = np.add.reduceat(w, offsets)
+    mean = np.add.reduceat(w * x, offsets) / sw
+    var = np.add.reduceat(w * (x - mean[owner]) ** 2, offsets) / sw
+    out = np.full(len(lo), np.nan)
+    ok = var > (ZSCORE_MIN_STD * mean) ** 2
+    out[ok] = (p[hi - 1][ok] - mean[ok]) / np.sqrt(var[ok])
+    return out
+
+
+def evaluate(series: Series, rules: Sequence[Rule], now: datetime) -> Any:
+    """Value of every rule (NaN without enough samples), in `rules` order."""
+    require_numpy()
+    n = len(rules)
+    values = np.full(n, np.nan)
+    if not n or not len(series.price):
+        return values
+    pos = np.searchsorted(series.asset_ids, [r.asset_id for r in rules])
+    window_ms = np.array([r.window_minutes * 60_000 for r in rules], dtype=np.int64)
+    carry_in = np.array([r.carry_in for r in rules], dtype=bool)
+    now_ms = int(now.timestamp() * 1000)
+    base = int(series.ts_ms.min())
+    keys = (
+        np.repeat(
+            np.arange(len(series.asset_ids), dtype=np.int64),
+            series.ends - series.starts,
+        )
+        << _TS_BITS
+    ) + (series.ts_ms - base)
+    seg = pos.astype(np.int64) << _TS_BITS
+    start_rel = np.maximum(now_ms - window_ms - base, 0)
+    lo = np.searchsorted(keys, seg + start_rel, side="left")
+    hi = np.searchsorted(keys, seg + max(now_ms - base, 0), side="right")
+    # Deadband assets: the last row at or before the window start opens it
+    held = np.searchsorted(keys, seg + start_rel, side="right") - 1
+    use_held = carry_in & (held >= series.starts[pos]) & (now_ms - window_ms >= base)
+    lo = np.where(use_held, held, lo)
+    count = hi - lo
+
+    kinds = np.array([r.kind for r in rules])
+    p = series.price
+    for kind, need in (
+        ("change", 2),
+        ("drawdown", 2),
+        ("volatility", 3),
+        ("zscore", 3),
+    ):
+        sel = np.flatnonzero((kinds == kind) & (count >= need))
+        if not len(sel):
+            continue
+        if kind == "change":
+            values[sel] = _change(p, lo[sel], hi[sel])
+        elif kind == "drawdown":
+            values[sel] = _drawdown(p, lo[sel], hi[sel])
+        elif kind == "volatility":
+            values[sel] = _volatility(p, series.starts, lo[sel], hi[sel])
+        else:
+            span = np.array([rules[i].span for i in sel.tolist()], dtype=np.float64)
+            values[sel] = _zscore(p, lo[sel], hi[sel], span)
+    return np.clip(values, -MAX_VALUE, MAX_VALUE)
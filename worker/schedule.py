@@ -6,20 +6,45 @@ from typing import Callable, Dict, List, Mapping, Iterator, Optional
 from celery.schedules import schedule as sched
 
 
-def build_beat_schedule(assets: List[str], every_seconds: int) -> Dict[str, dict]:
+def build_beat_schedule(
+    assets: List[str],
+    every_seconds: int,
+    batch: bool = False,
+    batch_alerts: bool = False,
+    stream_alerts: bool = False,
+) -> Dict[str, dict]:
     """Build a Celery beat schedule for periodic price fetches.
 
-    Each asset gets an entry invoking the `fetch_price` task every N seconds.
+    Each asset gets an entry invoking the `fetch_price` task every N seconds,
+    or with `batch` a single `fetch_prices_batch` entry fetches them all in
+    one upstream request. Alerts likewise run as one `compute_alerts` entry per
+    asset, or with `batch_alerts` as a single `compute_alerts_all` entry. With
+    `stream_alerts` there are none: `worker.ingest_service` evaluates them.
     """
     seconds = max(1, int(every_seconds))
     normalized = [a.strip().upper() for a in assets if a.strip()]
     schedule: Dict[str, dict] = {}
-    for sym in normalized:
-        schedule[f"fetch_{sym}"] = {
-            "task": "fetch_price",
+    if batch and normalized:
+        schedule["fetch_batch"] = {
+            "task": "fetch_prices_batch",
             "schedule": sched(timedelta(seconds=seconds)),
-            "args": (sym,),
+            "args": (normalized,),
         }
+    if batch_alerts and not stream_alerts and normalized:
+        schedule["compute_all"] = {
+            "task": "compute_alerts_all",
+            "schedule": sched(timedelta(seconds=seconds)),
+            "args": (normalized,),
+        }
+    for sym in normalized:
+        if not batch:
+            schedule[f"fetch_{sym}"] = {
+                "task": "fetch_price",
+                "schedule": sched(timedelta(seconds=seconds)),
+                "args": (sym,),
+            }
+        if batch_alerts or stream_alerts:
+            continue
         # Also compute alerts on the same cadence (simple MVP assumption)
         schedule[f"compute_{sym}"] = {
             "task": "compute_alerts",
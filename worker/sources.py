@@ -0,0 +1,213 @@
+"""Upstream price sources, selected with PRICE_SOURCE.
+
+Callers depend on `PriceSource` only. The sources shipped here all speak the
+CoinGecko v3 subset the worker uses (simple/price, coins/{id}/market_chart and
+market_chart/range), implemented once in `V3ApiSource`; each one adds its own
+API root and its own ticker -> upstream id mapping:
+
+- `coingecko` (default): the public API (UPSTREAM_BASE_URL), BTC and ETH.
+- `fake`: the local stand-in exchange from `benchmarks.fake_exchange`
+  (FAKE_EXCHANGE_URL), where any symbol's id is its lowercase ticker, so
+  ingestion can be load-tested with thousands of symbols and no network.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import time
+from datetime import datetime, timedelta, timezone
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, List, Mapping, Optional, Protocol, Tuple
+
+from worker import chart_cache, http_client
+
+Point = Tuple[datetime, float]
+
+CHART_RANGE_ALIGN_SECONDS = 300
+
+
+class PriceSource(Protocol):
+    """What the worker needs from an upstream price source."""
+
+    def base_url(self) -> str: ...
+
+    def resolve(self, symbol: str) -> Optional[str]:
+        """Upstream id for a ticker symbol, or None if the source lacks it."""
+        ...
+
+    def price_usd(self, symbol: str) -> float: ...
+
+    def prices_usd(self, symbols: List[str]) -> Dict[str, float]: ...
+
+    def market_chart_usd(self, symbol: str, hours: int = 24) -> List[Point]: ...
+
+    def market_chart_range_usd(
+        self, symbol: str, start: datetime, end: datetime
+    ) -> List[Point]: ...
+
+
+class V3ApiSource(ABC):
+    """`PriceSource` over the CoinGecko v3 API subset, at `base_url()`.
+
+    Subclasses only say where the API lives and how symbols map to ids;
+    `name` namespaces their entries in the chart cache.
+    """
+
+    name: str
+
+    @abstractmethod
+    def base_url(self) -> str: ...
+
+    @abstractmethod
+    def resolve(self, symbol: str) -> Optional[str]:
+        """Upstream id for a ticker symbol, or None if the source lacks it."""
+
+    def _require(self, symbol: str) -> str:
+        upstream_id = self.resolve(symbol)
+        if upstream_id is None:
+            raise ValueError("unsupported asset symbol")
+        return upstream_id
+
+    def simple_price(self, ids: List[str]) -> Mapping[str, Any]:
+        """Call simple/price for one or more ids in a single request."""
+        url = f"{self.base_url()}/simple/price?ids={','.join(ids)}&vs_currencies=usd"
+        # Minimal, stable backoff on transient errors (429/5xx)
+        delays = [1, 2, 4]
+        last_exc: Exception | None = None
+        for attempt, delay in enumerate([0] + delays):
+            try:
+                resp = http_client.get(url)
+                # If status indicates transient issue, raise to trigger retry
+                if resp.status_code in (429,) or resp.status_code >= 500:
+                    resp.raise_for_status()
+                resp.raise_for_status()
+                data: Mapping[str, Any] = resp.json()
+                return data
+            except Exception as e:  # pragma: no cover - branches tested via monkeypatch
+                last_exc = e
+                if attempt == len(delays):
+                    break
+                time.sleep(delay)
+        assert last_exc is not None
+        raise last_exc
+
+    def price_usd(self, symbol: str) -> float:
+        upstream_id = self._require(symbol)
+        data = self.simple_price([upstream_id])
+        return float(data[upstream_id]["usd"])
+
+    def prices_usd(self, symbols: List[str]) -> Dict[str, float]:
+        """USD prices for every supported symbol, fetched with one upstream call.
+
+        Unsupported symbols and ids missing from the response are left out; the
+        caller decides how to report them.
+        """
+        ids = {s: i for s in symbols if (i := self.resolve(s)) is not None}
+        if not ids:
+            return {}
+        data = self.simple_price(sorted(set(ids.values())))
+        prices: Dict[str, float] = {}
+        for symbol, upstream_id in ids.items():
+            try:
+                prices[symbol] = float(data[upstream_id]["usd"])
+            except (KeyError, TypeError, ValueError):
+                continue
+        return prices
+
+    def _chart(self, url: str, key: str) -> List[Any]:
+        def _download() -> List[Any]:
+            resp = http_client.get(url, timeout=20)
+            resp.raise_for_status()
+            prices: List[Any] = resp.json().get("prices", [])
+            return prices
+
+        return chart_cache.read_through(key, _download)
+
+    def market_chart_usd(self, symbol: str, hours: int = 24) -> List[Point]:
+        """Price points for the last `hours` hours, in UTC."""
+        upstream_id = self._require(symbol)
+        # CoinGecko accepts fractional days; use 1 for <=24h, ceil for more.
+        days = max(1.0, hours / 24.0)
+        url = (
+            f"{self.base_url()}/coins/{upstream_id}/market_chart"
+            f"?vs_currency=usd&days={days}&interval=minute"
+        )
+        key = chart_cache.cache_key(
+            f"{self.name}:{upstream_id}", f"-{days}d", "now", "minute"
+        )
+        series = []
+        cutoff = datetime.now(timezone.utc) - timedelta(hours=hours)
+        for ts_ms, price in self._chart(url, key):
+            ts = datetime.fromtimestamp(ts_ms / 1000.0, tz=timezone.utc)
+            if ts >= cutoff:
+                series.append((ts, float(price)))
+        logging.getLogger(__name__).info(
+            "market_chart %s %sh → %s points", symbol, hours, len(series)
+        )
+        return series
+
+    def market_chart_range_usd(
+        self, symbol: str, start: datetime, end: datetime
+    ) -> List[Point]:
+        """Price points between start and end (inclusive), via market_chart/range.
+
+        Upstream picks the granularity from the span length.
+        """
+        upstream_id = self._require(symbol)
+        # Widen to the alignment grid so a retry moments later asks for (and hits
+        # the cache with) the same range; the filter below trims the extra points
+        align = CHART_RANGE_ALIGN_SECONDS
+        frm = int(start.timestamp()) // align * align
+        to = -(-int(end.timestamp()) // align) * align
+        url = (
+            f"{self.base_url()}/coins/{upstream_id}/market_chart/range"
+            f"?vs_currency=usd&from={frm}&to={to}"
+        )
+        key = chart_cache.cache_key(
+            f"{self.name}:{upstream_id}", str(frm), str(to), "auto"
+        )
+        series = []
+        for ts_ms, price in self._chart(url, key):
+            ts = datetime.fromtimestamp(ts_ms / 1000.0, tz=timezone.utc)
+            if start <= ts <= end:
+                series.append((ts, float(price)))
+        return series
+
+
+class CoinGeckoSource(V3ApiSource):
+    name = "coingecko"
+    ids = {"BTC": "bitcoin", "ETH": "ethereum"}
+
+    def base_url(self) -> str:
+        return http_client.base_url()
+
+    def resolve(self, symbol: str) -> Optional[str]:
+        return self.ids.get(symbol.upper())
+
+
+class FakeExchangeSource(V3ApiSource):
+    name = "fake"
+
+    def base_url(self) -> str:
+        url = os.getenv("FAKE_EXCHANGE_URL", "http://localhost:8900/api/v3")
+        return url.rstrip("/")
+
+    def resolve(self, symbol: str) -> Optional[str]:
+        symbol = symbol.strip()
+        return symbol.lower() if symbol else None
+
+
+SOURCES: Dict[str, Callable[[], PriceSource]] = {
+    CoinGeckoSource.name: CoinGeckoSource,
+    FakeExchangeSource.name: FakeExchangeSource,
+}
+
+
+def get_source() -> PriceSource:
+    """The source named by PRICE_SOURCE (read on every call, like other env config)."""
+    name = os.getenv("PRICE_SOURCE", CoinGeckoSource.name).strip().lower()
+    factory = SOURCES.get(name)
+    if factory is None:
+        raise ValueError(f"unknown PRICE_SOURCE: {name}")
+    return factory()
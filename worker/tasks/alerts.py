@@ -2,15 +2,21 @@ from __future__ import annotations
 
 import os
 from datetime import datetime, timedelta, timezone
+from typing import Any, List, Optional, Tuple
 
 import json
 import logging
 from prometheus_client import Counter, Histogram
-from sqlalchemy import select
-from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy import Select, case, func, literal, select
+from sqlalchemy.orm import Session, aliased, sessionmaker
 
+from app.alert_episodes import Evaluation, record, resolve
+from app.alert_episodes import settings_for as episode_settings
+from app.asset_cache import lookup_asset
 from app.db import get_engine
-from app.models import Alert, Asset, PriceHistory
+from app.deadband import enabled_globally, settings_for
+from app.models import Asset, PriceHistory
+from worker import rule_engine
 from worker.worker_app import celery_app
 
 
@@ -18,9 +24,16 @@ ALERTS_TOTAL = Counter("alerts_total", "Total generated alerts", ["symbol"])
 ALERT_COMPUTE_SECONDS = Histogram(
     "alert_compute_seconds", "Time spent computing alerts", ["symbol"]
 )
+ALERT_COMPUTE_ALL_SECONDS = Histogram(
+    "alert_compute_all_seconds", "Time spent computing alerts for all assets"
+)
+ALERT_RULES_SECONDS = Histogram(
+    "alert_rules_seconds", "Time spent evaluating the alert rules of all assets"
+)
 
 
-def _settings() -> tuple[int, float]:
+def default_settings() -> tuple[int, float]:
+    """Global (window minutes, threshold %) for assets without overrides."""
     window_minutes = int(os.getenv("ALERT_WINDOW_MINUTES", "60"))
     threshold_pct = float(os.getenv("ALERT_THRESHOLD_PCT", "5"))
     return window_minutes, threshold_pct
@@ -32,6 +45,58 @@ def _session() -> Session:
     )()
 
 
+def _window_ends(
+    db: Session, asset_id: int, start: datetime, carry_in: bool = False
+) -> Optional[Tuple[float, float]]:
+    """First and last price of the window, or None with fewer than two samples.
+
+    Each end is one `ORDER BY ts LIMIT 1` seek on the (asset_id, ts) index, so
+    the cost does not grow with the window length or the sample density. With
+    `carry_in` (deadband assets) the first price is the one held at `start`:
+    the last row at or before it, when there is one.
+    """
+    ts = PriceHistory.ts
+    base = select(ts, PriceHistory.price).where(PriceHistory.asset_id == asset_id)
+    window = base.where(ts >= start)
+    first = None
+    if carry_in:
+        first = db.execute(base.where(ts <= start).order_by(ts.desc()).limit(1)).first()
+    if first is None:
+        first = db.execute(window.order_by(ts.asc()).limit(1)).first()
+    last = db.execute(window.order_by(ts.desc()).limit(1)).first()
+    if first is None or last is None or first.ts == last.ts:
+        return None
+    return float(first.price), float(last.price)
+
+
+def _alert_created(
+    symbol: str,
+    now: datetime,
+    window_m: int,
+    change_pct: float,
+    threshold: float,
+    rule_id: Optional[int] = None,
+) -> None:
+    ALERTS_TOTAL.labels(symbol=symbol).inc()
+    # Structured JSON log for alert event
+    try:
+        payload = {
+            "ts": now.isoformat(),
+            "lvl": "info",
+            "event": "alert_created",
+            "asset": symbol,
+            "window_minutes": window_m,
+            "change_pct": float(change_pct),
+            "threshold_pct": float(threshold),
+        }
+        if rule_id is not None:
+            payload["rule_id"] = rule_id
+        logging.getLogger(__name__).info(json.dumps(payload))
+    except Exception:
+        # logging must not break the task
+        pass
+
+
 @celery_app.task(bind=True, name="compute_alerts")
 def compute_alerts(
     self: object,
@@ -40,16 +105,14 @@ def compute_alerts(
     threshold_pct: float | None = None,
 ) -> int:
     symbol_u = symbol.upper()
-    wm, tp = _settings()
+    wm, tp = default_settings()
     window_m = window_minutes if window_minutes is not None else wm
     threshold = threshold_pct if threshold_pct is not None else tp
 
     with ALERT_COMPUTE_SECONDS.labels(symbol=symbol_u).time():
         db = _session()
         try:
-            asset = db.execute(
-                select(Asset).where(Asset.symbol == symbol_u)
-            ).scalar_one_or_none()
+            asset = lookup_asset(db, symbol_u)
             if asset is None:
                 return 0
 
@@ -57,61 +120,240 @@ def compute_alerts(
             if asset.alert_window_min is not None and window_minutes is None:
                 window_m = int(asset.alert_window_min)
             if asset.alert_pct is not None and threshold_pct is None:
-                try:
-                    threshold = float(asset.alert_pct)  # Numeric -> float
-                except Exception:
-                    pass
+                threshold = asset.alert_pct
 
             now = datetime.now(timezone.utc)
             start = now - timedelta(minutes=window_m)
 
-            rows = (
-                db.execute(
-                    select(PriceHistory)
-                    .where(PriceHistory.asset_id == asset.id, PriceHistory.ts >= start)
-                    .order_by(PriceHistory.ts.asc())
-                )
-                .scalars()
-                .all()
+            ends = _window_ends(
+                db, asset.id, start, carry_in=settings_for(asset) is not None
             )
-
-            if len(rows) < 2:
+            change_pct = None
+            if ends is not None and ends[0] != 0.0:
+                first, last = ends
+                change_pct = (last - first) / first * 100.0
+            evaluation = Evaluation(
+                asset.id,
+                symbol_u,
+                now,
+                window_m,
+                change_pct,
+                threshold,
+                episode_settings(asset),
+            )
+            if not evaluation.fired and evaluation.episodes is None:
                 return 0
+            # With episodes, also a quiet evaluation may close the open one
+            emitted = record(db, [evaluation])
+            db.commit()
+            report_alerts(emitted)
+            return len(emitted)
+        finally:
+            db.close()
+
+
+def report_alerts(emitted: List[Evaluation]) -> None:
+    """Metrics and log lines for alerts once they are committed."""
+    for e in emitted:
+        _alert_created(
+            e.symbol,
+            e.at,
+            e.window_minutes,
+            e.change_pct or 0.0,
+            e.threshold,
+            e.rule_id,
+        )
+
+
+def _seek(column: str, where: Any, newest: bool) -> Any:
+    """Correlated `ORDER BY ts LIMIT 1` lookup of one price_history column."""
+    ph = aliased(PriceHistory)
+    return (
+        select(getattr(ph, column))
+        .where(ph.asset_id == Asset.id, where(ph.ts))
+        .order_by(ph.ts.desc() if newest else ph.ts.asc())
+        .limit(1)
+        .scalar_subquery()
+    )
+
+
+def _all_assets_query(
+    now: datetime,
+    windows: List[int],
+    carry_in: bool,
+    symbols: Optional[List[str]],
+    window_minutes: Optional[int],
+    threshold_pct: Optional[float],
+) -> Select[Any]:
+    """Overrides plus both window ends for every asset, in one statement.
+
+    Per-asset `alert_window_min`/`alert_pct` are joined in with COALESCE over
+    the env defaults (explicit task arguments beat both, as in
+    `compute_alerts`). Each distinct window length maps to its start through a
+    CASE, so every boundary is still an index seek per asset. With `carry_in`
+    the row held at the window start comes along for deadband assets.
+    """
+    wm, tp = default_settings()
+    window_col: Any = (
+        literal(window_minutes)
+        if window_minutes is not None
+        else func.coalesce(Asset.alert_window_min, wm)
+    )
+    pct_col: Any = (
+        literal(threshold_pct)
+        if threshold_pct is not None
+        else func.coalesce(Asset.alert_pct, tp)
+    )
+    start = case(
+        {w: literal(now - timedelta(minutes=w), PriceHistory.ts.type) for w in windows},
+        value=window_col,
+    )
+
+    def in_window(ts: Any) -> Any:
+        return ts >= start
 
-            first = rows[0]
-            last = rows[-1]
-            if float(first.price) == 0.0:
+    def held(ts: Any) -> Any:
+        return ts <= start
+
+    columns = [
+        Asset.id.label("asset_id"),
+        Asset.symbol.label("symbol"),
+        window_col.label("window_m"),
+        pct_col.label("threshold"),
+        _seek("ts", in_window, newest=False).label("first_ts"),
+        _seek("price", in_window, newest=False).label("first"),
+        _seek("ts", in_window, newest=True).label("last_ts"),
+        _seek("price", in_window, newest=True).label("last"),
+        Asset.alert_cooldown_min.label("cooldown_min"),
+        Asset.alert_hysteresis_pct.label("hysteresis_pct"),
+    ]
+    if carry_in:
+        band: Any = Asset.deadband_pct.is_not(None)
+        if enabled_globally():
+            band = literal(True)
+        columns += [
+            band.label("deadband"),
+            _seek("ts", held, newest=True).label("held_ts"),
+            _seek("price", held, newest=True).label("held"),
+        ]
+    q = select(*columns).order_by(Asset.id)
+    if symbols is not None:
+        q = q.where(Asset.symbol.in_(symbols))
+    return q
+
+
+@celery_app.task(bind=True, name="compute_alerts_all")
+def compute_alerts_all(
+    self: object,
+    symbols: Optional[List[str]] = None,
+    window_minutes: int | None = None,
+    threshold_pct: float | None = None,
+) -> int:
+    """`compute_alerts` for every asset (or just `symbols`) in one task.
+
+    One small query lists the distinct alert windows, one statement reads the
+    overrides and window ends of all assets, and the alerts go out through
+    `app.alert_episodes.record` in one bulk insert (plus one bulk update of
+    open episodes). Returns the number of alerts created.
+    """
+    wanted = None
+    if symbols is not None:
+        wanted = sorted({s.strip().upper() for s in symbols if s.strip()})
+    with ALERT_COMPUTE_ALL_SECONDS.time():
+        db = _session()
+        try:
+            wm, _ = default_settings()
+            config = select(
+                func.coalesce(Asset.alert_window_min, wm),
+                Asset.deadband_pct.is_not(None),
+            ).distinct()
+            if wanted is not None:
+                config = config.where(Asset.symbol.in_(wanted))
+            configs = db.execute(config).all()
+            if not configs:
                 return 0
+            windows = sorted({int(w) for w, _ in configs})
+            if window_minutes is not None:
+                windows = [int(window_minutes)]
+            carry_in = enabled_globally() or any(band for _, band in configs)
 
-            change_pct = (
-                (float(last.price) - float(first.price)) / float(first.price) * 100.0
+            now = datetime.now(timezone.utc)
+            q = _all_assets_query(
+                now, windows, carry_in, wanted, window_minutes, threshold_pct
             )
-            if abs(change_pct) >= threshold:
-                alert = Alert(
-                    asset_id=asset.id,
-                    triggered_at=now,
-                    window_minutes=window_m,
-                    change_pct=change_pct,
+            evaluations: List[Evaluation] = []
+            for row in db.execute(q):
+                first_ts, first = row.first_ts, row.first
+                if carry_in and row.deadband and row.held_ts is not None:
+                    # Deadband asset: the price held at the window start
+                    first_ts, first = row.held_ts, row.held
+                change_pct = None
+                enough = first_ts is not None and row.last_ts is not None
+                if enough and first_ts != row.last_ts and float(first) != 0.0:
+                    change_pct = (float(row.last) - float(first)) / float(first) * 100.0
+                hysteresis = row.hysteresis_pct
+                evaluation = Evaluation(
+                    row.asset_id,
+                    row.symbol,
+                    now,
+                    int(row.window_m),
+                    change_pct,
+                    float(row.threshold),
+                    resolve(
+                        row.cooldown_min,
+                        float(hysteresis) if hysteresis is not None else None,
+                    ),
                 )
-                db.add(alert)
+                if evaluation.fired or evaluation.episodes is not None:
+                    evaluations.append(evaluation)
+            emitted = record(db, evaluations)
+            if evaluations:
                 db.commit()
-                ALERTS_TOTAL.labels(symbol=symbol_u).inc()
-                # Structured JSON log for alert event
-                try:
-                    payload = {
-                        "ts": now.isoformat(),
-                        "lvl": "info",
-                        "event": "alert_created",
-                        "asset": symbol_u,
-                        "window_minutes": window_m,
-                        "change_pct": float(change_pct),
-                        "threshold_pct": float(threshold),
-                    }
-                    logging.getLogger(__name__).info(json.dumps(payload))
-                except Exception:
-                    # logging must not break the task
-                    pass
-                return 1
-            return 0
+            report_alerts(emitted)
+            return len(emitted)
+        finally:
+            db.close()
+
+
+@celery_app.task(bind=True, name="evaluate_alert_rules")
+def evaluate_alert_rules(self: object, symbols: Optional[List[str]] = None) -> int:
+    """Evaluate every enabled `AlertRule` (or those of `symbols`) in one pass.
+
+    The series of all assets with rules are loaded once into NumPy arrays and
+    every rule and window is computed together (see `worker.rule_engine`);
+    alerts go through `app.alert_episodes.record` like the threshold ones.
+    Returns the number of alerts created.
+    """
+    rule_engine.require_numpy()
+    wanted = None
+    if symbols is not None:
+        wanted = sorted({s.strip().upper() for s in symbols if s.strip()})
+    with ALERT_RULES_SECONDS.time():
+        db = _session()
+        try:
+            rules = rule_engine.load_rules(db, wanted)
+            if not rules:
+                return 0
+            now = datetime.now(timezone.utc)
+            series = rule_engine.load_series(db, rules, now)
+            values = rule_engine.evaluate(series, rules, now).tolist()
+            evaluations: List[Evaluation] = []
+            for rule, value in zip(rules, values):
+                evaluation = Evaluation(
+                    rule.asset_id,
+                    rule.symbol,
+                    now,
+                    rule.window_minutes,
+                    value if value == value else None,  # NaN: not enough data
+                    rule.threshold,
+                    rule.episodes,
+                    rule.id,
+                )
+                if evaluation.fired or evaluation.episodes is not None:
+                    evaluations.append(evaluation)
+            emitted = record(db, evaluations)
+            db.commit()
+            report_alerts(emitted)
+            return len(emitted)
         finally:
             db.close()
@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+import logging
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.db import get_engine
+from app.models import Asset
+from app.rollups import rebuild_candles as _rebuild
+from worker.worker_app import celery_app
+
+
+def _session() -> Session:
+    return sessionmaker(
+        bind=get_engine(), autoflush=False, autocommit=False, future=True
+    )()
+
+
+@celery_app.task(bind=True, name="rebuild_candles")
+def rebuild_candles(self: object, symbol: str | None = None) -> int:
+    """Recompute OHLC rollups from raw history for one asset (or all of them).
+
+    Use after deploying the candle tables or after repairing raw data by hand.
+    Returns the number of candles written; each asset commits separately.
+    """
+    db = _session()
+    written = 0
+    try:
+        q = select(Asset.id, Asset.symbol).order_by(Asset.symbol)
+        if symbol is not None:
+            q = q.where(Asset.symbol == symbol.upper())
+        for asset_id, sym in db.execute(q).all():
+            count = _rebuild(db, asset_id)
+            db.commit()
+            written += count
+            logging.getLogger(__name__).info("rebuild_candles %s → %s", sym, count)
+        return written
+    finally:
+        db.close()
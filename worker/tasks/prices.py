@@ -1,16 +1,20 @@
 from __future__ import annotations
 from datetime import datetime, timedelta, timezone
-from typing import Any, Mapping
+import os
 import time
 
 import logging
-import requests
 from prometheus_client import Counter, Histogram
 from sqlalchemy.orm import Session, sessionmaker
-from sqlalchemy import select, func
 
+from app.asset_cache import get_or_create_asset, lookup_asset
 from app.db import get_engine
-from app.models import Asset, PriceHistory
+from app.deadband import filter_samples, settings_for
+from app.gaps import find_gaps
+from app.ingest import INSERT_CHUNK_ROWS, insert_points, insert_samples
+from app.rollups import apply_points, apply_points_many
+from worker import write_buffer
+from worker.sources import get_source
 from worker.worker_app import celery_app
 
 
@@ -23,66 +27,25 @@ FETCH_DURATION = Histogram(
 )
 
 
-def _coingecko_id_for_symbol(symbol: str) -> str | None:
-    mapping = {
-        "BTC": "bitcoin",
-        "ETH": "ethereum",
-    }
-    return mapping.get(symbol.upper())
+def _get_price_usd(symbol: str) -> float:
+    return get_source().price_usd(symbol)
 
 
-def _get_price_usd(symbol: str) -> float:
-    cg_id = _coingecko_id_for_symbol(symbol)
-    if cg_id is None:
-        raise ValueError("unsupported asset symbol")
-    url = f"https://api.coingecko.com/api/v3/simple/price?ids={cg_id}&vs_currencies=usd"
-    # Minimal, stable backoff on transient errors (429/5xx)
-    delays = [1, 2, 4]
-    last_exc: Exception | None = None
-    for attempt, delay in enumerate([0] + delays):
-        try:
-            resp = requests.get(url, timeout=10)
-            # If status indicates transient issue, raise to trigger retry
-            if resp.status_code in (429,) or resp.status_code >= 500:
-                resp.raise_for_status()
-            resp.raise_for_status()
-            data: Mapping[str, Any] = resp.json()
-            price = float(data[cg_id]["usd"])  # type: ignore[index]
-            return price
-        except Exception as e:  # pragma: no cover - branches tested via monkeypatch
-            last_exc = e
-            if attempt == len(delays):
-                break
-            time.sleep(delay)
-    assert last_exc is not None
-    raise last_exc
+def _get_prices_usd(symbols: list[str]) -> dict[str, float]:
+    """USD prices for every supported symbol, fetched with one upstream call."""
+    return get_source().prices_usd(symbols)
 
 
 def _get_market_chart_usd(symbol: str, hours: int = 24) -> list[tuple[datetime, float]]:
-    """Fetch historical price points for the given symbol.
+    """Historical price points for the last `hours` hours (UTC)."""
+    return get_source().market_chart_usd(symbol, hours)
 
-    Uses CoinGecko market_chart endpoint. Returns list of (ts, price) tuples
-    in UTC, filtered to the last `hours` hours.
-    """
-    cg_id = _coingecko_id_for_symbol(symbol)
-    if cg_id is None:
-        raise ValueError("unsupported asset symbol")
-    # CoinGecko accepts fractional days; use 1 for <=24h, ceil for more.
-    days = max(1.0, hours / 24.0)
-    url = f"https://api.coingecko.com/api/v3/coins/{cg_id}/market_chart?vs_currency=usd&days={days}&interval=minute"
-    resp = requests.get(url, timeout=20)
-    resp.raise_for_status()
-    data = resp.json()
-    series = []
-    cutoff = datetime.now(timezone.utc) - timedelta(hours=hours)
-    for ts_ms, price in data.get("prices", []):  # type: ignore[assignment]
-        ts = datetime.fromtimestamp(ts_ms / 1000.0, tz=timezone.utc)
-        if ts >= cutoff:
-            series.append((ts, float(price)))
-    logging.getLogger(__name__).info(
-        "market_chart %s %sh → %s points", symbol, hours, len(series)
-    )
-    return series
+
+def _get_market_chart_range_usd(
+    symbol: str, start: datetime, end: datetime
+) -> list[tuple[datetime, float]]:
+    """Historical price points between start and end; used for gap backfills."""
+    return get_source().market_chart_range_usd(symbol, start, end)
 
 
 def _session() -> Session:
@@ -102,21 +65,18 @@ def fetch_price(self: object, symbol: str) -> float:
             FETCH_FAILURE.labels(symbol=symbol_u).inc()
             raise
 
+    if write_buffer.enabled():
+        _buffer([(symbol_u, datetime.now(timezone.utc), price)])
+        FETCH_SUCCESS.labels(symbol=symbol_u).inc()
+        return price
+
     # Persist to DB
     db = _session()
     try:
-        asset = db.execute(
-            select(Asset).where(Asset.symbol == symbol_u)
-        ).scalar_one_or_none()
-        if asset is None:
-            # auto-create minimal asset record to avoid dropped samples in demo
-            asset = Asset(symbol=symbol_u, name=None)
-            db.add(asset)
+        # auto-create minimal asset record to avoid dropped samples in demo
+        asset = get_or_create_asset(db, symbol_u)
+        if _store_samples(db, [(asset.id, datetime.now(timezone.utc), price)]):
             db.commit()
-            db.refresh(asset)
-        ph = PriceHistory(asset_id=asset.id, ts=datetime.now(timezone.utc), price=price)
-        db.add(ph)
-        db.commit()
     finally:
         db.close()
 
@@ -124,12 +84,92 @@ def fetch_price(self: object, symbol: str) -> float:
     return price
 
 
+@celery_app.task(bind=True, name="fetch_prices_batch", rate_limit="30/m")
+def fetch_prices_batch(self: object, symbols: list[str]) -> dict[str, float]:
+    """Fetch all `symbols` in one upstream request and store them together.
+
+    Returns the prices that were stored. Symbols the upstream does not know
+    (or omits) count as failures without failing the rest of the batch; an
+    upstream error fails every symbol and is re-raised.
+    """
+    wanted = list(dict.fromkeys(s.strip().upper() for s in symbols if s.strip()))
+    started = time.perf_counter()
+    try:
+        prices = _get_prices_usd(wanted)
+    except Exception:
+        for symbol_u in wanted:
+            FETCH_FAILURE.labels(symbol=symbol_u).inc()
+        raise
+    finally:
+        # One shared request: every symbol waited for the same call
+        elapsed = time.perf_counter() - started
+        for symbol_u in wanted:
+            FETCH_DURATION.labels(symbol=symbol_u).observe(elapsed)
+    for symbol_u in wanted:
+        if symbol_u not in prices:
+            FETCH_FAILURE.labels(symbol=symbol_u).inc()
+    if not prices:
+        return {}
+    if write_buffer.enabled():
+        ts = datetime.now(timezone.utc)
+        _buffer([(symbol_u, ts, price) for symbol_u, price in prices.items()])
+        for symbol_u in prices:
+            FETCH_SUCCESS.labels(symbol=symbol_u).inc()
+        return prices
+
+    db = _session()
+    try:
+        # Resolve (and possibly create) assets first: creation commits on its own
+        asset_ids = {s: get_or_create_asset(db, s).id for s in prices}
+        ts = datetime.now(timezone.utc)
+        # All samples and their rollups land in a single transaction
+        _store_samples(db, [(asset_ids[s], ts, price) for s, price in prices.items()])
+        db.commit()
+    finally:
+        db.close()
+
+    for symbol_u in prices:
+        FETCH_SUCCESS.labels(symbol=symbol_u).inc()
+    return prices
+
+
+def _store_samples(db: Session, samples: list[tuple[int, datetime, float]]) -> int:
+    """Insert live samples and merge them into the candles; returns rows stored.
+
+    Samples inside their asset's deadband are skipped. The candles of every
+    asset are updated with one `apply_points_many` call, in the caller's
+    transaction.
+    """
+    fresh: dict[int, list[tuple[datetime, float]]] = {}
+    for asset_id, ts, price in insert_samples(db, filter_samples(db, samples)):
+        fresh.setdefault(asset_id, []).append((ts, price))
+    apply_points_many(db, fresh)
+    return sum(len(points) for points in fresh.values())
+
+
+def _buffer(samples: list[tuple[str, datetime, float]]) -> None:
+    """Queue samples for `flush_price_buffer`; kick it when crossing the size limit."""
+    before, after = write_buffer.push(samples)
+    if before < write_buffer.max_rows() <= after:
+        celery_app.send_task("flush_price_buffer")
+
+
+@celery_app.task(bind=True, name="flush_price_buffer")
+def flush_price_buffer(self: object) -> int:
+    """Write buffered samples (WRITE_BEHIND mode) in batches; returns rows inserted."""
+    db = _session()
+    try:
+        return write_buffer.flush(db)
+    finally:
+        db.close()
+
+
 @celery_app.task(bind=True, name="backfill_prices")
 def backfill_prices(self: object, symbol: str, hours: int = 168) -> int:
     """Backfill recent price history for an asset.
 
     Returns the number of points inserted. Safe to run multiple times; duplicates
-    are ignored thanks to the unique constraint on (asset_id, ts).
+    are skipped in bulk by INSERT ... ON CONFLICT (asset_id, ts) DO NOTHING.
     """
     symbol_u = symbol.upper()
     # Ensure tables exist in dev/compose scenarios
@@ -143,26 +183,9 @@ def backfill_prices(self: object, symbol: str, hours: int = 168) -> int:
     points = _get_market_chart_usd(symbol_u, hours=hours)
 
     db = _session()
-    inserted = 0
     try:
-        asset = db.execute(
-            select(Asset).where(Asset.symbol == symbol_u)
-        ).scalar_one_or_none()
-        if asset is None:
-            asset = Asset(symbol=symbol_u, name=None)
-            db.add(asset)
-            db.commit()
-            db.refresh(asset)
-
-        for ts, price in points:
-            ph = PriceHistory(asset_id=asset.id, ts=ts, price=price)
-            db.add(ph)
-            try:
-                db.commit()
-                inserted += 1
-            except Exception:
-                # Likely unique constraint violation; drop and continue
-                db.rollback()
+        asset = get_or_create_asset(db, symbol_u)
+        inserted = _store_points(db, asset.id, points)
         logging.getLogger(__name__).info(
             "backfill %s %sh → inserted=%s (fetched=%s)",
             symbol_u,
@@ -175,37 +198,74 @@ def backfill_prices(self: object, symbol: str, hours: int = 168) -> int:
         db.close()
 
 
+def _store_points(
+    db: Session, asset_id: int, points: list[tuple[datetime, float]]
+) -> int:
+    """Insert points in chunks; returns how many were new.
+
+    One transaction per chunk: raw rows plus the rollups for exactly the rows
+    that were new (ON CONFLICT skips the rest).
+    """
+    inserted = 0
+    for offset in range(0, len(points), INSERT_CHUNK_ROWS):
+        chunk = points[offset : offset + INSERT_CHUNK_ROWS]
+        fresh = insert_points(db, asset_id, chunk)
+        apply_points(db, asset_id, fresh)
+        db.commit()
+        inserted += len(fresh)
+    return inserted
+
+
 @celery_app.task(bind=True, name="ensure_backfill")
-def ensure_backfill(self: object, symbol: str, hours: int = 168) -> int:
-    """Ensure there is at least `hours` of history for `symbol`.
+def ensure_backfill(
+    self: object,
+    symbol: str,
+    hours: int = 168,
+    interval_seconds: int | None = None,
+    gap_factor: float | None = None,
+) -> int:
+    """Fill whatever is missing from the last `hours` of history for `symbol`.
 
-    If the earliest stored timestamp is newer than now - hours, trigger a backfill.
-    Returns number of points inserted by the backfill (0 if already satisfied).
+    Finds gaps longer than `gap_factor` x `interval_seconds` (defaults:
+    BACKFILL_GAP_FACTOR=3 x FETCH_INTERVAL_SECONDS, plus the heartbeat for
+    deadband assets) with one windowed query,
+    covering a too-short history as well as holes after an outage, and fetches
+    only those ranges from upstream. Returns the number of points inserted
+    (0 if nothing is missing).
     """
     symbol_u = symbol.upper()
+    step = int(interval_seconds or int(os.getenv("FETCH_INTERVAL_SECONDS", "300")))
+    factor = float(gap_factor or float(os.getenv("BACKFILL_GAP_FACTOR", "3")))
     db = _session()
     try:
-        asset = db.execute(
-            select(Asset).where(Asset.symbol == symbol_u)
-        ).scalar_one_or_none()
+        asset = lookup_asset(db, symbol_u)
         if asset is None:
             # No asset yet → run backfill which will create it lazily
             return backfill_prices(symbol=symbol_u, hours=hours)  # type: ignore[misc]
 
-        # Find earliest stored timestamp
-        oldest = db.execute(
-            select(func.min(PriceHistory.ts)).where(PriceHistory.asset_id == asset.id)
-        ).scalar_one()
-        if oldest is None:
-            return backfill_prices(symbol=symbol_u, hours=hours)  # type: ignore[misc]
-
-        # Normalize potential offset-naive datetimes (e.g., SQLite) to UTC
-        if oldest.tzinfo is None:
-            oldest = oldest.replace(tzinfo=timezone.utc)
-        cutoff = datetime.now(timezone.utc) - timedelta(hours=hours)
-        if oldest <= cutoff:
-            return 0
-        # Not enough history yet → run a full backfill window
-        return backfill_prices(symbol=symbol_u, hours=hours)  # type: ignore[misc]
+        end = datetime.now(timezone.utc)
+        start = end - timedelta(hours=hours)
+        max_gap = step * factor
+        band = settings_for(asset)
+        if band is not None:
+            # Deadband assets legitimately go quiet for up to a heartbeat
+            max_gap += band.heartbeat.total_seconds()
+        gaps = find_gaps(db, asset.id, start, end, max_gap_seconds=max_gap)
+        inserted = 0
+        fetched = 0
+        for gap_start, gap_end in gaps:
+            points = _get_market_chart_range_usd(symbol_u, gap_start, gap_end)
+            fetched += len(points)
+            inserted += _store_points(db, asset.id, points)
+        if gaps:
+            logging.getLogger(__name__).info(
+                "ensure_backfill %s %sh → gaps=%s inserted=%s (fetched=%s)",
+                symbol_u,
+                hours,
+                len(gaps),
+                inserted,
+                fetched,
+            )
+        return inserted
     finally:
         db.close()
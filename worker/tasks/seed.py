@@ -3,15 +3,23 @@ from __future__ import annotations
 import os
 import random
 from datetime import datetime, timedelta, timezone
-from typing import Iterator
+from typing import Iterator, List, Sequence
 
 from sqlalchemy import select, func
 from sqlalchemy.orm import Session, sessionmaker
 
+from app.asset_cache import get_or_create_asset
 from app.db import get_engine
-from app.models import Asset, PriceHistory
+from app.ingest import INSERT_CHUNK_ROWS, insert_points
+from app.rollups import apply_points
+from app.models import PriceHistory
 from worker.worker_app import celery_app
 
+try:  # NumPy is optional (extra "seed"); without it the pure-Python walk is used
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on the environment
+    np = None  # type: ignore[assignment]
+
 
 def _session() -> Session:
     return sessionmaker(
@@ -39,6 +47,69 @@ def _gen_series(
         t = t + timedelta(seconds=interval_seconds)
 
 
+def _walk_np(count: int, base: float, seed: int) -> Sequence[float]:
+    """`count` steps of the same random walk, computed as one cumulative product.
+
+    Deterministic per seed, but a different stream than `_gen_series`. The
+    0.01 floor is applied after the fact instead of feeding back into later
+    steps; with +/-1% steps the walk never gets near it in practice.
+    """
+    rng = np.random.default_rng(seed)
+    drift = (rng.random() - 0.5) * 0.001
+    steps = 1.0 + drift + (rng.random(count) - 0.5) * 0.02
+    prices = np.maximum(base * np.cumprod(steps), 0.01)
+    return prices.tolist()  # type: ignore[no-any-return]
+
+
+def _gen_chunks(
+    start: datetime,
+    end: datetime,
+    interval_seconds: int,
+    base: float,
+    seed: int,
+    chunk_rows: int = INSERT_CHUNK_ROWS,
+) -> Iterator[List[tuple[datetime, float]]]:
+    """The seeded series between start and end in lists of `chunk_rows` points."""
+    if np is None:
+        series = _gen_series(start, end, interval_seconds, base, seed)
+        chunk: List[tuple[datetime, float]] = []
+        for point in series:
+            chunk.append(point)
+            if len(chunk) >= chunk_rows:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+        return
+    count = int((end - start).total_seconds() // interval_seconds) + 1
+    prices = _walk_np(count, base, seed)
+    step = timedelta(seconds=interval_seconds)
+    for offset in range(0, count, chunk_rows):
+        stop = min(offset + chunk_rows, count)
+        yield [(start + step * i, prices[i]) for i in range(offset, stop)]
+
+
+def _seed_range(
+    db: Session,
+    asset_id: int,
+    symbol: str,
+    start: datetime,
+    end: datetime,
+    interval_seconds: int,
+) -> int:
+    """Bulk-insert the symbol's synthetic series, one commit per chunk."""
+    base = _baseline_for_symbol(symbol)
+    seed = sum(ord(c) for c in symbol)
+    inserted = 0
+    chunks = _gen_chunks(start, end, interval_seconds, base, seed, INSERT_CHUNK_ROWS)
+    for chunk in chunks:
+        fresh = insert_points(db, asset_id, chunk)
+        apply_points(db, asset_id, fresh)
+        db.commit()
+        inserted += len(fresh)
+    return inserted
+
+
 @celery_app.task(bind=True, name="seed_mock_prices")
 def seed_mock_prices(
     self: object,
@@ -50,7 +121,8 @@ def seed_mock_prices(
 
     Intended for portfolio/demos. Ensures there is at least `hours` of history;
     if the earliest sample is newer than (now - hours), it fills the gap with
-    synthetic data. Uses a deterministic random walk per symbol.
+    synthetic data. Uses a deterministic random walk per symbol (vectorized
+    when NumPy is installed) and bulk inserts that skip existing samples.
     """
     sym = symbol.upper()
     hrs = int(hours or int(os.getenv("MOCK_SEED_HOURS", "168")))
@@ -60,16 +132,8 @@ def seed_mock_prices(
     start = now - timedelta(hours=hrs)
 
     db = _session()
-    inserted = 0
     try:
-        asset = db.execute(
-            select(Asset).where(Asset.symbol == sym)
-        ).scalar_one_or_none()
-        if asset is None:
-            asset = Asset(symbol=sym, name=None)
-            db.add(asset)
-            db.commit()
-            db.refresh(asset)
+        asset = get_or_create_asset(db, sym)
 
         oldest = db.execute(
             select(func.min(PriceHistory.ts)).where(PriceHistory.asset_id == asset.id)
@@ -81,16 +145,38 @@ def seed_mock_prices(
         if oldest is not None and oldest <= start:
             return 0
 
-        base = _baseline_for_symbol(sym)
-        seed = sum(ord(c) for c in sym)
-        for ts, price in _gen_series(start, now, step, base, seed):
-            ph = PriceHistory(asset_id=asset.id, ts=ts, price=price)
-            db.add(ph)
-            try:
-                db.commit()
-                inserted += 1
-            except Exception:
-                db.rollback()
-        return inserted
+        return _seed_range(db, asset.id, sym, start, now, step)
+    finally:
+        db.close()
+
+
+@celery_app.task(bind=True, name="seed_synthetic_assets")
+def seed_synthetic_assets(
+    self: object,
+    count: int,
+    hours: int = 24 * 365,
+    interval_seconds: int = 60,
+    prefix: str = "SYN",
+) -> int:
+    """Create `count` synthetic assets (SYN0000, SYN0001, ...) with full history.
+
+    For load tests: unlike `seed_mock_prices` it does not check existing
+    coverage, it just bulk-inserts the whole window; timestamps sit on the
+    interval grid, so running it again only hits duplicates (skipped).
+    Returns the total number of samples inserted.
+    """
+    # Align to the interval grid so a re-run hits the same timestamps
+    epoch = int(datetime.now(timezone.utc).timestamp())
+    now = datetime.fromtimestamp(epoch - epoch % interval_seconds, timezone.utc)
+    start = now - timedelta(hours=hours)
+    width = max(4, len(str(count - 1)))
+    total = 0
+    db = _session()
+    try:
+        for n in range(count):
+            symbol = f"{prefix}{n:0{width}d}".upper()
+            asset = get_or_create_asset(db, symbol)
+            total += _seed_range(db, asset.id, symbol, start, now, interval_seconds)
+        return total
     finally:
         db.close()
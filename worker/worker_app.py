@@ -81,6 +81,10 @@ try:
     import worker.tasks.seed  # noqa: F401
 except Exception:
     pass
+try:
+    import worker.tasks.candles  # noqa: F401
+except Exception:
+    pass
 
 
 def _enable_beat() -> bool:
@@ -98,7 +102,33 @@ def _build_schedule_from_env() -> dict[str, dict]:
         return {}
     interval = int(os.getenv("FETCH_INTERVAL_SECONDS", "300"))
     assets = _parse_assets_env()
-    schedule = build_beat_schedule(assets, interval)
+    # FETCH_MODE=batch: one upstream call per tick for all assets
+    batch = os.getenv("FETCH_MODE", "per_asset").strip().lower() == "batch"
+    # ALERTS_MODE=batch: one compute_alerts_all task for all assets;
+    # ALERTS_MODE=stream: none, the ingest service evaluates alerts
+    alerts_mode = os.getenv("ALERTS_MODE", "per_asset").strip().lower()
+    schedule = build_beat_schedule(
+        assets,
+        interval,
+        batch=batch,
+        batch_alerts=alerts_mode == "batch",
+        stream_alerts=alerts_mode == "stream",
+    )
+    # WRITE_BEHIND: drain the sample buffer on a time threshold too
+    from worker.write_buffer import enabled as write_behind, flush_seconds
+
+    if write_behind():
+        schedule["flush_price_buffer"] = {
+            "task": "flush_price_buffer",
+            "schedule": sched(timedelta(seconds=flush_seconds())),
+        }
+    # ALERT_RULES: evaluate the per-asset AlertRules on the fetch cadence
+    if os.getenv("ALERT_RULES", "false").strip().lower() in {"1", "true", "yes", "on"}:
+        schedule["evaluate_alert_rules"] = {
+            "task": "evaluate_alert_rules",
+            "schedule": sched(timedelta(seconds=interval)),
+            "args": (assets,),
+        }
     # Retention job (optional): run daily by default
     retention_days = int(os.getenv("RETENTION_DAYS", "30"))
     if retention_days > 0:
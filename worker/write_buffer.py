@@ -0,0 +1,206 @@
+"""Write-behind buffer for fetched price samples (WRITE_BEHIND=true).
+
+Fetch tasks RPUSH samples to a Redis list instead of committing a row each;
+the `flush_price_buffer` task drains it in batches. Delivery is at-least-once:
+a flush reads a batch with LRANGE, commits it, and only then LTRIMs it off the
+list, so a crash in between replays the batch and the (asset_id, ts) unique
+constraint (INSERT ... ON CONFLICT DO NOTHING) drops the duplicates. A Redis
+lock keeps flushes from overlapping, which would otherwise trim unread items:
+a background thread keeps extending it while a batch is being written, and
+the LTRIM only goes through (WATCH/MULTI) while the lock still holds this
+flush's token. A flush that lost its lock stops without trimming; the next
+one replays the batch.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import uuid
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from prometheus_client import Gauge, Histogram
+from sqlalchemy.orm import Session
+
+from app.asset_cache import get_or_create_asset
+from app.deadband import filter_samples
+from app.ingest import insert_samples
+from app.rollups import apply_points_many
+
+log = logging.getLogger(__name__)
+
+Sample = Tuple[str, datetime, float]
+
+BUFFER_DEPTH = Gauge("price_buffer_depth", "Samples waiting in the write-behind buffer")
+FLUSH_DURATION = Histogram(
+    "price_buffer_flush_seconds", "Duration of one write-behind batch flush"
+)
+
+_client: Optional[Any] = None
+
+
+def enabled() -> bool:
+    value = os.getenv("WRITE_BEHIND", "false")
+    return value.lower() in {"1", "true", "yes", "on"}
+
+
+def _key() -> str:
+    return os.getenv("WRITE_BUFFER_KEY", "price_buffer")
+
+
+def max_rows() -> int:
+    """Size threshold: a push crossing it triggers a flush; also the batch size."""
+    return max(1, int(os.getenv("WRITE_BUFFER_MAX_ROWS", "500")))
+
+
+def flush_seconds() -> int:
+    """Time threshold: how often beat runs `flush_price_buffer`."""
+    return max(1, int(os.getenv("WRITE_BUFFER_FLUSH_SECONDS", "5")))
+
+
+def get_client() -> Any:
+    global _client
+    if _client is None:
+        import redis
+
+        from worker.worker_app import DEFAULT_BROKER
+
+        _client = redis.Redis.from_url(os.getenv("REDIS_URL", DEFAULT_BROKER))
+    return _client
+
+
+def set_client(client: Optional[Any]) -> None:
+    """Inject a Redis client (tests); None goes back to REDIS_URL."""
+    global _client
+    _client = client
+
+
+def push(samples: Iterable[Sample]) -> Tuple[int, int]:
+    """Append samples to the buffer; returns (depth before, depth after)."""
+    payload = [
+        json.dumps({"s": symbol, "t": ts.isoformat(), "p": price})
+        for symbol, ts, price in samples
+    ]
+    if not payload:
+        return 0, 0
+    depth = int(get_client().rpush(_key(), *payload))
+    BUFFER_DEPTH.set(depth)
+    return depth - len(payload), depth
+
+
+def _decode(raw: List[Any]) -> List[Sample]:
+    samples: List[Sample] = []
+    for item in raw:
+        try:
+            data = json.loads(item)
+            samples.append(
+                (str(data["s"]), datetime.fromisoformat(data["t"]), float(data["p"]))
+            )
+        except (KeyError, TypeError, ValueError) as exc:
+            # Unreadable entries are dropped rather than blocking the buffer
+            log.error("dropping malformed buffered sample %r: %s", item, exc)
+    return samples
+
+
+def _write(db: Session, samples: List[Sample]) -> int:
+    asset_ids: Dict[str, int] = {}
+    for symbol, _, _ in samples:
+        if symbol not in asset_ids:
+            asset_ids[symbol] = get_or_create_asset(db, symbol).id
+    fresh: Dict[int, List[Tuple[datetime, float]]] = {}
+    rows = filter_samples(
+        db, [(asset_ids[symbol], ts, price) for symbol, ts, price in samples]
+    )
+    for asset_id, ts, price in insert_samples(db, rows):
+        fresh.setdefault(asset_id, []).append((ts, price))
+    apply_points_many(db, fresh)
+    db.commit()
+    return sum(len(points) for points in fresh.values())
+
+
+def _owns(value: Any, token: str) -> bool:
+    return value in (token, token.encode())
+
+
+class _LockKeeper:
+    """Extends the flush lock every third of its TTL until stopped."""
+
+    def __init__(self, client: Any, lock: str, token: str, seconds: int) -> None:
+        self._client = client
+        self._lock = lock
+        self._token = token
+        self._seconds = seconds
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self._seconds / 3):
+            try:
+                if not _owns(self._client.get(self._lock), self._token):
+                    return
+                self._client.expire(self._lock, self._seconds)
+            except Exception as exc:  # the trim check catches a lost lock
+                log.warning("could not extend the write buffer lock: %s", exc)
+
+    def __enter__(self) -> "_LockKeeper":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self._stop.set()
+        self._thread.join()
+
+
+def _trim(client: Any, key: str, lock: str, token: str, count: int) -> bool:
+    """LTRIM `count` items off the buffer if the lock is still ours."""
+    from redis.exceptions import WatchError
+
+    with client.pipeline() as pipe:
+        try:
+            pipe.watch(lock)
+            if not _owns(pipe.get(lock), token):
+                return False
+            pipe.multi()
+            pipe.ltrim(key, count, -1)
+            pipe.execute()
+        except WatchError:
+            return False
+    return True
+
+
+def flush(db: Session, batch_rows: Optional[int] = None, lock_seconds: int = 60) -> int:
+    """Drain the buffer in batches; returns rows inserted (duplicates excluded).
+
+    Returns 0 without touching the buffer if another flush holds the lock.
+    """
+    client = get_client()
+    key = _key()
+    lock = f"{key}:flush_lock"
+    token = uuid.uuid4().hex
+    if not client.set(lock, token, nx=True, ex=lock_seconds):
+        return 0
+    rows = batch_rows or max_rows()
+    written = 0
+    try:
+        with _LockKeeper(client, lock, token, lock_seconds):
+            while True:
+                raw = client.lrange(key, 0, rows - 1)
+                if not raw:
+                    break
+                with FLUSH_DURATION.time():
+                    written += _write(db, _decode(raw))
+                # Only now is the batch safe to drop; a crash before this replays it
+                if not _trim(client, key, lock, token, len(raw)):
+                    log.warning("write buffer lock lost mid-flush; batch left queued")
+                    break
+                if len(raw) < rows:
+                    break
+    finally:
+        # Release only our own lock (it may have expired and been re-taken)
+        if _owns(client.get(lock), token):
+            client.delete(lock)
+        BUFFER_DEPTH.set(int(client.llen(key)))
+    return written